@@ -0,0 +1,75 @@
+"""Memory benchmark of the in-memory graph backends.
+
+Builds the same attributed graph with `NXGraph` and `CompactGraph`
+and reports the memory allocated for each of them (measured with
+`tracemalloc`), as well as the time taken to build the graph and to
+find the instances of a small pattern.
+
+Usage::
+
+    python benchmarks/memory_usage.py [number_of_nodes]
+
+"""
+import sys
+import time
+import tracemalloc
+
+from regraph import NXGraph, CompactGraph
+
+
+NODE_TYPES = ["protein", "gene", "region", "site", "residue"]
+EDGE_TYPES = ["binds", "encodes", "contains"]
+
+
+def generate_graph(graph_cls, number_of_nodes):
+    """Generate a graph with typed nodes and edges."""
+    graph = graph_cls()
+    for i in range(number_of_nodes):
+        graph.add_node(
+            "n{}".format(i),
+            {"type": NODE_TYPES[i % len(NODE_TYPES)]})
+    for i in range(number_of_nodes):
+        for step in (1, 7):
+            j = (i * 31 + step) % number_of_nodes
+            if i != j and not graph.exists_edge(
+                    "n{}".format(i), "n{}".format(j)):
+                graph.add_edge(
+                    "n{}".format(i), "n{}".format(j),
+                    {"type": EDGE_TYPES[(i + step) % len(EDGE_TYPES)]})
+    return graph
+
+
+def measure(graph_cls, number_of_nodes):
+    """Measure the memory and time used by a graph backend."""
+    tracemalloc.start()
+    start = time.time()
+    graph = generate_graph(graph_cls, number_of_nodes)
+    build_time = time.time() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pattern = NXGraph()
+    pattern.add_nodes_from([
+        ("x", {"type": "protein"}), ("y", {"type": "site"})])
+    pattern.add_edges_from([("x", "y", {"type": "binds"})])
+    start = time.time()
+    instances = graph.find_matching(pattern)
+    matching_time = time.time() - start
+    return memory, build_time, matching_time, len(instances)
+
+
+def main(number_of_nodes):
+    """Run the benchmark and print the results."""
+    print("{} nodes".format(number_of_nodes))
+    print("{:<14}{:>12}{:>12}{:>12}{:>12}".format(
+        "backend", "MiB", "bytes/node", "build (s)", "match (s)"))
+    for graph_cls in [NXGraph, CompactGraph]:
+        memory, build_time, matching_time, _ = measure(
+            graph_cls, number_of_nodes)
+        print("{:<14}{:>12.1f}{:>12.0f}{:>12.2f}{:>12.2f}".format(
+            graph_cls.__name__, memory / 2 ** 20,
+            memory / number_of_nodes, build_time, matching_time))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -3,6 +3,8 @@ from regraph.backends.networkx.graphs import NXGraph
 from regraph.backends.networkx.hierarchies import NXHierarchy
 from regraph.backends.networkx.plotting import *
 
+from regraph.backends.compact.graphs import CompactGraph
+
 from regraph.backends.neo4j.graphs import Neo4jGraph
 from regraph.backends.neo4j.hierarchies import Neo4jHierarchy, TypedNeo4jGraph
 
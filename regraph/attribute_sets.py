@@ -4,7 +4,8 @@ Implements the following data structures:
 
 * `AttributeSet` -- a base class for attribute sets in `ReGraph`,
   provides an interface, implements some common behaviour;
-* `FiniteSet` -- wrapper for Python finite sets, inherits `AttributeSet`;
+* `FiniteSet` -- immutable wrapper for Python finite sets, inherits
+  `AttributeSet`;
 * `RegexSet` -- a class for possibly infinite sets of strings given by
   regular expressions. It uses the `greenery <https://github.com/qntm/greenery>`_
   library for finding inclusion and intersection of regular expressions,
@@ -23,11 +24,13 @@ TODO:
   the set of reals.
 """
 
+import bisect
 import copy
+import heapq
 import re
-import numpy as np
 import math
 import sys
+import weakref
 
 from greenery.lego import parse
 
@@ -50,6 +53,21 @@ def _hashify(d):
     return tuple(result)
 
 
+def _typed(element):
+    """Pair an element of a finite set with its type (recursively).
+
+    Elements equal as values but of different types, like 1, 1.0 and
+    True, or (1, 'x') and (1.0, 'x'), are distinguished by their
+    typed representations.
+    """
+    element_type = type(element)
+    if element_type is tuple:
+        return (element_type, tuple(_typed(e) for e in element))
+    if element_type is frozenset:
+        return (element_type, frozenset(_typed(e) for e in element))
+    return (element_type, element)
+
+
 def _regex_to_string(a):
     if isinstance(a, str):
         return a
@@ -146,29 +164,62 @@ class AttributeSet(object):
                 "'{}' to a Python set".format(type(self)))
 
 
+# Pool of hash-consed finite sets
+_finite_sets = weakref.WeakValueDictionary()
+
+
 class FiniteSet(AttributeSet):
     """Wrapper for finite sets as attribute sets.
 
+    Finite sets are immutable and hash-consed: constructing
+    a finite set equal to an existing one returns the existing
+    object, so that equal values are shared between the nodes and
+    the edges of graphs and are never copied.
+
     Attributes
     ----------
-    fset : set
+    fset : frozenset
         Python finite set that is being wrapped by the object
 
     """
 
-    def __init__(self, fset=None):
-        """Initialize finite set object."""
+    def __new__(cls, fset=None):
+        """Create a finite set object (or return an equal existing one)."""
         if fset is None or fset == {None}:
-            self.fset = set()
+            elements = frozenset()
+        elif type(fset) == frozenset:
+            elements = fset
+        elif type(fset) == set or type(fset) == list:
+            elements = frozenset(fset)
+        elif type(fset) == dict:
+            elements = frozenset(_hashify(fset))
         else:
-            if type(fset) == set:
-                self.fset = copy.deepcopy(fset)
-            elif type(fset) == list:
-                self.fset = set(fset)
-            elif type(fset) == dict:
-                self.fset = set(_hashify(fset))
-            else:
-                self.fset = {fset}
+            elements = frozenset([fset])
+
+        # types of elements distinguish the sets like {1} and {True}
+        key = frozenset(_typed(e) for e in elements)
+        finite_set = _finite_sets.get(key)
+        if finite_set is None:
+            finite_set = super().__new__(cls)
+            finite_set.fset = elements
+            _finite_sets[key] = finite_set
+        return finite_set
+
+    def __copy__(self):
+        """Return the set itself (finite sets are immutable)."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """Return the set itself (finite sets are immutable)."""
+        return self
+
+    def __reduce__(self):
+        """Reduce the set for pickling."""
+        return (FiniteSet, (self.fset, ))
+
+    def __eq__(self, other):
+        """Test equality with another set."""
+        return self is other or super().__eq__(other)
 
     def __str__(self):
         """String represenation of FiniteSet."""
@@ -208,19 +259,9 @@ class FiniteSet(AttributeSet):
                     if not other.match(str(element)):
                         return False
         elif isinstance(other, IntegerSet):
-            for element in self.fset:
-                if element is not None:
-                    if type(element) != int:
-                        try:
-                            element = int(element)
-                        except:
-                            raise AttributeSetError(
-                                "Element '%s' of a finite set is not an "
-                                "integer (%s)" %
-                                (str(element), str(type(element)))
-                            )
-                    if not other.contains(element):
-                        return False
+            elements = _integer_elements(
+                element for element in self.fset if element is not None)
+            return all(other.contains_many(elements))
         elif isinstance(other, EmptySet):
             return False
         elif isinstance(other, UniversalSet):
@@ -243,26 +284,17 @@ class FiniteSet(AttributeSet):
         if type(other) == set:
             return FiniteSet(self.fset.union(other))
         elif isinstance(other, FiniteSet):
+            if other.fset.issubset(self.fset):
+                return self
+            elif self.fset.issubset(other.fset):
+                return other
             return FiniteSet(self.fset.union(other.fset))
         elif isinstance(other, RegexSet):
             return RegexSet(self.fset).union(other)
         elif isinstance(other, IntegerSet):
-            int_elements = set()
-            for element in self.fset:
-                if type(element) != int:
-                    try:
-                        int_elements.add(int(element))
-                    except:
-                        raise AttributeSetError(
-                            "Element '%s' of a finite set is not an "
-                            "integer (%s)" %
-                            (str(element), str(type(element)))
-                        )
-                else:
-                    int_elements.add(element)
-            return IntegerSet(self.fset).union(other)
+            return IntegerSet(_integer_elements(self.fset)).union(other)
         elif isinstance(other, EmptySet):
-            return copy.deepcopy(self)
+            return self
         elif isinstance(other, UniversalSet):
             return UniversalSet()
         else:
@@ -282,8 +314,10 @@ class FiniteSet(AttributeSet):
         if type(other) == set:
             return FiniteSet(self.fset.intersection(other))
         elif isinstance(other, FiniteSet):
-            # print("here")
-            # print(other.fset, self.fset)
+            if self.fset.issubset(other.fset):
+                return self
+            elif other.fset.issubset(self.fset):
+                return other
             return FiniteSet(self.fset.intersection(other.fset))
         elif isinstance(other, RegexSet):
             intersection = []
@@ -292,21 +326,11 @@ class FiniteSet(AttributeSet):
                     intersection.append(element)
             return FiniteSet(intersection)
         elif isinstance(other, IntegerSet):
-            for element in self.fset:
-                if type(element) != int:
-                    try:
-                        element = int(element)
-                    except:
-                        raise AttributeSetError(
-                            "Element '%s' of a finite set is not an "
-                            "integer (%s)" %
-                            (str(element), str(type(element)))
-                        )
-            return IntegerSet(self.fset).intersection(other)
+            return IntegerSet(_integer_elements(self.fset)).intersection(other)
         elif isinstance(other, EmptySet):
             return EmptySet()
         elif isinstance(other, UniversalSet):
-            return copy.deepcopy(self)
+            return self
         else:
             raise AttributeSetError("Invalid type of attribute set!")
 
@@ -326,6 +350,8 @@ class FiniteSet(AttributeSet):
         if type(other) == set:
             return FiniteSet(self.fset.difference(other))
         elif isinstance(other, FiniteSet):
+            if self.fset.isdisjoint(other.fset):
+                return self
             return FiniteSet(self.fset.difference(other.fset))
         elif isinstance(other, RegexSet):
             elements_to_keep = []
@@ -334,19 +360,9 @@ class FiniteSet(AttributeSet):
                     elements_to_keep.append(element)
             return FiniteSet(elements_to_keep)
         elif isinstance(other, IntegerSet):
-            for element in self.fset:
-                if type(element) != int:
-                    try:
-                        element = int(element)
-                    except:
-                        raise AttributeSetError(
-                            "Element '%s' of a finite set is not an "
-                            "integer (%s)" %
-                            (str(element), str(type(element)))
-                        )
-            return IntegerSet(self.fset).difference(other)
+            return IntegerSet(_integer_elements(self.fset)).difference(other)
         elif isinstance(other, EmptySet):
-            return copy.deepcopy(self)
+            return self
         elif isinstance(other, UniversalSet):
             return FiniteSet()
         else:
@@ -373,12 +389,119 @@ class FiniteSet(AttributeSet):
         return json_data
 
     def update(self, element):
-        """Update finite set."""
-        self.fset.update(element)
+        """Update finite set (not supported, finite sets are immutable).
+
+        Raises
+        ------
+        AttributeSetError
+            Always, use `union` instead.
+        """
+        raise AttributeSetError(
+            "Finite sets are immutable, use 'union' instead of 'update'")
 
     def add(self, element):
-        """Add an element."""
-        self.fset.add(element)
+        """Add an element (not supported, finite sets are immutable).
+
+        Raises
+        ------
+        AttributeSetError
+            Always, use `union` instead.
+        """
+        raise AttributeSetError(
+            "Finite sets are immutable, use 'union' instead of 'add'")
+
+
+# Imported here rather than at the top: `regraph.utils` imports the
+# finite sets defined above
+from regraph.utils import _LRUCache
+
+
+# Caches of the objects derived from regex patterns, the same few patterns
+# are usually compared over and over when matching and checking typings
+_parsed_regexes = _LRUCache(1024)
+_regex_fsms = _LRUCache(1024)
+_compiled_regexes = _LRUCache(1024)
+_regex_inclusions = _LRUCache(8192)
+
+
+def _parse_regex(pattern):
+    """Get the parsed `greenery` expression of a pattern."""
+    return _parsed_regexes.get(pattern, lambda: parse(pattern))
+
+
+def _regex_fsm(pattern):
+    """Get the (determinized and reduced) FSM of a pattern."""
+    return _regex_fsms.get(
+        pattern, lambda: _parse_regex(pattern).to_fsm().reduce())
+
+
+def _compile_regex(pattern):
+    """Get the compiled `re` pattern."""
+    return _compiled_regexes.get(pattern, lambda: re.compile(pattern))
+
+
+def _regex_included(pattern, other_pattern):
+    """Test if the language of `pattern` is included in `other_pattern`."""
+    if pattern == other_pattern:
+        return True
+    return _regex_inclusions.get(
+        (pattern, other_pattern),
+        lambda: _regex_fsm(pattern).issubset(_regex_fsm(other_pattern)))
+
+
+def regex_cache_info():
+    """Get statistics of the caches used by `RegexSet` operations.
+
+    Parsed regular expressions, their finite state machines and
+    compiled `re` patterns are cached by pattern string, results
+    of inclusion tests are cached by pairs of patterns. All the
+    caches are bounded and discard the least recently used entries.
+
+    Returns
+    -------
+    info : dict
+        Dictionary whose keys are the names of the caches ("parsed",
+        "fsm", "compiled", "inclusion") and whose values are dictionaries
+        with the number of cache hits ("hits"), misses ("misses"),
+        cached entries ("size") and the maximum number of entries
+        ("maxsize")
+    """
+    return {
+        "parsed": _parsed_regexes.info(),
+        "fsm": _regex_fsms.info(),
+        "compiled": _compiled_regexes.info(),
+        "inclusion": _regex_inclusions.info()
+    }
+
+
+def set_regex_cache_size(maxsize, inclusion_maxsize=None):
+    """Set the maximum sizes of the caches used by `RegexSet` operations.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of patterns whose parsed expression,
+        FSM and compiled `re` pattern are kept
+    inclusion_maxsize : int, optional
+        Maximum number of cached inclusion results, by default
+        eight times `maxsize`
+    """
+    if inclusion_maxsize is None:
+        inclusion_maxsize = 8 * maxsize
+    if maxsize < 1 or inclusion_maxsize < 1:
+        raise AttributeSetError("Cache sizes should be positive")
+    _parsed_regexes.resize(maxsize)
+    _regex_fsms.resize(maxsize)
+    _compiled_regexes.resize(maxsize)
+    _regex_inclusions.resize(inclusion_maxsize)
+
+
+def clear_regex_cache():
+    """Clear the caches used by `RegexSet` operations and their statistics."""
+    _parsed_regexes.clear()
+    _regex_fsms.clear()
+    _compiled_regexes.clear()
+    _regex_inclusions.clear()
 
 
 class RegexSet(AttributeSet):
@@ -446,23 +569,21 @@ class RegexSet(AttributeSet):
         if self.pattern is None:
             return True
         else:
-            self_exp = parse(self.pattern)
-
             def included(a):
                 if isinstance(a, str):
-                    other_exp = parse(a)
+                    other_pattern = a
                 elif isinstance(a, re._pattern_type):
-                    other_exp = parse(a.pattern)
+                    other_pattern = a.pattern
                 elif isinstance(a, RegexSet):
                     if a.pattern:
-                        other_exp = parse(a.pattern)
+                        other_pattern = a.pattern
                     else:
                         return False
                 else:
                     raise AttributeSetError(
                         "Regexp object should be of type `str` or `re._pattern_type`!"
                     )
-                return (self_exp & other_exp.everythingbut()).empty()
+                return _regex_included(self.pattern, other_pattern)
 
             if isinstance(other, set):
                 res = True
@@ -587,7 +708,7 @@ class RegexSet(AttributeSet):
                 else:
                     return other_obj
 
-        self_exp = parse(self.pattern)
+        self_exp = _parse_regex(self.pattern)
 
         other_exp = []
         if isinstance(other, set):
@@ -595,7 +716,7 @@ class RegexSet(AttributeSet):
                 exp_str = _regex_to_string(exp)
                 if exp_str is None:
                     return RegexSet.empty()
-                other_exp.append(parse(exp_str))
+                other_exp.append(_parse_regex(exp_str))
         elif isinstance(other, UniversalSet):
             return copy.deepcopy(self)
         elif isinstance(other, EmptySet):
@@ -604,7 +725,7 @@ class RegexSet(AttributeSet):
             other_str = _regex_to_string(other)
             if other_str is None:
                 return RegexSet.empty()
-            other_exp.append(parse(other_str))
+            other_exp.append(_parse_regex(other_str))
 
         intersect_exp = self_exp
         for exp in other_exp:
@@ -649,14 +770,14 @@ class RegexSet(AttributeSet):
             for exp in other:
                 exp_str = _regex_to_string(exp)
                 if exp_str is not None:
-                    other_exp.append(parse(exp_str))
+                    other_exp.append(_parse_regex(exp_str))
         else:
             other_str = _regex_to_string(other)
             if other_str is not None:
-                other_exp.append(parse(other_str))
+                other_exp.append(_parse_regex(other_str))
             else:
                 return self.copy()
-        complement_exp = parse(self.pattern)
+        complement_exp = _parse_regex(self.pattern)
         for exp in other_exp:
             complement_exp = complement_exp.difference(exp)
 
@@ -693,7 +814,7 @@ class RegexSet(AttributeSet):
     def match(self, string):
         """Check if a string is in RegexSet."""
         if self.pattern is not None:
-            return re.compile(self.pattern).fullmatch(string) is not None
+            return _compile_regex(self.pattern).fullmatch(string) is not None
         else:
             return False
 
@@ -705,9 +826,43 @@ class RegexSet(AttributeSet):
         return json_data
 
 
+def _merge_intervals(intervals):
+    """Merge sorted intervals into disjoint non-adjacent intervals."""
+    merged = []
+    for start, end in intervals:
+        if len(merged) > 0 and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _integer_elements(elements):
+    """Convert elements of a finite collection to integers."""
+    int_elements = []
+    for element in elements:
+        if type(element) != int:
+            try:
+                element = int(element)
+            except:
+                raise AttributeSetError(
+                    "Element '%s' of a finite set is not an "
+                    "integer (%s)" %
+                    (str(element), str(type(element)))
+                )
+        int_elements.append(element)
+    return int_elements
+
+
 class IntegerSet(AttributeSet):
     """Set of integers defined by a list of disjoint intervals.
 
+    Intervals are kept sorted and normalized (disjoint and
+    non-adjacent), so that containment is tested by bisection
+    and set operations are performed by a single merge-style
+    sweep over the intervals of both sets.
+
     Attributes
     ----------
     intervals : list
@@ -721,8 +876,9 @@ class IntegerSet(AttributeSet):
         normalizes the intervals and singletons
         and creates a set of intervals and singletons.
         """
-        starts = list()
-        ends = list()
+        intervals = list()
+        if interval_list is None:
+            interval_list = []
         for interval in interval_list:
             try:
                 start, end = interval
@@ -736,48 +892,33 @@ class IntegerSet(AttributeSet):
                         start = int(start)
                     except OverflowError:
                         pass
-                    starts.append(start)
                     try:
                         end = int(end)
                     except OverflowError:
                         pass
-                    ends.append(end)
+                    intervals.append((start, end))
             except (TypeError, ValueError):
                 try:
                     interval = int(interval)
                 except OverflowError:
                     pass
-                starts.append(interval)
-                ends.append(interval)
-
-        new_intervals = list()
-        sorted_starts_ind = np.argsort(starts)
-        visited = set()
-        for i, index in enumerate(sorted_starts_ind):
-            if index not in visited:
-                visited.add(index)
-                current_end = ends[index]
-                for j in range(i + 1, len(sorted_starts_ind)):
-                    if starts[sorted_starts_ind[j]] - 1 > ends[index]:
-                        break
-                    else:
-                        visited.add(sorted_starts_ind[j])
-                        current_end = max(
-                            current_end, ends[sorted_starts_ind[j]]
-                        )
-                # in case new interval overlaps
-                # with newly constructed interval
-                if len(new_intervals) > 0 and\
-                   starts[index] <= new_intervals[-1][1] + 1:
-                    new_intervals[-1] = (
-                        new_intervals[-1][0],
-                        max(current_end, new_intervals[-1][1])
-                    )
-                else:
-                    new_intervals.append((starts[index], current_end))
-        self.intervals = new_intervals
+                intervals.append((interval, interval))
+        intervals.sort()
+        self._set_intervals(_merge_intervals(intervals))
         return
 
+    def _set_intervals(self, intervals):
+        """Set already normalized intervals of the set."""
+        self.intervals = intervals
+        self._starts = [start for start, _ in intervals]
+
+    @classmethod
+    def _from_intervals(cls, intervals):
+        """Create a set from sorted, disjoint and non-adjacent intervals."""
+        integer_set = cls.__new__(cls)
+        integer_set._set_intervals(intervals)
+        return integer_set
+
     def __str__(self):
         """String representation of IntegerSet obj."""
         interval_strs = []
@@ -798,46 +939,45 @@ class IntegerSet(AttributeSet):
 
     def issubset(self, other):
         """Test set inclusion for intervals of ints."""
-        for start, end in self.intervals:
-            found = False
-            for other_start, other_end in other.intervals:
-                if start >= other_start and end <= other_end:
-                    found = True
-                    break
-            if not found:
+        if isinstance(other, IntegerSet):
+            for start, end in self.intervals:
+                # a normalized interval is included in at most one interval
+                i = bisect.bisect_right(other._starts, start) - 1
+                if i < 0 or other.intervals[i][1] < end:
+                    return False
+            return True
+        elif isinstance(other, UniversalSet):
+            return True
+        elif isinstance(other, EmptySet):
+            return self.is_empty()
+        elif isinstance(other, FiniteSet):
+            if len(self.intervals) > 0 and (
+                    math.isinf(self.intervals[0][0]) or
+                    math.isinf(self.intervals[-1][1])):
                 return False
-        return True
+            size = sum(end - start + 1 for start, end in self.intervals)
+            if size > len(other.fset):
+                return False
+            for start, end in self.intervals:
+                for element in range(start, end + 1):
+                    if element not in other.fset:
+                        return False
+            return True
+        else:
+            return False
 
     def union(self, other):
         """Union of two integer sets."""
         if isinstance(other, IntegerSet):
-            return IntegerSet(self.intervals + other.intervals)
-
-        elif isinstance(other, set):
-            other_intervals = []
-            for element in other:
-                try:
-                    int_element = int(element)
-                except:
-                    raise AttributeSetError(
-                        "Set '{}' contains non-integer element '{}'".format(
-                            str(other), element))
-                if not self.contains(int_element):
-                    other_intervals.append((int_element, int_element))
-            return IntegerSet(self.intervals + other_intervals)
+            return IntegerSet._from_intervals(_merge_intervals(
+                heapq.merge(self.intervals, other.intervals)))
 
-        elif isinstance(other, FiniteSet):
-            other_intervals = []
-            for element in other.fset:
-                try:
-                    int_element = int(element)
-                except:
-                    raise AttributeSetError(
-                        "Set '{}' contains non-integer element '{}'".format(
-                            str(other), element))
-                if not self.contains(int_element):
-                    other_intervals.append((int_element, int_element))
-            return IntegerSet(self.intervals + other_intervals)
+        elif isinstance(other, set) or isinstance(other, FiniteSet):
+            if isinstance(other, FiniteSet):
+                elements = other.fset
+            else:
+                elements = other
+            return self.union(IntegerSet(_integer_elements(elements)))
 
         elif isinstance(other, UniversalSet):
             return UniversalSet()
@@ -850,45 +990,34 @@ class IntegerSet(AttributeSet):
 
     def intersection(self, other):
         """Intersection of two integer sets."""
-        def interval_intersect(interval1, interval2):
-            start1, end1 = interval1
-            start2, end2 = interval2
-            common_start = max(start1, start2)
-            common_end = min(end1, end2)
-            if common_start <= common_end:
-                return (common_start, common_end)
-            return None
-
-        new_intervals = []
         if isinstance(other, IntegerSet):
-            for interval1 in self.intervals:
-                for interval2 in other.intervals:
-                    common = interval_intersect(interval1, interval2)
-                    if common:
-                        new_intervals.append(common)
-            return IntegerSet(new_intervals)
-        elif isinstance(other, set):
-            try:
-                for element in other:
-                    int_element = int(element)
-                    if self.contains(int_element):
-                        new_intervals.append((int_element, int_element))
-                return IntegerSet(new_intervals)
-            except:
-                raise AttributeSetError(
-                    "Set '%s' contains non-integer elements!" % str(other)
-                )
-        elif isinstance(other, FiniteSet):
-            try:
-                for element in other.fset:
-                    int_element = int(element)
-                    if self.contains(int_element):
-                        new_intervals.append((int_element, int_element))
-                return IntegerSet(new_intervals)
-            except:
-                raise AttributeSetError(
-                    "Set '%s' contains non-integer elements!" % str(other)
-                )
+            new_intervals = []
+            i = 0
+            j = 0
+            while i < len(self.intervals) and j < len(other.intervals):
+                start1, end1 = self.intervals[i]
+                start2, end2 = other.intervals[j]
+                common_start = max(start1, start2)
+                common_end = min(end1, end2)
+                if common_start <= common_end:
+                    new_intervals.append((common_start, common_end))
+                if end1 < end2:
+                    i += 1
+                else:
+                    j += 1
+            return IntegerSet._from_intervals(new_intervals)
+        elif isinstance(other, set) or isinstance(other, FiniteSet):
+            if isinstance(other, FiniteSet):
+                elements = other.fset
+            else:
+                elements = other
+            int_elements = _integer_elements(elements)
+            return IntegerSet([
+                element
+                for element, found in zip(
+                    int_elements, self.contains_many(int_elements))
+                if found
+            ])
         elif isinstance(other, UniversalSet):
             return copy.deepcopy(self)
         elif isinstance(other, EmptySet):
@@ -900,45 +1029,37 @@ class IntegerSet(AttributeSet):
 
     def difference(self, other):
         """Difference of self with the other."""
-        def is_subinterval(a, b):
-            start_a, end_a = a
-            start_b, end_b = b
-            if start_a >= start_b and end_a <= end_b:
-                return True
-            return False
-
-        def create_cuts(small, large):
-            small_start, small_end = small
-            large_start, large_end = large
-            cuts = []
-            if small_start > large_start:
-                cuts.append((large_start, small_start - 1))
-            if small_end < large_end:
-                cuts.append((small_end + 1, large_end))
-            return cuts
+        if isinstance(other, set) or isinstance(other, FiniteSet):
+            return self.difference(self.intersection(other))
+        elif isinstance(other, UniversalSet):
+            return IntegerSet.empty()
+        elif isinstance(other, EmptySet):
+            return copy.deepcopy(self)
+        elif not isinstance(other, IntegerSet):
+            raise AttributeSetError(
+                "Cannot subtract '%s' from an integer set!" % str(other)
+            )
 
         new_intervals = []
-        intersect = self.intersection(other)
-        for interval1 in self.intervals:
-            cuts = [interval1]
-            for interval2 in intersect.intervals:
-                for i, cut in enumerate(cuts):
-                    if is_subinterval(interval2, cut):
-                        new_cuts = create_cuts(interval2, cut)
-                        cuts[i] = new_cuts
-                new_cuts = []
-                for subcuts in cuts:
-                    if isinstance(subcuts, list):
-                        for cut in subcuts:
-                            new_cuts.append(cut)
-                    else:
-                        new_cuts.append(subcuts)
-                cuts = new_cuts
-            if len(cuts) == 0:
-                new_intervals.append(interval1)
-            else:
-                new_intervals += cuts
-        return IntegerSet(new_intervals)
+        cuts = other.intervals
+        j = 0
+        for start, end in self.intervals:
+            while j < len(cuts) and cuts[j][1] < start:
+                j += 1
+            current = start
+            k = j
+            while k < len(cuts) and cuts[k][0] <= end:
+                cut_start, cut_end = cuts[k]
+                if cut_start > current:
+                    new_intervals.append((current, cut_start - 1))
+                if cut_end >= end:
+                    current = None
+                    break
+                current = cut_end + 1
+                k += 1
+            if current is not None:
+                new_intervals.append((current, end))
+        return IntegerSet._from_intervals(new_intervals)
 
     @classmethod
     def universal(cls):
@@ -952,11 +1073,11 @@ class IntegerSet(AttributeSet):
 
     def is_universal(self):
         """Test universality."""
-        return self == IntegerSet.universal()
+        return self.intervals == [(-math.inf, math.inf)]
 
     def is_empty(self):
         """Test if empty."""
-        return self == IntegerSet.empty()
+        return len(self.intervals) == 0
 
     @classmethod
     def from_finite_set(cls, s):
@@ -972,12 +1093,38 @@ class IntegerSet(AttributeSet):
 
     def contains(self, num):
         """Test if provided integer is in integer set."""
-        found = False
-        for start, end in self.intervals:
-            if num >= start and num <= end:
-                found = True
+        i = bisect.bisect_right(self._starts, num) - 1
+        return i >= 0 and num <= self.intervals[i][1]
+
+    def contains_many(self, nums):
+        """Test if provided integers are in integer set.
+
+        Sorts the integers and sweeps them against the intervals
+        of the set, which is faster than calling `contains` for
+        every integer of a large collection.
+
+        Parameters
+        ----------
+        nums : iterable or FiniteSet
+            Collection of integers to test
+
+        Returns
+        -------
+        List of booleans, one per integer in the iteration order
+        of `nums`, indicating whether the integer is in the set
+        """
+        if isinstance(nums, FiniteSet):
+            nums = nums.fset
+        nums = list(nums)
+        result = [False] * len(nums)
+        j = 0
+        for i in sorted(range(len(nums)), key=nums.__getitem__):
+            while j < len(self.intervals) and self.intervals[j][1] < nums[i]:
+                j += 1
+            if j == len(self.intervals):
                 break
-        return found
+            result[i] = self.intervals[j][0] <= nums[i]
+        return result
 
     def to_json(self):
         """JSON represenation of IntegerSet."""
@@ -993,7 +1140,7 @@ class IntegerSet(AttributeSet):
                 new_end = "inf"
             else:
                 new_end = end
-        json_data["data"].append([new_start, new_end])
+            json_data["data"].append([new_start, new_end])
 
         return json_data
 
@@ -6,11 +6,16 @@ provide version control for transformations of graphs and graph hierarchies:
 * `Versioning`, abstract class for in-memory versioning of objects;
 * `VersionedGraph`, wrapper around graph objects in ReGraph that allows to track their audit trail;
 * `VersionedHierarchy`, wrapper around hierarchy objects in ReGraph that allows to track their audit trail;
+* `RevisionStore`, abstract class for storages of the deltas of revision graphs;
+* `SQLiteRevisionStore`, storage of the deltas of revision graphs in an SQLite database.
 """
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 import copy
 import datetime
+import pickle
+import sqlite3
 import uuid
 import warnings
 
@@ -22,7 +27,10 @@ from regraph.rules import (compose_rules, Rule,
                            _create_merging_rule_hierarchy,
                            compose_rule_hierarchies,
                            invert_rule_hierarchy)
-from regraph.utils import keys_by_value
+from regraph.utils import (keys_by_value,
+                           attrs_from_json,
+                           load_nodes_from_json,
+                           load_edges_from_json)
 
 
 def _generate_new_commit_meta_data():
@@ -31,6 +39,101 @@ def _generate_new_commit_meta_data():
     return time, commit_id
 
 
+class RevisionStore(ABC):
+    """Abstract class for storages of the deltas of revision graphs.
+
+    By default, versioning objects keep the deltas of commits
+    in the edges of their revision graphs. A revision store allows
+    to keep them elsewhere (e.g. on disk) and to load them only
+    when they are needed.
+    """
+
+    @abstractmethod
+    def add_delta(self, source, target, delta):
+        """Store the delta of the revision graph edge `source->target`."""
+        pass
+
+    @abstractmethod
+    def get_delta(self, source, target):
+        """Get the delta of the revision graph edge `source->target`."""
+        pass
+
+    @abstractmethod
+    def remove_delta(self, source, target):
+        """Remove the delta of the revision graph edge `source->target`."""
+        pass
+
+
+class SQLiteRevisionStore(RevisionStore):
+    """Storage of the deltas of revision graphs in an SQLite database.
+
+    Deltas are pickled and stored in the table `deltas` of the
+    database, the most recently used ones are cached in memory.
+
+    Attributes
+    ----------
+    filename : str
+        Path to the database file (':memory:' for an in-memory database)
+    cache_size : int
+        Maximum number of deltas cached in memory
+    """
+
+    def __init__(self, filename=":memory:", cache_size=128):
+        """Initialize the store, create the database if needed."""
+        self.filename = filename
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS deltas ("
+            "source TEXT, target TEXT, delta BLOB, "
+            "PRIMARY KEY (source, target))")
+        self._connection.commit()
+
+    def _cache_delta(self, key, delta):
+        self._cache[key] = delta
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def add_delta(self, source, target, delta):
+        """Store the delta of the revision graph edge `source->target`."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO deltas VALUES (?, ?, ?)",
+            (source, target, pickle.dumps(delta)))
+        self._connection.commit()
+        self._cache_delta((source, target), delta)
+
+    def get_delta(self, source, target):
+        """Get the delta of the revision graph edge `source->target`."""
+        key = (source, target)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        row = self._connection.execute(
+            "SELECT delta FROM deltas WHERE source = ? AND target = ?",
+            key).fetchone()
+        if row is None:
+            raise RevisionError(
+                "No delta is stored for the revision '{}->{}'".format(
+                    source, target))
+        delta = pickle.loads(row[0])
+        self._cache_delta(key, delta)
+        return delta
+
+    def remove_delta(self, source, target):
+        """Remove the delta of the revision graph edge `source->target`."""
+        self._cache.pop((source, target), None)
+        self._connection.execute(
+            "DELETE FROM deltas WHERE source = ? AND target = ?",
+            (source, target))
+        self._connection.commit()
+
+    def close(self):
+        """Close the connection to the database."""
+        self._connection.close()
+
+
 class Versioning(ABC):
     """Class for version control.
 
@@ -39,9 +142,35 @@ class Versioning(ABC):
     _current_branch
         Name of the current branch
     _deltas : dict
-        Dictionary with delta's to all other branches
+        Dictionary with delta's to all other branches, the delta
+        of a branch is relative to the version of the object
+        at its position in the chain of pending deltas (`None`
+        if the delta is to be computed from the revision graph)
+    _delta_positions : dict
+        Dictionary with positions of the deltas of branches
+        in the chain of pending deltas
+    _pending_deltas : list
+        Chain of inverted deltas of the commits (and branch switches)
+        that are not yet composed with the deltas of other branches
+    _pending_offset : int
+        Position of the first delta in the chain of pending deltas
+    _compaction_interval : int
+        Number of pending deltas after which they are composed
+        with the deltas of all the branches (`None` if the pending
+        deltas are composed only when needed)
+    _checkpoint_interval : int
+        Number of commits after which a checkpoint (snapshot of
+        the versioned object) is stored in the revision graph
+        (`None` if no checkpoints are stored)
     _heads : dict
     _revision_graph : networkx.DiGraph
+        Revision graph whose nodes are commits and whose edges
+        have the deltas between commits, nodes with checkpoints
+        have the snapshot of the versioned object in the
+        'checkpoint' attribute
+    _revision_store : RevisionStore
+        Storage of the deltas of the revision graph (`None` if
+        deltas are stored in the edges of the revision graph)
 
     Methods
     -------
@@ -51,26 +180,37 @@ class Versioning(ABC):
     branch(new_branch)
     switch_branch(branch)
     merge(branch1, branch2)
+    compact_deltas()
 
     _compose_deltas
     _invert_delta
     _merge_into_current_branch
     _create_identity_delta
     _compose_delta_path
+    _create_snapshot
+    _restore_snapshot
     """
 
     def __init__(self, init_branch="master", current_branch=None,
-                 deltas=None, heads=None, revision_graph=None):
+                 deltas=None, heads=None, revision_graph=None,
+                 compaction_interval=None, checkpoint_interval=None,
+                 revision_store=None):
         """Initialize revision object."""
         if current_branch is None:
             self._current_branch = init_branch
         else:
             self._current_branch = current_branch
 
-        if deltas is None:
-            self._deltas = {}
-        else:
-            self._deltas = deltas
+        self._pending_deltas = []
+        self._pending_offset = 0
+        self._compaction_interval = compaction_interval
+        self._checkpoint_interval = checkpoint_interval
+        self._revision_store = revision_store
+        self._deltas = {}
+        self._delta_positions = {}
+        if deltas is not None:
+            for branch, delta in deltas.items():
+                self._set_delta(branch, delta)
 
         if heads is None:
             # Create initial commit
@@ -84,9 +224,13 @@ class Versioning(ABC):
                 message="Initial commit",
                 time=time
             )
+            if self._checkpoint_interval is not None:
+                self._revision_graph.nodes[commit_id]["checkpoint"] =\
+                    self._create_snapshot()
         else:
             self._heads = heads
             self._revision_graph = revision_graph
+            self._store_revision_graph_deltas()
 
     def initial_commit(self):
         """Return the id of the initial commit."""
@@ -118,23 +262,175 @@ class Versioning(ABC):
         """Abstract method for creating an identity-delta."""
         pass
 
+    @abstractmethod
+    def _create_snapshot(self):
+        """Abstract method for creating a snapshot of the versioned object."""
+        pass
+
+    @abstractmethod
+    def _restore_snapshot(self, snapshot):
+        """Abstract method for restoring the versioned object."""
+        pass
+
+    def _add_revision(self, source, target, delta):
+        """Add an edge with a delta to the revision graph."""
+        if self._revision_store is None:
+            self._revision_graph.add_edge(source, target, delta=delta)
+        else:
+            self._revision_graph.add_edge(source, target)
+            self._revision_store.add_delta(source, target, delta)
+
+    def _get_revision_delta(self, source, target):
+        """Get the delta of an edge of the revision graph."""
+        if self._revision_store is None:
+            return self._revision_graph.adj[source][target]["delta"]
+        else:
+            return self._revision_store.get_delta(source, target)
+
+    def _remove_commit(self, commit):
+        """Remove a commit from the revision graph."""
+        if self._revision_store is not None:
+            for s, t in list(self._revision_graph.in_edges(commit)) +\
+                    list(self._revision_graph.out_edges(commit)):
+                self._revision_store.remove_delta(s, t)
+        self._revision_graph.remove_node(commit)
+
+    def _store_revision_graph_deltas(self):
+        """Move the deltas of the revision graph to the revision store."""
+        if self._revision_store is not None:
+            for s, t, delta in self._revision_graph.edges(data="delta"):
+                if delta is not None:
+                    self._revision_store.add_delta(s, t, delta)
+                    del self._revision_graph.adj[s][t]["delta"]
+
     def _compose_delta_path(self, path):
         if len(path) > 1:
-            result_delta = self._revision_graph.adj[
-                path[0]][path[1]]["delta"]
+            result_delta = self._get_revision_delta(path[0], path[1])
             previous_commit = path[1]
             for current_commit in path[2:]:
                 result_delta = self._compose_deltas(
                     result_delta,
-                    self._revision_graph.adj[
-                        previous_commit][current_commit]["delta"])
-
-                d = self._revision_graph.adj[previous_commit][current_commit]["delta"]
+                    self._get_revision_delta(
+                        previous_commit, current_commit))
                 previous_commit = current_commit
             return result_delta
         else:
             return self._create_identity_delta()
 
+    def _common_ancestor(self, commit1, commit2):
+        """Find a closest common ancestor of two commits."""
+        ancestors = nx.ancestors(self._revision_graph, commit1)
+        ancestors.add(commit1)
+        for n in nx.bfs_tree(
+                self._revision_graph, commit2, reverse=True).nodes():
+            if n in ancestors:
+                return n
+
+    def _delta_between_commits(self, commit1, commit2):
+        """Compute the delta between the versions at two commits."""
+        ancestor = self._common_ancestor(commit1, commit2)
+        return self._compose_deltas(
+            self._invert_delta(self._compose_delta_path(
+                nx.shortest_path(self._revision_graph, ancestor, commit1))),
+            self._compose_delta_path(
+                nx.shortest_path(self._revision_graph, ancestor, commit2)))
+
+    def _path_from_checkpoint(self, commit, max_length=None):
+        """Find a path from the closest checkpoint to a commit.
+
+        Returns `None` if there are no checkpoints among the
+        ancestors of the commit at distance at most `max_length`.
+        """
+        successors = {commit: None}
+        frontier = [commit]
+        length = 0
+        while len(frontier) > 0:
+            for n in frontier:
+                if "checkpoint" in self._revision_graph.nodes[n]:
+                    path = [n]
+                    while successors[path[-1]] is not None:
+                        path.append(successors[path[-1]])
+                    return path
+            if max_length is not None and length >= max_length:
+                break
+            next_frontier = []
+            for n in frontier:
+                for p in self._revision_graph.predecessors(n):
+                    if p not in successors:
+                        successors[p] = n
+                        next_frontier.append(p)
+            frontier = next_frontier
+            length += 1
+        return None
+
+    def _restore_commit(self, path):
+        """Restore the checkpoint at the start of the path and replay it."""
+        self._restore_snapshot(
+            self._revision_graph.nodes[path[0]]["checkpoint"])
+        for s, t in zip(path[:-1], path[1:]):
+            self._apply_delta(self._get_revision_delta(s, t))
+
+    def _set_delta(self, branch, delta):
+        """Set the delta from the current version to the head of a branch."""
+        self._deltas[branch] = delta
+        if delta is not None:
+            self._delta_positions[branch] =\
+                self._pending_offset + len(self._pending_deltas)
+        else:
+            self._delta_positions.pop(branch, None)
+
+    def _get_delta(self, branch):
+        """Get the delta from the current version to the head of a branch.
+
+        Composes the pending deltas with the delta of the branch,
+        or computes the delta from the revision graph if it is unknown.
+        """
+        delta = self._deltas[branch]
+        if delta is None:
+            delta = self._delta_between_commits(
+                self._heads[self._current_branch], self._heads[branch])
+        elif self._delta_positions[branch] - self._pending_offset <\
+                len(self._pending_deltas):
+            start = self._delta_positions[branch] - self._pending_offset
+            for pending_delta in self._pending_deltas[start:]:
+                delta = self._compose_deltas(pending_delta, delta)
+        else:
+            return delta
+        # pending deltas and deltas of the revision graph are shared
+        # and composition may return one of them, so refine a copy
+        delta = copy.deepcopy(delta)
+        self._refine_delta(delta)
+        self._set_delta(branch, delta)
+        self._trim_pending_deltas()
+        return delta
+
+    def _remove_delta(self, branch):
+        """Remove the delta of a branch."""
+        del self._deltas[branch]
+        self._delta_positions.pop(branch, None)
+        self._trim_pending_deltas()
+
+    def _reset_deltas(self):
+        """Forget the deltas of all branches (computed when needed)."""
+        self._deltas = {}
+        self._delta_positions = {}
+        self._pending_deltas = []
+        for branch in self._heads.keys():
+            if branch != self._current_branch:
+                self._set_delta(branch, None)
+
+    def _trim_pending_deltas(self):
+        """Drop the pending deltas composed with the deltas of all branches."""
+        end = self._pending_offset + len(self._pending_deltas)
+        first_position = min(self._delta_positions.values(), default=end)
+        del self._pending_deltas[:first_position - self._pending_offset]
+        self._pending_offset = first_position
+
+    def compact_deltas(self):
+        """Compose the pending deltas with the deltas of all branches."""
+        for branch in list(self._deltas.keys()):
+            self._get_delta(branch)
+
     def branches(self):
         """Return list of branches."""
         return list(self._heads.keys())
@@ -168,17 +464,21 @@ class Versioning(ABC):
             time=time,
             message=message if message is not None else "",
             **kwargs)
-        self._revision_graph.add_edge(
-            previous_commit, commit_id, delta=delta)
-
-        d = self._revision_graph.adj[previous_commit][commit_id]["delta"]
-
-        # Update deltas
-        for branch, branch_delta in self._deltas.items():
-            self._deltas[branch] = self._compose_deltas(
-                self._invert_delta(delta), branch_delta)
-
-            self._refine_delta(self._deltas[branch])
+        self._add_revision(previous_commit, commit_id, delta)
+
+        if self._checkpoint_interval is not None and\
+           self._path_from_checkpoint(
+                commit_id, self._checkpoint_interval - 1) is None:
+            self._revision_graph.nodes[commit_id]["checkpoint"] =\
+                self._create_snapshot()
+
+        # Update deltas (the inverted delta of the commit is composed
+        # with the deltas of other branches only when they are needed)
+        if len(self._delta_positions) > 0:
+            self._pending_deltas.append(self._invert_delta(delta))
+            if self._compaction_interval is not None and\
+               len(self._pending_deltas) >= self._compaction_interval:
+                self.compact_deltas()
         return commit_id
 
     def switch_branch(self, branch):
@@ -189,24 +489,41 @@ class Versioning(ABC):
         if branch == self._current_branch:
             warnings.warn("Already in branch '{}'".format(branch), RevisionWarning)
 
-        # Set as the current branch
         previous_branch = self._current_branch
-        self._current_branch = branch
 
-        # Apply delta to the versioned object
+        # Restore the head of the branch from a checkpoint, if
+        # this requires less deltas than composing its delta
         delta = self._deltas[branch]
+        if delta is None:
+            max_length = None
+        else:
+            max_length = self._pending_offset + len(self._pending_deltas) -\
+                self._delta_positions[branch]
+        path = None
+        if self._checkpoint_interval is not None and (
+                max_length is None or max_length > 0):
+            path = self._path_from_checkpoint(
+                self._heads[branch], max_length)
+        if path is not None:
+            self._current_branch = branch
+            self._restore_commit(path)
+            self._reset_deltas()
+            return
+
+        # Compute the delta from the head of the previous branch
+        # (before switching, unknown deltas are computed from the
+        # head of the current branch) and apply it
+        delta = self._get_delta(branch)
+        self._current_branch = branch
         self._apply_delta(delta)
-        self._deltas[previous_branch] = self._invert_delta(delta)
-
-        # Recompute deltas
-        for name, another_delta in self._deltas.items():
-            if name != previous_branch:
-                self._deltas[name] = self._compose_deltas(
-                    self._deltas[previous_branch],
-                    another_delta
-                )
+        self._remove_delta(branch)
 
-        del self._deltas[self._current_branch]
+        # Deltas of other branches are to be composed with
+        # the inverted delta
+        inverted_delta = self._invert_delta(delta)
+        if len(self._delta_positions) > 0:
+            self._pending_deltas.append(inverted_delta)
+        self._set_delta(previous_branch, inverted_delta)
 
     def branch(self, new_branch, message=None):
         """Create a new branch with identity commit."""
@@ -224,15 +541,15 @@ class Versioning(ABC):
 
         identity_delta = self._create_identity_delta()
 
-        # Add a new delta
-        self._deltas[previous_branch] = identity_delta
-
         # Create a new identity commit
         commit_id = self.commit(
             identity_delta,
             message=message,
             previous_commit=previous_commit)
         self._heads[self._current_branch] = commit_id
+
+        # Add a new delta
+        self._set_delta(previous_branch, self._create_identity_delta())
         return commit_id
 
     def merge_with(self, branch, message=None):
@@ -245,18 +562,16 @@ class Versioning(ABC):
             message = "Merged branch '{}' into '{}'".format(
                 branch, self._current_branch)
 
-        delta = self._deltas[branch]
+        delta = self._get_delta(branch)
         delta_to_current, delta_to_branch = self._merge_into_current_branch(
             delta)
 
         commit_id = self.commit(delta_to_current, message=message)
 
-        self._revision_graph.add_edge(
-            self._heads[branch], commit_id,
-            delta=delta_to_branch)
+        self._add_revision(self._heads[branch], commit_id, delta_to_branch)
 
         del self._heads[branch]
-        del self._deltas[branch]
+        self._remove_delta(branch)
         return commit_id
 
     def rollback(self, rollback_commit, message=None):
@@ -279,135 +594,65 @@ class Versioning(ABC):
         if message is None:
             message = "Rollback to commit '{}'".format(rollback_commit)
 
-        # Generate a big rollback commit
-        rollback_delta = self._invert_delta(
-            self._compose_delta_path(shortest_path))
-
-        # Apply the rollback commit
-        self._apply_delta(rollback_delta)
-
-        # Compute all paths from every head to the commit
-        head_paths = {}
-        for h in self._heads.values():
-            head_paths[h] = list(nx.all_simple_paths(
-                self._revision_graph, rollback_commit, h))
+        # Restore the rollback commit from a checkpoint, if this
+        # requires less deltas than inverting the path to the head
+        path = None
+        if self._checkpoint_interval is not None and len(shortest_path) > 1:
+            path = self._path_from_checkpoint(
+                rollback_commit, len(shortest_path) - 2)
+        if path is not None:
+            self._restore_commit(path)
+        else:
+            # Generate a big rollback commit
+            rollback_delta = self._invert_delta(
+                self._compose_delta_path(shortest_path))
+
+            # Apply the rollback commit
+            self._apply_delta(rollback_delta)
+
+        # Commits on the paths from the commit to the heads (descendants
+        # of the commit that are ancestors of some head) are removed
+        descendants = nx.descendants(self._revision_graph, rollback_commit)
+        removed_commits = set()
+        stack = [h for h in self._heads.values() if h in descendants]
+        while len(stack) > 0:
+            n = stack.pop()
+            if n not in removed_commits:
+                removed_commits.add(n)
+                stack += [
+                    p for p in self._revision_graph.predecessors(n)
+                    if p in descendants
+                ]
 
         # Compute new head commits (commits whose successors
         # are merge commits to be removed)
         new_heads = {}
-        removed_commits = set(
-            [n for pp in head_paths.values() for p in pp for n in p if n != rollback_commit])
         for n in self._revision_graph.nodes():
             for s in self._revision_graph.successors(n):
                 if n not in removed_commits and s in removed_commits:
-                    new_heads[self._revision_graph.nodes[n]["branch"]] = (n, s)
+                    new_heads[self._revision_graph.nodes[n]["branch"]] = n
 
-        # Recompute deltas
         new_current_branch = self._revision_graph.nodes[rollback_commit]["branch"]
         self._current_branch = new_current_branch
         self._heads[self._current_branch] = rollback_commit
 
-        # Find a branching point from the rollback commit
-        rollback_bfs_from_commit = nx.bfs_tree(
-            self._revision_graph, rollback_commit, reverse=True)
-
-        rollback_branching_point = None
-        for n in rollback_bfs_from_commit.nodes():
-            if self._revision_graph.nodes[n]["branch"] !=\
-                    self._current_branch:
-                rollback_branching_point = n
-                break
-
-        # Update deltas of the preserved heads
-        for head, commit in self._heads.items():
-            if head != self._current_branch:
-                # Find a branching point from the head
-                head_bfs_from_commit = nx.bfs_tree(
-                    self._revision_graph, commit, reverse=True)
-
-                head_branching_point = None
-                for n in head_bfs_from_commit.nodes():
-                    if self._revision_graph.nodes[n]["branch"] != head:
-                        head_branching_point = n
-                        break
-
-                if rollback_branching_point:
-                    # Rollback in a branched part of the revision graph
-                    try:
-                        # Rollback happened before head
-                        branching_to_head = nx.shortest_path(
-                            self._revision_graph, rollback_branching_point, commit)
-                        branching_to_rollback = nx.shortest_path(
-                            self._revision_graph, rollback_branching_point, rollback_commit)
-                        self._deltas[head] = self._compose_deltas(
-                            self._invert_delta(self._compose_delta_path(branching_to_rollback)),
-                            self._compose_delta_path(branching_to_head)
-                        )
-                    except nx.NetworkXNoPath:
-                        if head_branching_point:
-                            try:
-                                # Rollback happened after head
-                                branching_to_rollback = nx.shortest_path(
-                                    self._revision_graph,
-                                    head_branching_point, rollback_commit)
-                                branching_to_head = nx.shortest_path(
-                                    self._revision_graph,
-                                    head_branching_point, commit)
-                                self._deltas[head] = self._compose_deltas(
-                                    self._invert_delta(self._compose_delta_path(
-                                        branching_to_rollback)),
-                                    self._compose_delta_path(branching_to_head)
-                                )
-                            except:
-                                # Rollback and head are disjoint,
-                                # so no delta to compute (no undirected path)
-                                pass
-                else:
-                    # Rollback in an unbranched part of the revision graph
-                    # So head can be only in a branched part and only before
-                    # the rollback commit (otherwise removed)
-                    if head_branching_point:
-                        branching_to_head = nx.shortest_path(
-                            self._revision_graph, head_branching_point, commit)
-                        branching_to_rollback = nx.shortest_path(
-                            self._revision_graph,
-                            head_branching_point, rollback_commit)
-
-                        delta_branching_to_rollback = self._compose_delta_path(
-                            branching_to_rollback)
-                        delta_branching_to_head = self._compose_delta_path(
-                            branching_to_head)
-                        self._deltas[head] = self._compose_deltas(
-                            self._invert_delta(delta_branching_to_rollback),
-                            delta_branching_to_head
-                        )
-
-                if head in self._deltas:
-                    self._refine_delta(self._deltas[head])
-
-        # Compute deltas of the new heads
-        for branch, (head_commit, merge_commit)in new_heads.items():
-            path_to_merge = nx.shortest_path(
-                self._revision_graph, rollback_commit, merge_commit)
-            delta_to_merge = self._compose_delta_path(path_to_merge)
-            head_to_merge = self._revision_graph.adj[
-                head_commit][merge_commit]["delta"]
-            self._deltas[branch] = self._compose_deltas(
-                delta_to_merge,
-                self._invert_delta(head_to_merge))
-            self._refine_delta(self._deltas[branch])
-            self._heads[branch] = head_commit
-            print("Created the new head for '{}'".format(branch))
+        for branch, head_commit in new_heads.items():
+            if branch != self._current_branch:
+                self._heads[branch] = head_commit
+                print("Created the new head for '{}'".format(branch))
 
         # All paths to the heads originating from the commit to
         # which we rollaback are removed
         for c in removed_commits:
-            if c != rollback_commit:
-                self._revision_graph.remove_node(c)
-                if c in self._heads.values():
-                    for h in keys_by_value(self._heads, c):
-                        print("Removed a head for '{}'".format(h))
-                        del self._heads[h]
+            self._remove_commit(c)
+            if c in self._heads.values():
+                for h in keys_by_value(self._heads, c):
+                    print("Removed a head for '{}'".format(h))
+                    del self._heads[h]
+
+        # Deltas of the remaining heads are computed from
+        # the revision graph when needed
+        self._reset_deltas()
 
     def _revision_graph_to_json(self):
         data = {
@@ -415,19 +660,23 @@ class Versioning(ABC):
             "edges": []
         }
         for n in self._revision_graph.nodes():
-            data["nodes"].append({
+            node_json = {
                 "id": n,
                 "branch": self._revision_graph.nodes[n]["branch"],
                 "time": self._revision_graph.nodes[n]["time"].strftime(
                     "%d/%m/%Y %H:%M:%S"),
                 "message": self._revision_graph.nodes[n]["message"]
-            })
+            }
+            if "checkpoint" in self._revision_graph.nodes[n]:
+                node_json["checkpoint"] =\
+                    self._revision_graph.nodes[n]["checkpoint"]
+            data["nodes"].append(node_json)
         for (s, t) in self._revision_graph.edges():
             data["edges"].append({
                 "from": s,
                 "to": t,
                 "delta": self._delta_to_json(
-                    self._revision_graph.adj[s][t]["delta"])
+                    self._get_revision_delta(s, t))
             })
         return data
 
@@ -441,6 +690,9 @@ class Versioning(ABC):
                 time=datetime.datetime.strptime(
                     node_json["time"], "%d/%m/%Y %H:%M:%S"),
                 message=node_json["message"])
+            if "checkpoint" in node_json:
+                revision_graph.nodes[node_json["id"]]["checkpoint"] =\
+                    node_json["checkpoint"]
         for edge_json in json_data["edges"]:
             revision_graph.add_edge(
                 edge_json["from"],
@@ -462,6 +714,7 @@ class Versioning(ABC):
         """Convert versioning object to JSON."""
         data = {}
         data["current_branch"] = self._current_branch
+        self.compact_deltas()
         data["deltas"] = {}
         for k, v in self._deltas.items():
             data["deltas"][k] = self._delta_to_json(v)
@@ -473,25 +726,34 @@ class Versioning(ABC):
     def from_json(self, json_data):
         """Retrieve versioning object from JSON."""
         self._current_branch = json_data["current_branch"]
-        self._deltas = {
-            k: self._delta_from_json(v)
-            for k, v in json_data["deltas"].items()}
+        self._pending_deltas = []
+        self._pending_offset = 0
+        self._deltas = {}
+        self._delta_positions = {}
+        for k, v in json_data["deltas"].items():
+            self._set_delta(k, self._delta_from_json(v))
         self._heads = json_data["heads"]
         self._revision_graph = self._revision_graph_from_json(
             json_data["revision_graph"])
+        self._store_revision_graph_deltas()
 
 
 class VersionedGraph(Versioning):
     """Class for versioned hierarchies."""
 
     def __init__(self, graph, init_branch="master", current_branch=None,
-                 deltas=None, heads=None, revision_graph=None):
+                 deltas=None, heads=None, revision_graph=None,
+                 compaction_interval=None, checkpoint_interval=None,
+                 revision_store=None):
         """Initialize versioned graph object."""
         self.graph = graph
         super().__init__(init_branch=init_branch,
                          current_branch=current_branch,
                          deltas=deltas, heads=heads,
-                         revision_graph=revision_graph)
+                         revision_graph=revision_graph,
+                         compaction_interval=compaction_interval,
+                         checkpoint_interval=checkpoint_interval,
+                         revision_store=revision_store)
 
     def _refine_delta(self, delta):
         lhs = delta["rule"].refine(self.graph, delta["lhs_instance"])
@@ -542,6 +804,17 @@ class VersionedGraph(Versioning):
         }
         return identity_delta
 
+    def _create_snapshot(self):
+        """Create a snapshot of the current graph version."""
+        return self.graph.to_json()
+
+    def _restore_snapshot(self, snapshot):
+        """Restore the graph version from a snapshot."""
+        for n in list(self.graph.nodes()):
+            self.graph.remove_node(n)
+        self.graph.add_nodes_from(load_nodes_from_json(snapshot))
+        self.graph.add_edges_from(load_edges_from_json(snapshot))
+
     def _apply_delta(self, delta, relabel=True):
         """Apply delta to the current graph version."""
 
@@ -619,9 +892,9 @@ class VersionedGraph(Versioning):
         return delta
 
     @classmethod
-    def from_json(cls, graph, json_data):
+    def from_json(cls, graph, json_data, revision_store=None):
         """Retrieve versioning object from JSON."""
-        obj = cls(graph)
+        obj = cls(graph, revision_store=revision_store)
         super(VersionedGraph, cls).from_json(obj, json_data)
         return obj
 
@@ -630,12 +903,17 @@ class VersionedHierarchy(Versioning):
     """Class for versioned hierarchies."""
 
     def __init__(self, hierarchy, init_branch="master", current_branch=None,
-                 deltas=None, heads=None, revision_graph=None):
+                 deltas=None, heads=None, revision_graph=None,
+                 compaction_interval=None, checkpoint_interval=None,
+                 revision_store=None):
         """Initialize versioned hierarchy object."""
         self.hierarchy = hierarchy
         super().__init__(init_branch=init_branch, current_branch=current_branch,
                          deltas=deltas, heads=heads,
-                         revision_graph=revision_graph)
+                         revision_graph=revision_graph,
+                         compaction_interval=compaction_interval,
+                         checkpoint_interval=checkpoint_interval,
+                         revision_store=revision_store)
 
     def _refine_delta(self, delta):
         lhs_instances = self.hierarchy.refine_rule_hierarchy(
@@ -694,6 +972,29 @@ class VersionedHierarchy(Versioning):
         }
         return identity_delta
 
+    def _create_snapshot(self):
+        """Create a snapshot of the current hierarchy version."""
+        return self.hierarchy.to_json()
+
+    def _restore_snapshot(self, snapshot):
+        """Restore the hierarchy version from a snapshot."""
+        for graph in list(self.hierarchy.graphs()):
+            self.hierarchy.remove_graph(graph)
+        for graph_data in snapshot["graphs"]:
+            self.hierarchy.add_graph_from_json(
+                graph_data["id"], graph_data["graph"],
+                attrs_from_json(graph_data["attrs"]))
+        for typing_data in snapshot["typing"]:
+            self.hierarchy.add_typing(
+                typing_data["from"], typing_data["to"],
+                typing_data["mapping"],
+                attrs_from_json(typing_data["attrs"]), check=False)
+        for relation_data in snapshot["relations"]:
+            self.hierarchy.add_relation(
+                relation_data["from"], relation_data["to"],
+                {a: set(b) for a, b in relation_data["rel"].items()},
+                attrs_from_json(relation_data["attrs"]))
+
     def _apply_delta(self, delta, relabel=True):
         """Apply delta to the current hierarchy version."""
 
@@ -812,8 +1113,8 @@ class VersionedHierarchy(Versioning):
         return delta
 
     @classmethod
-    def from_json(cls, hierarchy, json_data):
+    def from_json(cls, hierarchy, json_data, revision_store=None):
         """Retrieve versioning object from JSON."""
-        obj = cls(hierarchy)
+        obj = cls(hierarchy, revision_store=revision_store)
         super(VersionedHierarchy, cls).from_json(obj, json_data)
         return obj
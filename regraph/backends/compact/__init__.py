@@ -0,0 +1,3 @@
+"""Compact in-memory backend."""
+
+from regraph.backends.compact.graphs import CompactGraph
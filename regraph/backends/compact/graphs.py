@@ -0,0 +1,697 @@
+"""Compact in-memory graph objects.
+
+This module implements a memory-efficient graph backend: node ids are
+mapped to integer indices, adjacency lists are stored in arrays of
+indices packed in the compressed sparse row (CSR) format and attribute
+dictionaries are interned, so that the nodes and edges with equal
+attributes share the same dictionary.
+"""
+import bisect
+import copy
+import itertools
+import sys
+import warnings
+import weakref
+
+from array import array
+
+from regraph.exceptions import (ReGraphError,
+                                GraphError,
+                                GraphAttrsWarning,
+                                )
+from regraph.attribute_sets import (FiniteSet, RegexSet, IntegerSet,
+                                   EmptySet, UniversalSet)
+from regraph.graphs import Graph
+from regraph.backends.networkx.graphs import (_intersect_candidates,
+                                              _iter_monomorphisms)
+from regraph.utils import (normalize_attrs,
+                           valid_attributes,
+                           normalize_relation,
+                           )
+
+
+# Minimal number of modified adjacency lists triggering their packing
+_MIN_OVERLAY_SIZE = 1024
+
+_NO_NEIGHBOURS = ()
+_NO_ATTRS = dict()
+
+
+class _AttrRecord(dict):
+    """Interned dictionary of attributes (never modified in place)."""
+
+    __slots__ = ("__weakref__",)
+
+
+# Pool of interned attribute dictionaries shared by all the compact graphs
+_record_pool = weakref.WeakValueDictionary()
+
+
+def _value_key(value):
+    """Get the key identifying an attribute value in interned records.
+
+    Finite sets are hash-consed and are identified by their ids, other
+    attribute sets (never modified in place) by their contents. Returns
+    `None` for the remaining values.
+    """
+    value_type = type(value)
+    if value_type is FiniteSet:
+        return id(value)
+    if value_type is RegexSet:
+        return (value_type, value.pattern)
+    if value_type is IntegerSet:
+        return (value_type, tuple(value.intervals))
+    if value_type is EmptySet or value_type is UniversalSet:
+        return (value_type,)
+    return None
+
+
+def _intern_attrs(attrs):
+    """Intern a dictionary of attributes.
+
+    Returns `None` for empty dictionaries, otherwise returns
+    a record from the pool that is equal to `attrs`. Records with
+    equal attribute sets are shared, values of a new record that are
+    not finite sets (immutable and hash-consed) are copied.
+    """
+    if not attrs:
+        return None
+    record_key = []
+    copies = dict()
+    for key, value in attrs.items():
+        value_key = _value_key(value)
+        if value_key is None:
+            # other values can be modified in place, so they are
+            # copied and identified by the ids of the copies
+            copies[key] = copy.deepcopy(value)
+            value_key = id(copies[key])
+        record_key.append((key, value_key))
+    record_key = frozenset(record_key)
+
+    shared_record = _record_pool.get(record_key)
+    if shared_record is None:
+        shared_record = _AttrRecord()
+        for key, value in attrs.items():
+            if key in copies:
+                shared_record[key] = copies[key]
+            elif type(value) is FiniteSet:
+                shared_record[key] = value
+            else:
+                shared_record[key] = copy.deepcopy(value)
+        _record_pool[record_key] = shared_record
+    return shared_record
+
+
+class _Adjacency(object):
+    """Sorted lists of neighbours of integer-indexed nodes.
+
+    Lists are packed in the CSR format: the neighbours of the node
+    with the index `i` are the elements of `targets` between
+    `offsets[i]` and `offsets[i + 1]`. The lists modified since the
+    last packing are stored in `rows` and override the packed ones.
+    """
+
+    def __init__(self):
+        """Initialize empty adjacency."""
+        self.offsets = array("q", [0])
+        self.targets = array("i")
+        self.rows = dict()
+
+    def copy(self):
+        """Copy the adjacency."""
+        new_adjacency = _Adjacency()
+        new_adjacency.offsets = array("q", self.offsets)
+        new_adjacency.targets = array("i", self.targets)
+        new_adjacency.rows = {
+            i: row if type(row) is tuple else array("i", row)
+            for i, row in self.rows.items()
+        }
+        return new_adjacency
+
+    def row(self, i):
+        """Return a copy of the neighbours of a node."""
+        row = self.rows.get(i)
+        if row is not None:
+            return row[:]
+        if i + 1 < len(self.offsets):
+            return self.targets[self.offsets[i]:self.offsets[i + 1]]
+        return _NO_NEIGHBOURS
+
+    def contains(self, i, j):
+        """Test if `j` is a neighbour of `i`."""
+        row = self.rows.get(i)
+        if row is not None:
+            lo, hi = 0, len(row)
+        elif i + 1 < len(self.offsets):
+            row = self.targets
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+        else:
+            return False
+        k = bisect.bisect_left(row, j, lo, hi)
+        return k < hi and row[k] == j
+
+    def _overlay_row(self, i):
+        row = self.rows.get(i)
+        if type(row) is not array:
+            row = array("i", self.row(i))
+            self.rows[i] = row
+        return row
+
+    def add(self, i, j):
+        """Add `j` to the neighbours of `i`."""
+        bisect.insort(self._overlay_row(i), j)
+
+    def remove(self, i, j):
+        """Remove `j` from the neighbours of `i`."""
+        row = self._overlay_row(i)
+        del row[bisect.bisect_left(row, j)]
+
+    def clear(self, i):
+        """Remove all the neighbours of `i`."""
+        self.rows[i] = _NO_NEIGHBOURS
+
+    def pack(self, size):
+        """Pack the lists of the nodes `0, ..., size - 1`."""
+        offsets = array("q", [0])
+        targets = array("i")
+        for i in range(size):
+            targets.extend(self.row(i))
+            offsets.append(len(targets))
+        self.offsets = offsets
+        self.targets = targets
+        self.rows = dict()
+
+
+class _EdgeView(object):
+    """View of the edges of a compact graph."""
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __iter__(self):
+        ids = self._graph._ids
+        for s, i in self._graph._index.items():
+            for j in self._graph._succ.row(i):
+                yield (s, ids[j])
+
+    def __len__(self):
+        return self._graph._number_of_edges
+
+    def __contains__(self, edge):
+        try:
+            s, t = edge
+            i = self._graph._index[s]
+            j = self._graph._index[t]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return self._graph._succ.contains(i, j)
+
+
+class _NeighbourView(object):
+    """Dictionary-like view of the neighbours of a node.
+
+    Keys are neighbours and values are the attributes of
+    the respective edges.
+    """
+
+    def __init__(self, graph, adjacency, i, reverse):
+        self._graph = graph
+        self._adjacency = adjacency
+        self._i = i
+        self._reverse = reverse
+
+    def __iter__(self):
+        ids = self._graph._ids
+        for j in self._adjacency.row(self._i):
+            yield ids[j]
+
+    def __contains__(self, node_id):
+        j = self._graph._index.get(node_id)
+        return j is not None and self._adjacency.contains(self._i, j)
+
+    def __getitem__(self, node_id):
+        j = self._graph._index[node_id]
+        edge = (j, self._i) if self._reverse else (self._i, j)
+        return self._graph._edge_attrs.get(edge, _NO_ATTRS)
+
+
+class _AdjacencyView(object):
+    """Dictionary-like view of the adjacency of a compact graph.
+
+    Mimics the `adj` and `pred` views of `networkx.DiGraph`
+    expected by the matcher.
+    """
+
+    def __init__(self, graph, adjacency, reverse=False):
+        self._graph = graph
+        self._adjacency = adjacency
+        self._reverse = reverse
+
+    def __getitem__(self, node_id):
+        return _NeighbourView(
+            self._graph, self._adjacency,
+            self._graph._index[node_id], self._reverse)
+
+
+class CompactGraph(Graph):
+    """Memory-efficient in-memory graph.
+
+    Every node is identified by an integer index, adjacency lists
+    are sorted arrays of such indices packed in the CSR format
+    (see `compact`). Attribute dictionaries of nodes and edges are
+    interned: nodes and edges with equal attributes share the same
+    dictionary (`get_node` and `get_edge` return its copies).
+
+    Attributes
+    ----------
+    _ids : list
+        List whose elements are the ids of the nodes with the
+        respective indices (`None` for the indices of removed nodes)
+    _index : dict
+        Dictionary whose keys are node ids and whose values are
+        their indices
+    _free : list
+        Indices of removed nodes that can be reused
+    _node_attrs : list
+        List whose elements are interned attribute dictionaries of
+        the nodes with the respective indices (`None` if a node has
+        no attributes)
+    _succ : _Adjacency
+        Successors of the nodes
+    _pred : _Adjacency
+        Predecessors of the nodes
+    _edge_attrs : dict
+        Dictionary whose keys are pairs of indices of the source and
+        the target of edges and whose values are interned attribute
+        dictionaries of the respective edges (edges without
+        attributes are not stored)
+    _number_of_edges : int
+        Number of edges of the graph
+    """
+
+    def __init__(self):
+        """Initialize compact graph."""
+        super().__init__()
+        self._ids = []
+        self._index = dict()
+        self._free = []
+        self._node_attrs = []
+        self._succ = _Adjacency()
+        self._pred = _Adjacency()
+        self._edge_attrs = dict()
+        self._number_of_edges = 0
+
+    def _node_index(self, node_id):
+        try:
+            return self._index[node_id]
+        except KeyError:
+            raise GraphError("Node '{}' does not exist!".format(node_id))
+
+    def _edge_index(self, s, t):
+        i = self._index.get(s)
+        j = self._index.get(t)
+        if i is None or j is None or not self._succ.contains(i, j):
+            raise GraphError(
+                "Edge '{}->{}' does not exist!".format(s, t))
+        return i, j
+
+    def _pack_if_needed(self):
+        overlay = len(self._succ.rows) + len(self._pred.rows)
+        if overlay > max(_MIN_OVERLAY_SIZE, len(self._ids)):
+            self.compact()
+
+    def compact(self):
+        """Pack the adjacency lists of the graph.
+
+        Adjacency lists modified since the last packing are stored
+        separately, the graph packs them automatically when their
+        number exceeds the number of nodes. This method can be called
+        to pack them explicitly (e.g. after loading the graph).
+        """
+        self._succ.pack(len(self._ids))
+        self._pred.pack(len(self._ids))
+
+    def nodes(self, data=False):
+        """Return the list of nodes."""
+        if data:
+            return [(n, self.get_node(n)) for n in self._index]
+        return self._index.keys()
+
+    def edges(self, data=False):
+        """Return the list of edges."""
+        if data:
+            return [(s, t, self.get_edge(s, t)) for s, t in self.edges()]
+        return _EdgeView(self)
+
+    def get_node(self, n):
+        """Get node attributes.
+
+        Parameters
+        ----------
+        n : hashable
+            Node id.
+        """
+        record = self._node_attrs[self._node_index(n)]
+        return dict(record) if record else dict()
+
+    def get_edge(self, s, t):
+        """Get edge attributes.
+
+        Parameters
+        ----------
+        s : hashable, source node id.
+        t : hashable, target node id.
+        """
+        record = self._edge_attrs.get(self._edge_index(s, t))
+        return dict(record) if record else dict()
+
+    def add_node(self, node_id, attrs=None):
+        """Add a new node to the graph.
+
+        Parameters
+        ----------
+        node_id : hashable
+            Id of the new node.
+        attrs : dict, optional
+            Node attributes.
+        """
+        if node_id in self._index:
+            raise GraphError("Node '{}' already exists!".format(node_id))
+        new_attrs = dict()
+        if attrs is not None:
+            new_attrs.update(attrs)
+            normalize_attrs(new_attrs)
+        if type(node_id) is str:
+            node_id = sys.intern(node_id)
+        record = _intern_attrs(new_attrs)
+        if len(self._free) > 0:
+            i = self._free.pop()
+            self._ids[i] = node_id
+            self._node_attrs[i] = record
+        else:
+            i = len(self._ids)
+            self._ids.append(node_id)
+            self._node_attrs.append(record)
+        self._index[node_id] = i
+        return node_id
+
+    def remove_node(self, node_id):
+        """Remove node.
+
+        Parameters
+        ----------
+        node_id : hashable, node to remove.
+        """
+        i = self._node_index(node_id)
+        successors = self._succ.row(i)
+        predecessors = self._pred.row(i)
+        for j in successors:
+            if j != i:
+                self._pred.remove(j, i)
+            self._edge_attrs.pop((i, j), None)
+        for j in predecessors:
+            if j != i:
+                self._succ.remove(j, i)
+            self._edge_attrs.pop((j, i), None)
+        self._number_of_edges -= len(successors) + len(predecessors)
+        if self._succ.contains(i, i):
+            self._number_of_edges += 1
+        self._succ.clear(i)
+        self._pred.clear(i)
+
+        del self._index[node_id]
+        self._ids[i] = None
+        self._node_attrs[i] = None
+        self._free.append(i)
+        self._pack_if_needed()
+
+    def add_edge(self, s, t, attrs=None, **attr):
+        """Add an edge to a graph.
+
+        Parameters
+        ----------
+        s : hashable, source node id.
+        t : hashable, target node id.
+        attrs : dict
+            Edge attributes.
+        """
+        if attrs is None:
+            attrs = attr
+        else:
+            try:
+                attrs.update(attr)
+            except AttributeError:
+                raise ReGraphError(
+                    "The attr_dict argument must be a dictionary."
+                )
+        i = self._node_index(s)
+        j = self._node_index(t)
+        if self._succ.contains(i, j):
+            raise GraphError(
+                "Edge '{}'->'{}' already exists!".format(s, t))
+
+        new_attrs = dict(attrs)
+        normalize_attrs(new_attrs)
+        self._succ.add(i, j)
+        self._pred.add(j, i)
+        record = _intern_attrs(new_attrs)
+        if record is not None:
+            self._edge_attrs[(i, j)] = record
+        self._number_of_edges += 1
+        self._pack_if_needed()
+
+    def remove_edge(self, s, t):
+        """Remove edge from the graph.
+
+        Parameters
+        ----------
+        s : hashable, source node id.
+        t : hashable, target node id.
+        """
+        i, j = self._edge_index(s, t)
+        self._succ.remove(i, j)
+        self._pred.remove(j, i)
+        self._edge_attrs.pop((i, j), None)
+        self._number_of_edges -= 1
+        self._pack_if_needed()
+
+    def update_node_attrs(self, node_id, attrs, normalize=True):
+        """Update attributes of a node.
+
+        Parameters
+        ----------
+        node_id : hashable, node to update.
+        attrs : dict
+            New attributes to assign to the node
+
+        """
+        i = self._node_index(node_id)
+        if attrs is None:
+            warnings.warn(
+                "You want to update '{}' attrs with an empty attrs_dict!".format(
+                    node_id),
+                GraphAttrsWarning
+            )
+        else:
+            new_attrs = dict(attrs)
+            if normalize is True:
+                normalize_attrs(new_attrs)
+            self._node_attrs[i] = _intern_attrs(new_attrs)
+
+    def update_edge_attrs(self, s, t, attrs, normalize=True):
+        """Update attributes of an edge.
+
+        Parameters
+        ----------
+        s : hashable, source node of the edge to update.
+        t : hashable, target node of the edge to update.
+        attrs : dict
+            New attributes to assign to the edge
+
+        """
+        edge = self._edge_index(s, t)
+        if attrs is None:
+            warnings.warn(
+                "You want to update '{}->{}' attrs with an empty attrs_dict".format(
+                    s, t), GraphAttrsWarning
+            )
+            return
+
+        new_attrs = dict(attrs)
+        if normalize is True:
+            normalize_attrs(new_attrs)
+        record = _intern_attrs(new_attrs)
+        if record is None:
+            self._edge_attrs.pop(edge, None)
+        else:
+            self._edge_attrs[edge] = record
+
+    def successors(self, node_id):
+        """Return the set of successors."""
+        ids = self._ids
+        return [ids[j] for j in self._succ.row(self._node_index(node_id))]
+
+    def predecessors(self, node_id):
+        """Return the set of predecessors."""
+        if node_id not in self._index:
+            raise GraphError(
+                "Node '{}' does not exist in the graph".format(
+                    node_id))
+        ids = self._ids
+        return [ids[j] for j in self._pred.row(self._index[node_id])]
+
+    def exists_edge(self, s, t):
+        """Check if an edge exists.
+
+        Parameters
+        ----------
+        s : hashable
+            Source node id.
+        t : hashable
+            Target node id.
+        """
+        return (s, t) in _EdgeView(self)
+
+    def find_matching(self, pattern, nodes=None,
+                      graph_typing=None, pattern_typing=None):
+        """Find matching of a pattern in a graph.
+
+        See `NXGraph.find_matching` for the description of
+        the matching and of the parameters.
+
+        Returns
+        -------
+        instances : list of dict's
+            List of instances of matching found in the graph, every instance
+            is represented with a dictionary where keys are nodes of the
+            pattern, and values are corresponding nodes of the graph.
+
+        """
+        return list(self.iter_matching(
+            pattern, nodes, graph_typing, pattern_typing))
+
+    def iter_matching(self, pattern, nodes=None, graph_typing=None,
+                      pattern_typing=None, limit=None,
+                      inverse_graph_typing=None):
+        """Iterate over the instances of a pattern in a graph.
+
+        See `NXGraph.iter_matching` for the description of
+        the parameters. The validity of the attributes of candidate
+        nodes is tested once per interned attribute dictionary.
+
+        Returns
+        -------
+        instances : iterator of dict's
+            Iterator over instances of matching found in the graph
+        """
+        new_pattern_typing = dict()
+        if pattern_typing:
+            for graph, pattern_mapping in pattern_typing.items():
+                new_pattern_typing[graph] = normalize_relation(
+                    pattern_mapping)
+
+        if graph_typing is None:
+            graph_typing = {}
+
+        # check graph/pattern typing is consistent
+        for g, mapping in new_pattern_typing.items():
+            if g not in graph_typing:
+                raise ReGraphError(
+                    "Graph is not typed by '{}' from the specified ".format(
+                        g) +
+                    "pattern typing")
+
+        if nodes is not None:
+            nodes = set(nodes)
+        else:
+            nodes = self._index
+
+        if inverse_graph_typing is None:
+            inverse_graph_typing = {}
+
+        def _typing_holds(pattern_node, node):
+            for g, pattern_mapping in new_pattern_typing.items():
+                if node in graph_typing[g] and\
+                   pattern_node in pattern_mapping:
+                    if graph_typing[g][node] not in pattern_mapping[
+                            pattern_node]:
+                        return False
+            return True
+
+        untyped_nodes = dict()
+
+        def _typed_candidates(g, types):
+            if g not in untyped_nodes:
+                # nodes not typed by 'g' match any type, there are
+                # none if the typing is total, otherwise only the
+                # nodes to search in are scanned
+                if len(graph_typing[g]) == len(self._index):
+                    untyped_nodes[g] = []
+                else:
+                    untyped_nodes[g] = [
+                        n for n in nodes
+                        if n not in graph_typing[g]]
+            pool = dict.fromkeys(untyped_nodes[g])
+            for t in types:
+                pool.update(dict.fromkeys(
+                    inverse_graph_typing[g].get(t, [])))
+            return pool
+
+        # find all the nodes matching the nodes in pattern
+        candidates = dict()
+        for pattern_node in pattern.nodes():
+            pattern_attrs = pattern.get_node(pattern_node)
+            pools = [
+                _typed_candidates(g, pattern_mapping[pattern_node])
+                for g, pattern_mapping in new_pattern_typing.items()
+                if g in inverse_graph_typing and
+                pattern_node in pattern_mapping
+            ]
+            pool = _intersect_candidates(pools)
+            if pool is None:
+                pool = self._index
+
+            valid_records = dict()
+
+            def _attrs_hold(node):
+                record = self._node_attrs[self._index[node]]
+                if id(record) not in valid_records:
+                    valid_records[id(record)] = valid_attributes(
+                        pattern_attrs, record or _NO_ATTRS)
+                return valid_records[id(record)]
+
+            candidates[pattern_node] = [
+                node for node in pool
+                if node in nodes and
+                _typing_holds(pattern_node, node) and
+                _attrs_hold(node)
+            ]
+
+        return itertools.islice(
+            _iter_monomorphisms(
+                _AdjacencyView(self, self._succ),
+                _AdjacencyView(self, self._pred, reverse=True),
+                pattern, candidates),
+            limit)
+
+    @classmethod
+    def copy(cls, graph):
+        """Copy the input graph object.
+
+        Copies of compact graphs share the interned attributes
+        with the original graph.
+        """
+        new_graph = cls()
+        if isinstance(graph, CompactGraph):
+            new_graph._ids = list(graph._ids)
+            new_graph._index = dict(graph._index)
+            new_graph._free = list(graph._free)
+            new_graph._node_attrs = list(graph._node_attrs)
+            new_graph._succ = graph._succ.copy()
+            new_graph._pred = graph._pred.copy()
+            new_graph._edge_attrs = dict(graph._edge_attrs)
+            new_graph._number_of_edges = graph._number_of_edges
+        else:
+            new_graph.add_nodes_from(graph.nodes(data=True))
+            new_graph.add_edges_from(graph.edges(data=True))
+        return new_graph
@@ -1,8 +1,5 @@
 """Collection of generic utils for Cypher queries generation."""
 import uuid
-import tempfile
-import json
-import os
 
 from regraph.attribute_sets import (FiniteSet,
                                     IntegerSet,
@@ -14,97 +11,270 @@ from regraph.utils import attrs_from_json
 
 RESERVED_SET_NAMES = ["IntegerSet", "StringSet", "BooleanSet"]
 
+# Default number of elements sent per query by the bulk loaders
+BULK_CHUNK_SIZE = 10000
+
+
+def stream_graph_from_json(tx, json_data, node_label, edge_label,
+                           chunk_size=BULK_CHUNK_SIZE, progress=None):
+    """Stream a graph from its JSON representation to the database.
+
+    Nodes and edges are sent over Bolt in chunks of `chunk_size`
+    elements passed as parameters of `UNWIND` queries (nodes and edges
+    that already exist are merged). No intermediate file is used, so
+    several graphs can be loaded in parallel.
+
+    Parameters
+    ----------
+    tx
+        Transaction (or session) used to run the queries
+    json_data : dict
+        JSON-like dictionary with graph representation
+    node_label
+        Label of the nodes to load
+    edge_label
+        Label of the edges to load
+    chunk_size : int, optional
+        Number of nodes/edges sent per query
+    progress : callable, optional
+        Function called after each chunk with the kind of the loaded
+        elements ('nodes' or 'edges'), the number of elements of this
+        kind loaded so far and their total number
+    """
+    node_list = (
+        (n["id"], attrs_from_json(n["attrs"])) for n in json_data["nodes"])
+    loaded = 0
+    for chunk in chunks(node_list, chunk_size):
+        parameters = {}
+        tx.run(
+            add_nodes_batch(
+                chunk, node_label, merge=True, parameters=parameters),
+            parameters)
+        loaded += len(chunk)
+        if progress is not None:
+            progress("nodes", loaded, len(json_data["nodes"]))
+
+    edge_list = (
+        (e["from"], e["to"], attrs_from_json(e["attrs"]))
+        for e in json_data["edges"])
+    loaded = 0
+    for chunk in chunks(edge_list, chunk_size):
+        parameters = {}
+        tx.run(
+            add_edges_batch(
+                chunk, node_label, edge_label, merge=True,
+                parameters=parameters),
+            parameters)
+        loaded += len(chunk)
+        if progress is not None:
+            progress("edges", loaded, len(json_data["edges"]))
+
 
 def load_graph_from_json_apoc(tx, json_data, node_label, edge_label,
-                              tmp_dir=None):
-    # store json-file somewhere, generate attr repr.
-    if tmp_dir is None:
-        tmp_dir = "/var/lib/neo4j/import/"
-    path = tmp_dir + "kami_tmp.json"
-    # fd, path = tempfile.mkstemp(prefix=tmp_dir)
-    # try:
-    with open(path, 'w+') as tmp:
-        for n in json_data["nodes"]:
-            n["attrs"] = generate_attributes_json(
-                attrs_from_json(n["attrs"]))
-            n["attrs"]["id"] = n["id"]
-        for e in json_data["edges"]:
-            e["attrs"] = generate_attributes_json(
-                attrs_from_json(e["attrs"]))
-        json.dump(json_data, tmp)
-
-        # load nodes
-        node_query = (
-            "WITH 'file:///{}' AS url\n".format(path) +
-            "CALL apoc.load.json(url) YIELD value\n" +
-            "UNWIND value.nodes AS node\n" +
-            "MERGE (n:{} {{ id: node.id }}) ON CREATE\n".format(node_label) +
-            "\tSET n = node.attrs\n"
+                              tmp_dir=None, chunk_size=BULK_CHUNK_SIZE,
+                              progress=None):
+    """Load a graph from its JSON representation.
+
+    The graph used to be written to a temporary file loaded by
+    `apoc.load.json`, it is now streamed over Bolt by
+    `stream_graph_from_json` (`tmp_dir` is ignored).
+    """
+    stream_graph_from_json(
+        tx, json_data, node_label, edge_label,
+        chunk_size=chunk_size, progress=progress)
+
+
+def load_graph_from_json(json_data, node_label, edge_label,
+                         chunk_size=BULK_CHUNK_SIZE):
+    """Generate queries loading a graph from its JSON representation.
+
+    Nodes and edges are sent in chunks of `chunk_size` elements
+    as parameters of `UNWIND` queries (see `add_nodes_batch` and
+    `add_edges_batch`), so that the size of the query templates does
+    not depend on the size of the graph.
+
+    Returns
+    -------
+    queries : iterator of (str, dict)
+        Iterator over pairs (query template, parameters)
+    """
+    node_list = (
+        (n["id"], attrs_from_json(n["attrs"])) for n in json_data["nodes"])
+    for chunk in chunks(node_list, chunk_size):
+        parameters = {}
+        query = add_nodes_batch(
+            chunk, node_label, rename_duplicates=False,
+            parameters=parameters)
+        yield query, parameters
+
+    edge_list = (
+        (e["from"], e["to"], attrs_from_json(e["attrs"]))
+        for e in json_data["edges"])
+    for chunk in chunks(edge_list, chunk_size):
+        parameters = {}
+        query = add_edges_batch(
+            chunk, node_label, edge_label, parameters=parameters)
+        yield query, parameters
+
+
+def chunks(iterable, chunk_size):
+    """Split an iterable into lists of at most `chunk_size` elements."""
+    chunk = []
+    for element in iterable:
+        chunk.append(element)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+def add_nodes_batch(node_list, node_label, rename_duplicates=True,
+                    merge=False, parameters=None):
+    """Generate query for the creation of a batch of nodes.
+
+    The nodes are passed as a list parameter of the query and created
+    by `UNWIND`, therefore the query template does not depend on the
+    number of nodes.
+
+    Parameters
+    ----------
+    node_list : iterable
+        Collection of pairs (node id, normalized attributes)
+    node_label
+        Label of the nodes to create
+    rename_duplicates : bool, optional
+        If True, a node whose id is already used in the database gets
+        a new id obtained by appending a counter (as in
+        `rewriting.add_node`), otherwise the nodes are simply created
+    merge : bool, optional
+        If True, the nodes are merged with the existing nodes with the
+        same ids (the attributes are set only on the created nodes)
+    parameters : dict, optional
+        Parameters of the query (a new dictionary is used if None)
+    """
+    if parameters is None:
+        parameters = {}
+    batch = add_parameter(parameters, [
+        {"id": str(node_id), "attrs": generate_attributes_json(attrs)}
+        for node_id, attrs in node_list
+    ])
+    if merge:
+        query = (
+            "UNWIND {} AS node\n".format(batch) +
+            "MERGE (n:{} {{ id : node.id }})\n".format(node_label) +
+            "ON CREATE SET n += node.attrs\n"
         )
-        tx.run(node_query)
-
-        # load edges
-        edge_query = (
-            "WITH 'file:///{}' AS url\n".format(path) +
-            "CALL apoc.load.json(url) YIELD value\n" +
-            "UNWIND value.edges AS edge\n" +
-            "MATCH (u:{} {{ id: edge.from }}), (v:{} {{ id: edge.to }}) \n".format(
-                node_label, node_label) +
-            "MERGE (u)-[rel:{}]->(v)\n ON CREATE\n".format(edge_label) +
-            "\tSET rel = edge.attrs\n"
+    elif rename_duplicates:
+        query = (
+            "UNWIND {} AS node\n".format(batch) +
+            "OPTIONAL MATCH (same_id_node:{} {{ id : node.id }})\n".format(
+                node_label) +
+            "FOREACH(new_count \n\tIN CASE WHEN same_id_node IS NOT NULL\n"
+            "\tTHEN [coalesce(same_id_node.count, 0) + 1]\n"
+            "\tELSE [] END | \n"
+            "\t\tSET same_id_node.count = new_count) \n"
+            "WITH node, same_id_node\n"
+            "CREATE (n:{} {{ id : CASE WHEN same_id_node IS NULL\n".format(
+                node_label) +
+            "\tTHEN node.id ELSE node.id + same_id_node.count END }})\n"
+            "SET n += node.attrs\n"
         )
-        tx.run(edge_query)
-    # finally:
-    #     os.remove(path)
-
+    else:
+        query = (
+            "UNWIND {} AS node\n".format(batch) +
+            "CREATE (n:{} {{ id : node.id }})\n".format(node_label) +
+            "SET n += node.attrs\n"
+        )
+    return query
 
-def load_graph_from_json(json_data, node_label, edge_label, literal_id=True,
-                         generate_var_names=True):
-    query = ""
-    if len(json_data["nodes"]) > 0:
-        query += "CREATE"
 
-    # Add nodes
-    nodes = []
+def add_edges_batch(edge_list, node_label, edge_label, merge=False,
+                    parameters=None):
+    """Generate query for the creation of a batch of edges.
 
-    if (generate_var_names):
-        var_names = {
-            n["id"]: "n_{}".format(i + 1) for i, n in enumerate(
-                json_data["nodes"])
+    Parameters
+    ----------
+    edge_list : iterable
+        Collection of triples (source id, target id, normalized attributes)
+    node_label
+        Label of the incident nodes
+    edge_label
+        Label of the edges to create
+    merge : bool, optional
+        If True, the edges are merged with the existing edges (the
+        attributes are set only on the created edges)
+    parameters : dict, optional
+        Parameters of the query (a new dictionary is used if None)
+    """
+    if parameters is None:
+        parameters = {}
+    batch = add_parameter(parameters, [
+        {
+            "source": str(s),
+            "target": str(t),
+            "attrs": generate_attributes_json(attrs)
         }
+        for s, t, attrs in edge_list
+    ])
+    query = (
+        "UNWIND {} AS edge\n".format(batch) +
+        "MATCH (s:{} {{ id : edge.source }}), (t:{} {{ id : edge.target }})\n".format(
+            node_label, node_label)
+    )
+    if merge:
+        query += (
+            "MERGE (s)-[e:{}]->(t)\n".format(edge_label) +
+            "ON CREATE SET e = edge.attrs\n"
+        )
     else:
-        var_names = {
-            n["id"]: "n_{}".format(n["id"]) for n in json_data["nodes"]
-        }
+        query += (
+            "CREATE (s)-[e:{}]->(t)\n".format(edge_label) +
+            "SET e = edge.attrs\n"
+        )
+    return query
 
-    for node_data in json_data["nodes"]:
-        node_id = node_data["id"]
-        if literal_id:
-            node_id = "'{}'".format(node_id)
-        attr_repr = generate_attributes(
-            attrs_from_json(node_data["attrs"]))
-        nodes.append(
-            "({}:{} {{ id: {} {} }})".format(
-                var_names[node_data["id"]], node_label, node_id,
-                ", " + attr_repr if len(attr_repr) > 0 else ""))
-
-    query += ", ".join(nodes) + ","
-
-    # Add edges
-    edges = []
-    for edge_data in json_data["edges"]:
-        attr_repr = generate_attributes(
-            attrs_from_json(edge_data["attrs"]))
-        edges.append(
-            "({})-[:{} {{ {} }}]->({})".format(
-                var_names[edge_data["from"]],
-                edge_label,
-                attr_repr,
-                var_names[edge_data["to"]]))
 
-    query += ", ".join(edges)
+def add_parameter(parameters, value):
+    """Store a value in the parameters of a query.
 
-    return query
+    Parameters are named after their position in `parameters`,
+    therefore the same sequence of builder calls always produces
+    the same query template (and Neo4j can reuse its plan).
+
+    Parameters
+    ----------
+    parameters : dict
+        Parameters of the query being generated
+    value
+        Value of the new parameter
+
+    Returns
+    -------
+    placeholder : str
+        Placeholder of the parameter to use in the query template
+    """
+    name = "param{}".format(len(parameters))
+    parameters[name] = value
+    return "${}".format(name)
+
+
+def id_literal(node_id, parameters=None):
+    """Generate the representation of a node id in a query.
+
+    If `parameters` is None, the id is spliced into the query as a
+    string literal, otherwise it is passed as a query parameter.
+    """
+    if parameters is None:
+        return "'{}'".format(node_id)
+    return add_parameter(parameters, str(node_id))
+
+
+def ids_literal(node_ids, parameters=None):
+    """Generate the representation of a list of node ids in a query."""
+    if parameters is None:
+        return "[{}]".format(", ".join("'{}'".format(n) for n in node_ids))
+    return add_parameter(parameters, [str(n) for n in node_ids])
 
 
 def delete_var(var, detach=False, breakline=True):
@@ -138,17 +308,22 @@ def generate_var_name():
     return uid
 
 
-def set_id(node_label, old_id, new_id):
+def set_id(node_label, old_id, new_id, parameters=None):
     """Generate a subquery to set new id for the node."""
     query = (
-        "MATCH (n:{} {{id : '{}'}})\n".format(node_label, old_id) +
-        "SET n.id = '{}'".format(new_id)
+        "MATCH (n:{} {{id : {}}})\n".format(
+            node_label, id_literal(old_id, parameters)) +
+        "SET n.id = {}".format(id_literal(new_id, parameters))
     )
     return query
 
 
-def set_attributes(var_name, attrs=None, update=False):
-    """Generate a subquery to set the attributes for some variable."""
+def set_attributes(var_name, attrs=None, update=False, parameters=None):
+    """Generate a subquery to set the attributes for some variable.
+
+    If `parameters` is provided, the attributes are passed as
+    a map parameter of the query.
+    """
     query = ""
     if not attrs:
         query += (
@@ -156,6 +331,18 @@ def set_attributes(var_name, attrs=None, update=False):
             "\tfilter(x IN keys({}) WHERE NOT x IN [] AND x <> 'id'), [])".format(
                 var_name)
         )
+    elif parameters is not None:
+        query += "SET {} += {}\n".format(
+            var_name, add_parameter(
+                parameters, generate_attributes_json(attrs)))
+        if update is True:
+            query += (
+                "SET {} = apoc.map.clean(properties({}), \n".format(
+                    var_name, var_name) +
+                "\tfilter(x IN keys({}) WHERE NOT x IN {} AND x <> 'id'), [])".format(
+                    var_name, add_parameter(parameters, list(attrs.keys())))
+            )
+        return query
     for k, value in attrs.items():
         if isinstance(value, IntegerSet):
             if value.is_universal:
@@ -264,7 +451,7 @@ def generate_attributes(attrs):
         return ", ".join(i for i in attrs_items)
 
 
-def match_node(var_name, node_id, node_label):
+def match_node(var_name, node_id, node_label, parameters=None):
     """Query to match a node into the variable.
 
     Parameters
@@ -275,12 +462,15 @@ def match_node(var_name, node_id, node_label):
         Id of the node to match
     label
         Label of the node to match, default is 'node'
+    parameters : dict, optional
+        Parameters of the query, if provided the id of the node
+        is passed as a parameter instead of a literal
     """
-    return "MATCH ({}:{} {{ id : '{}' }})\n".format(
-        var_name, node_label, node_id)
+    return "MATCH ({}:{} {{ id : {} }})\n".format(
+        var_name, node_label, id_literal(node_id, parameters))
 
 
-def match_nodes(var_id_dict, node_label=None):
+def match_nodes(var_id_dict, node_label=None, parameters=None):
     """Match a collection of nodes by their id.
 
     Parameters
@@ -291,6 +481,9 @@ def match_nodes(var_id_dict, node_label=None):
         to match
     label : str
         Label of the nodes to match
+    parameters : dict, optional
+        Parameters of the query, if provided the ids of the nodes
+        are passed as parameters instead of literals
     """
     node_label_str = ""
     if node_label:
@@ -298,14 +491,14 @@ def match_nodes(var_id_dict, node_label=None):
 
     query =\
         "MATCH " +\
-        ", ".join("({}{} {{ id : '{}'}}) ".format(
-            var_name, node_label_str, node_id)
+        ", ".join("({}{} {{ id : {}}}) ".format(
+            var_name, node_label_str, id_literal(node_id, parameters))
             for var_name, node_id in var_id_dict.items()) + " "
     return query
 
 
 def match_edge(u_var, v_var, u_id, v_id, edge_var, u_label, v_label,
-               edge_label='edge'):
+               edge_label='edge', parameters=None):
     """Query for matching an edge.
 
     Parameters
@@ -324,10 +517,15 @@ def match_edge(u_var, v_var, u_id, v_id, edge_var, u_label, v_label,
         Name of the variable to use for the matched edge
     label
         Label of the edge to match, default is 'edge'
+    parameters : dict, optional
+        Parameters of the query, if provided the ids of the nodes
+        are passed as parameters instead of literals
     """
     query =\
-        "MATCH ({}:{} {{id: '{}'}})-[{}:{}]->({}:{} {{id: '{}'}})\n".format(
-            u_var, u_label, u_id, edge_var, edge_label, v_var, v_label, v_id)
+        "MATCH ({}:{} {{id: {}}})-[{}:{}]->({}:{} {{id: {}}})\n".format(
+            u_var, u_label, id_literal(u_id, parameters),
+            edge_var, edge_label,
+            v_var, v_label, id_literal(v_id, parameters))
     return query
 
 
@@ -402,7 +600,7 @@ def get_edges(source_label, target_label,
 
 def successors_query(var_name, node_id, node_label,
                      edge_label, successor_label=None,
-                     undirected=False):
+                     undirected=False, parameters=None):
     """Generate query for getting the ids of all the successors of a node.
 
     Parameters
@@ -418,6 +616,9 @@ def successors_query(var_name, node_id, node_label,
     successor_label : optional
         Label of the successors we want to find,
         'node_label' is used if None.
+    parameters : dict, optional
+        Parameters of the query, if provided the id of the node
+        is passed as a parameter instead of a literal
     """
     if successor_label is None:
         successor_label = node_label
@@ -426,9 +627,9 @@ def successors_query(var_name, node_id, node_label,
     else:
         arrow = ""
     query = (
-        "OPTIONAL MATCH (`{}`:{} {{id : '{}'}})-[:{}]-{}(suc:{})\n".format(
+        "OPTIONAL MATCH (`{}`:{} {{id : {}}})-[:{}]-{}(suc:{})\n".format(
             var_name, node_label,
-            node_id, edge_label,
+            id_literal(node_id, parameters), edge_label,
             arrow,
             successor_label) +
         "RETURN suc.id as suc"
@@ -437,7 +638,7 @@ def successors_query(var_name, node_id, node_label,
 
 
 def predecessors_query(var_name, node_id, node_label,
-                       edge_label, predecessor_label=None):
+                       edge_label, predecessor_label=None, parameters=None):
     """Generate query for getting the ids of all the predecessors of a node.
 
     Parameters
@@ -452,14 +653,17 @@ def predecessors_query(var_name, node_id, node_label,
         Label of the edge to match
     predecessor_label
         Label of the predecessors we want to find. node_label if None.
+    parameters : dict, optional
+        Parameters of the query, if provided the id of the node
+        is passed as a parameter instead of a literal
     """
     if predecessor_label is None:
         predecessor_label = node_label
     query = (
-        "OPTIONAL MATCH (pred:{})-[:{}]-> (n:{} {{id : '{}'}})\n".format(
+        "OPTIONAL MATCH (pred:{})-[:{}]-> (n:{} {{id : {}}})\n".format(
             predecessor_label,
             edge_label,
-            node_label, node_id) +
+            node_label, id_literal(node_id, parameters)) +
         "RETURN pred.id as pred"
     )
     return query
@@ -471,11 +675,13 @@ def predecessors_query(var_name, node_id, node_label,
 #         "n", node_id, node_label=node_label) + return_vars(["n"])
 
 
-def get_edge(s, t, source_label, target_label, edge_label):
+def get_edge(s, t, source_label, target_label, edge_label,
+             parameters=None):
     """Get edge by the ids of its incident nodes."""
     query =\
-        "MATCH (n:{} {{id: '{}'}})-[rel:{}]->(m:{} {{id: '{}'}})".format(
-            source_label, s, edge_label, target_label, t) +\
+        "MATCH (n:{} {{id: {}}})-[rel:{}]->(m:{} {{id: {}}})".format(
+            source_label, id_literal(s, parameters), edge_label,
+            target_label, id_literal(t, parameters)) +\
         "RETURN rel\n"
 
     return query
@@ -985,10 +1191,11 @@ def nb_of_attrs_mismatch(source, target):
     return query
 
 
-def exists_edge(s, t, node_label, edge_label):
+def exists_edge(s, t, node_label, edge_label, parameters=None):
     query = (
-        "RETURN EXISTS( (:{} {{ id: '{}' }})-[:{}]->(:{} {{ id: '{}' }}) ) AS result".format(
-            node_label, s, edge_label, node_label, t)
+        "RETURN EXISTS( (:{} {{ id: {} }})-[:{}]->(:{} {{ id: {} }}) ) AS result".format(
+            node_label, id_literal(s, parameters), edge_label,
+            node_label, id_literal(t, parameters))
     )
     return query
 
@@ -1010,21 +1217,23 @@ def attributes_inclusion(source_var, target_var, result_var):
     return query
 
 
-def get_node_attrs(node_id, node_label, attrs_var):
+def get_node_attrs(node_id, node_label, attrs_var, parameters=None):
     """Query for retreiving node's attributes."""
     query = (
-        "MATCH (n:{} {{ id: '{}' }}) \n".format(
-            node_label, node_id) +
+        "MATCH (n:{} {{ id: {} }}) \n".format(
+            node_label, id_literal(node_id, parameters)) +
         "RETURN properties(n) as {}\n".format(attrs_var)
     )
     return query
 
 
-def get_edge_attrs(source_id, targe_id, node_label, edge_label, attrs_var):
+def get_edge_attrs(source_id, targe_id, node_label, edge_label, attrs_var,
+                   parameters=None):
     """Query for retreiving edge's attributes."""
     query = (
-        "MATCH (n:{} {{ id: '{}' }})-[rel:{}]->(m:{} {{ id: '{}' }}) \n".format(
-            node_label, source_id, edge_label, node_label, targe_id) +
+        "MATCH (n:{} {{ id: {} }})-[rel:{}]->(m:{} {{ id: {} }}) \n".format(
+            node_label, id_literal(source_id, parameters), edge_label,
+            node_label, id_literal(targe_id, parameters)) +
         "RETURN properties(rel) as {}\n".format(attrs_var)
     )
     return query
@@ -1061,27 +1270,138 @@ def properties_to_attributes(result, var_name):
     return attrs
 
 
-def descendants_query(node_id, node_label, edge_label="edge"):
+def path_length_range(max_depth=None):
+    """Generate the length range of a variable-length pattern.
+
+    Parameters
+    ----------
+    max_depth : int, optional
+        Maximum length of the paths, if not specified the
+        length is unbounded
+
+    Returns
+    -------
+    query : str
+        Range of the form '*1..' or '*1..max_depth'. Cypher does not
+        allow parameters in ranges, so the depth is a literal integer
+    """
+    if max_depth is None:
+        return "*1.."
+    return "*1..{}".format(int(max_depth))
+
+
+def descendants_query(node_id, node_label, edge_label="edge",
+                      parameters=None, max_depth=None):
     """Generate Cypher query finding descendant nodes starting at 'node_id'."""
     return (
-        "MATCH path=(n:{} {{id: '{}'}})-[:{}*1..]->(m:{})\n".format(
-            node_label, node_id, edge_label, node_label) +
+        "MATCH path=(n:{} {{id: {}}})-[:{}{}]->(m:{})\n".format(
+            node_label, id_literal(node_id, parameters),
+            edge_label, path_length_range(max_depth), node_label) +
         "RETURN m.id AS descendant, REDUCE(p=[], n in nodes(path) | p + [n.id]) as path\n"
     )
 
 
-def ancestors_query(node_id, node_label, edge_label="edge"):
+def ancestors_query(node_id, node_label, edge_label="edge",
+                    parameters=None, max_depth=None):
     """Generate Cypher query finding ancestors nodes starting at 'node_id'."""
     return (
-        "MATCH path=(m:{})-[:{}*1..]->(n:{} {{id: '{}'}})\n".format(
-            node_label, node_id, edge_label, node_label) +
+        "MATCH path=(m:{})-[:{}{}]->(n:{} {{id: {}}})\n".format(
+            node_label, edge_label, path_length_range(max_depth),
+            node_label, id_literal(node_id, parameters)) +
         "RETURN m.id AS ancestor, REDUCE(p=[], n in nodes(path) | p + [n.id]) as path\n"
     )
 
 
-def shortest_path_query(source_id, target_id, node_label, edge_label):
+def descendant_ids_query(node_id, node_label, edge_label="edge",
+                         parameters=None, max_depth=None):
+    """Generate query collecting the ids of the descendants of a node.
+
+    Unlike `descendants_query`, which returns a record per path, the
+    query returns a single record whose field 'descendants' is the
+    list of ids of the distinct nodes reachable from the node by
+    paths of length at most `max_depth`.
+    """
+    return (
+        "MATCH (n:{} {{id: {}}})-[:{}{}]->(m:{})\n".format(
+            node_label, id_literal(node_id, parameters),
+            edge_label, path_length_range(max_depth), node_label) +
+        "WITH DISTINCT m\n" +
+        "RETURN collect(m.id) AS descendants\n"
+    )
+
+
+def ancestor_ids_query(node_id, node_label, edge_label="edge",
+                       parameters=None, max_depth=None):
+    """Generate query collecting the ids of the ancestors of a node.
+
+    The query returns a single record whose field 'ancestors' is the
+    list of ids of the distinct nodes from which the node is reachable
+    by paths of length at most `max_depth`.
+    """
+    return (
+        "MATCH (m:{})-[:{}{}]->(n:{} {{id: {}}})\n".format(
+            node_label, edge_label, path_length_range(max_depth),
+            node_label, id_literal(node_id, parameters)) +
+        "WITH DISTINCT m\n" +
+        "RETURN collect(m.id) AS ancestors\n"
+    )
+
+
+def disconnected_nodes_query(node_id, node_label, edge_label="edge",
+                             parameters=None, max_depth=None):
+    """Generate query collecting the ids of the nodes disconnected from a node.
+
+    The connected component of the node is computed by
+    `apoc.path.subgraphNodes`, which visits every node at most once
+    (enumerating the undirected paths instead is exponential on
+    cyclic graphs). The nodes connected by undirected paths of length
+    at most `max_depth` are collected once, the query returns a single
+    record whose field 'disconnected_nodes' is the list of ids of the
+    remaining nodes.
+    """
+    if max_depth is None:
+        max_level = -1
+    else:
+        max_level = int(max_depth)
+    return (
+        "MATCH (n:{} {{id: {}}})\n".format(
+            node_label, id_literal(node_id, parameters)) +
+        "CALL apoc.path.subgraphNodes(n, {{relationshipFilter: '{}', ".format(
+            edge_label) +
+        "labelFilter: '+{}', maxLevel: {}}}) YIELD node\n".format(
+            node_label, max_level) +
+        "WITH collect(node.id) AS connected\n" +
+        "MATCH (m:{})\n".format(node_label) +
+        "WITH connected, collect(m.id) AS nodes\n" +
+        "RETURN apoc.coll.subtract(nodes, connected) AS disconnected_nodes\n"
+    )
+
+
+def subgraph_query(node_ids, node_label, edge_label="edge",
+                   parameters=None):
+    """Generate query retrieving the subgraph induced by a set of nodes.
+
+    The query returns a record per node of the subgraph with its id
+    ('node_id'), its properties ('attrs') and the list of its outgoing
+    edges inside of the subgraph ('edges'), given by the id of their
+    target ('target') and their properties ('attrs').
+    """
+    ids = ids_literal(node_ids, parameters)
+    return (
+        "MATCH (n:{}) WHERE n.id IN {}\n".format(node_label, ids) +
+        "OPTIONAL MATCH (n)-[r:{}]->(m:{}) WHERE m.id IN {}\n".format(
+            edge_label, node_label, ids) +
+        "RETURN n.id AS node_id, properties(n) AS attrs,\n" +
+        "\tcollect(CASE WHEN m IS NULL THEN NULL\n" +
+        "\t\tELSE {target: m.id, attrs: properties(r)} END) AS edges\n"
+    )
+
+
+def shortest_path_query(source_id, target_id, node_label, edge_label,
+                        parameters=None):
     return (
-        "MATCH path=shortestPath((n:{} {{id: '{}'}})-[{}*1..]->(m:{} {{id: '{}'}})) \n".format(
-            node_label, source_id, edge_label, node_label, target_id) +
+        "MATCH path=shortestPath((n:{} {{id: {}}})-[:{}*1..]->(m:{} {{id: {}}})) \n".format(
+            node_label, id_literal(source_id, parameters), edge_label,
+            node_label, id_literal(target_id, parameters)) +
         "RETURN REDUCE(p=[], l in nodes(path) | p + [l.id]) as path"
     )
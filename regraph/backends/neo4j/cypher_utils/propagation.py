@@ -45,15 +45,119 @@ def get_relation(domain, codomain, typing_label, attrs=None):
 
 def set_intergraph_edge(domain, codomain, domain_node,
                         codomain_node, typing_label,
-                        attrs=None):
+                        attrs=None, parameters=None):
     query = (
-        "MATCH (n:{} {{ id: '{}' }}), (m:{} {{ id: '{}' }})\n".format(
-            domain, domain_node, codomain, codomain_node) +
+        "MATCH (n:{} {{ id: {} }}), (m:{} {{ id: {} }})\n".format(
+            domain, generic.id_literal(domain_node, parameters),
+            codomain, generic.id_literal(codomain_node, parameters)) +
         "MERGE (n)-[:{}  {{ {} }}]->(m)".format(typing_label, generic.generate_attributes(attrs))
     )
     return query
 
 
+def set_intergraph_edges(domain, codomain, pairs, typing_label,
+                         attrs=None, parameters=None):
+    """Generate query setting intergraph edges for a batch of node pairs.
+
+    The pairs are passed as a list parameter of the query and unwound,
+    therefore the query template does not depend on the number of pairs.
+
+    Parameters
+    ----------
+    domain
+        Label of the source nodes
+    codomain
+        Label of the target nodes
+    pairs : iterable
+        Collection of pairs (source node id, target node id)
+    typing_label
+        Label of the edges to set
+    attrs : dict, optional
+        Attributes of the edges
+    parameters : dict, optional
+        Parameters of the query (a new dictionary is used if None)
+    """
+    if parameters is None:
+        parameters = {}
+    batch = generic.add_parameter(parameters, [
+        {"source": str(s), "target": str(t)} for s, t in pairs
+    ])
+    query = (
+        "UNWIND {} AS pair\n".format(batch) +
+        "MATCH (n:{} {{ id: pair.source }}), (m:{} {{ id: pair.target }})\n".format(
+            domain, codomain) +
+        "MERGE (n)-[:{}  {{ {} }}]->(m)".format(
+            typing_label, generic.generate_attributes(attrs))
+    )
+    return query
+
+
+def retarget_intergraph_edges(domain, codomain, triples, typing_label,
+                              parameters=None):
+    """Generate query redirecting a batch of intergraph edges.
+
+    Parameters
+    ----------
+    domain
+        Label of the source nodes
+    codomain
+        Label of the target nodes
+    triples : iterable
+        Collection of triples (source node id, old target node id,
+        new target node id)
+    typing_label
+        Label of the edges to redirect
+    parameters : dict, optional
+        Parameters of the query (a new dictionary is used if None)
+    """
+    if parameters is None:
+        parameters = {}
+    batch = generic.add_parameter(parameters, [
+        {"source": str(s), "old_target": str(old_t), "target": str(t)}
+        for s, old_t, t in triples
+    ])
+    query = (
+        "UNWIND {} AS pair\n".format(batch) +
+        "MATCH (n:{} {{ id: pair.source }})-[r:{}]->(:{} {{ id: pair.old_target }}), ".format(
+            domain, typing_label, codomain) +
+        "(m:{} {{ id: pair.target }})\n".format(codomain) +
+        "DELETE r\n" +
+        "MERGE (n)-[:{}]->(m)\n".format(typing_label)
+    )
+    return query
+
+
+def remove_intergraph_edges(domain, codomain, pairs, typing_label,
+                            parameters=None):
+    """Generate query removing intergraph edges for a batch of node pairs.
+
+    Parameters
+    ----------
+    domain
+        Label of the source nodes
+    codomain
+        Label of the target nodes
+    pairs : iterable
+        Collection of pairs (source node id, target node id)
+    typing_label
+        Label of the edges to remove (in any direction)
+    parameters : dict, optional
+        Parameters of the query (a new dictionary is used if None)
+    """
+    if parameters is None:
+        parameters = {}
+    batch = generic.add_parameter(parameters, [
+        {"source": str(s), "target": str(t)} for s, t in pairs
+    ])
+    query = (
+        "UNWIND {} AS pair\n".format(batch) +
+        "MATCH (n:{} {{ id: pair.source }})-[r:{}]-(m:{} {{ id: pair.target }})\n".format(
+            domain, typing_label, codomain) +
+        "DELETE r\n"
+    )
+    return query
+
+
 def check_homomorphism(tx, domain, codomain, total=True):
     """Check if the homomorphism is valid.
 
@@ -251,9 +355,10 @@ def check_consistency_with_rm(tx, source, target, typing_label):
     """Check consistency of typing after removeal of tagged nodes."""
     consistent = True
 
+    parameters = {}
     query = (
         "MATCH (G:{})\n".format(source) +
-        "WHERE G.id = '{}'\n".format(source) +
+        "WHERE G.id = {}\n".format(generic.id_literal(source, parameters)) +
         "OPTIONAL MATCH (h_i:{})\n".format(target) +
         "WHERE (G)<-[:{}*1..]-(h_i})-[:{}*1..]->(G)\n".format(
             typing_label, typing_label)
@@ -262,10 +367,11 @@ def check_consistency_with_rm(tx, source, target, typing_label):
 
 def check_tmp_consistency(tx, source, target, typing_label):
     """Check consistency of typing of the rhs of the rule."""
+    parameters = {}
     query1 = (
         "// Checking consistency of introduced rhs\n"
         "MATCH (G:{})\n".format(source) +
-        "WHERE G.id = '{}'\n".format(source) +
+        "WHERE G.id = {}\n".format(generic.id_literal(source, parameters)) +
         "OPTIONAL MATCH (t_i:{})\n".format(target) +
         "WHERE (t_i)<-[:{}*1..]-(G)-[:{}*1..]->(t_i)\n".format(
             typing_label, typing_label) +
@@ -275,7 +381,7 @@ def check_tmp_consistency(tx, source, target, typing_label):
 
     # If graph doesn't have multiple paths to the same successorts
     # then there is nothing to check
-    multiple_paths_successors = tx.run(query1).value()[0]
+    multiple_paths_successors = tx.run(query1, parameters).value()[0]
     if len(multiple_paths_successors) == 0:
         return True
 
@@ -341,16 +447,17 @@ def propagate_clones(tx, graph_id, predecessor_id):
             [c["id"] for c in record['clones']]
 
     # get interclone edges
+    parameters = {}
+    clone_ids = generic.ids_literal(clones.keys(), parameters)
     query_interclone_edges = (
         "OPTIONAL MATCH (tn:{})<-[:typing]-(n:{})-[r:edge]->(m:{})-[:typing]->(tm:{}), \n".format(
             graph_id, predecessor_id, predecessor_id, graph_id) +
         "(tn)-[tr:edge]->(tm)\n" +
-        "WHERE n.id IN [{}] AND m.id IN [{}] AND tr IS NOT NULL\n".format(
-            ", ".join(["'{}'".format(k) for k in clones.keys()]),
-            ", ".join(["'{}'".format(k) for k in clones.keys()])) +
+        "WHERE n.id IN {} AND m.id IN {} AND tr IS NOT NULL\n".format(
+            clone_ids, clone_ids) +
         "RETURN tn.id as u, tm.id as v, properties(r) as attrs\n"
     )
-    result = tx.run(query_interclone_edges)
+    result = tx.run(query_interclone_edges, parameters)
     interclone_edges = dict()
 
     for record in result:
@@ -366,10 +473,12 @@ def propagate_clones(tx, graph_id, predecessor_id):
                 fixed_nodes[original] = c
                 clone_results[original] = c
             else:
+                parameters = {}
                 query = (
                     generic.match_node(
                         'x', original,
-                        node_label=predecessor_id) +
+                        node_label=predecessor_id,
+                        parameters=parameters) +
                     rewriting.cloning_query(
                         original_var='x',
                         clone_var='new_node',
@@ -377,14 +486,15 @@ def propagate_clones(tx, graph_id, predecessor_id):
                         clone_id="clone_" + original,
                         node_label=predecessor_id,
                         edge_labels=["edge", "relation"],
-                        ignore_naming=True)[0] +
-                    "OPTIONAL MATCH (x)-[t:typing]-(m:{} {{id: '{}'}})\n".format(
-                        graph_id, c) +
+                        ignore_naming=True,
+                        parameters=parameters)[0] +
+                    "OPTIONAL MATCH (x)-[t:typing]-(m:{} {{id: {}}})\n".format(
+                        graph_id, generic.id_literal(c, parameters)) +
                     "DELETE t\n" +
                     "MERGE (new_node)-[:typing]->(m)\n" +
                     generic.return_vars(['uid'])
                 )
-                result = tx.run(query)
+                result = tx.run(query, parameters)
                 uid_records = []
                 for record in result:
                     uid_records.append(record['uid'])
@@ -770,7 +880,7 @@ def remove_tmp_typing(rewritten_graph, direction="successors"):
 
 
 def preserve_tmp_typing(rewritten_graph, graph_label, typing_label,
-                        direction="successors"):
+                        direction="successors", parameters=None):
     if direction == "predecessors":
         left_arrow = "<"
         right_arrow = ""
@@ -781,8 +891,8 @@ def preserve_tmp_typing(rewritten_graph, graph_label, typing_label,
         "// Replacing ':tmp_typing' with ':typing'\n"
         "MATCH (n:{}){}-[t:tmp_typing]-{}(m)\n".format(
             rewritten_graph, left_arrow, right_arrow) +
-        "OPTIONAL MATCH (:{} {{id: '{}'}})".format(
-            graph_label, rewritten_graph) +
+        "OPTIONAL MATCH (:{} {{id: {}}})".format(
+            graph_label, generic.id_literal(rewritten_graph, parameters)) +
         "{}-[skeleton_rel:{}]-{}(:{} {{id: labels(m)[0]}}) \n".format(
             left_arrow, typing_label, right_arrow, graph_label) +
         "FOREACH( dummy IN (CASE skeleton_rel WHEN null THEN [] ELSE [1] END) | \n" +
@@ -810,10 +920,12 @@ def get_rule_liftings(tx, graph_id, rule, instance, p_typing=None):
         match_instance_vars = {lhs_vars[k]: v for k, v in instance.items()}
 
         # Match nodes
+        parameters = {}
         query = "// Match nodes the instance of the rewritten graph \n"
         query += "MATCH {}".format(
             ", ".join([
-                "({}:{} {{id: '{}'}})".format(k, graph_id, v)
+                "({}:{} {{id: {}}})".format(
+                    k, graph_id, generic.id_literal(v, parameters))
                 for k, v in match_instance_vars.items()
             ])
         )
@@ -858,7 +970,7 @@ def get_rule_liftings(tx, graph_id, rule, instance, p_typing=None):
                 ["{}_dict as {}".format(v, v) for v in lhs_vars.values()] +
                 ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.lhs.edges()]))
 
-        result = tx.run(query)
+        result = tx.run(query, parameters)
         record = result.single()
         l_g_ls = {}
         lhs_nodes = {}
@@ -969,10 +1081,12 @@ def get_rule_projections(tx, hierarchy, graph_id, rule, instance, rhs_typing=Non
             }
 
             # Match nodes
+            parameters = {}
             query = "// Match nodes the instance of the rewritten graph \n"
             query += "MATCH {}".format(
                 ", ".join([
-                    "({}:{} {{id: '{}'}})".format(k, graph_id, v)
+                    "({}:{} {{id: {}}})".format(
+                        k, graph_id, generic.id_literal(v, parameters))
                     for k, v in match_instance_vars.items()
                 ])
             )
@@ -1019,7 +1133,7 @@ def get_rule_projections(tx, hierarchy, graph_id, rule, instance, rhs_typing=Non
                     ["{}_dict as {}".format(v, v) for v in lhs_vars.values()] +
                     ["{}_{}".format(lhs_vars[u], lhs_vars[v]) for u, v in rule.p.edges()]))
 
-            result = tx.run(query)
+            result = tx.run(query, parameters)
             record = result.single()
 
             l_l_ts = {}
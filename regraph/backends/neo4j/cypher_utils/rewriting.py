@@ -10,7 +10,7 @@ from regraph.utils import keys_by_value
 
 def add_node(var_name, node_id, node_id_var, node_label,
              attrs=None, literal_id=True, carry_vars=None,
-             ignore_naming=False):
+             ignore_naming=False, parameters=None):
     """Generate query for node creation.
 
     Parameters
@@ -29,6 +29,9 @@ def add_node(var_name, node_id, node_id_var, node_label,
         treated as the variable name
     carry_vars : iterable
         Collection of variables to carry
+    parameters : dict, optional
+        Parameters of the query, if provided the literal id and the
+        attributes of the node are passed as parameters
 
     Returns
     -------
@@ -38,8 +41,8 @@ def add_node(var_name, node_id, node_id_var, node_label,
         Set of updated variables to carry
 
     """
-    if literal_id:
-        node_id = "'{}'".format(node_id)
+    if literal_id and not ignore_naming:
+        node_id = generic.id_literal(node_id, parameters)
 
     if carry_vars is None:
         carry_vars = set()
@@ -75,7 +78,8 @@ def add_node(var_name, node_id, node_id_var, node_label,
         query += ", " + ", ".join(carry_vars) + "\n"
 
     if attrs is not None:
-        query += generic.set_attributes(var_name, attrs)
+        query += generic.set_attributes(
+            var_name, attrs, parameters=parameters)
 
     carry_vars.add(node_id_var)
     carry_vars.add(var_name)
@@ -83,7 +87,7 @@ def add_node(var_name, node_id, node_id_var, node_label,
 
 
 def add_edge(edge_var, source_var, target_var,
-             edge_label, attrs=None, merge=False):
+             edge_label, attrs=None, merge=False, parameters=None):
     """Generate query for edge creation.
 
     source_var
@@ -96,12 +100,24 @@ def add_edge(edge_var, source_var, target_var,
         Labels associated with the new edge
     attrs : dict, optional
         Attributes of the new edge
+    parameters : dict, optional
+        Parameters of the query, if provided the attributes of
+        the created edge are passed as a parameter (parameter maps
+        are not allowed in MERGE patterns, so merged edges keep
+        literal attributes)
     """
     if merge:
         keyword = "MERGE"
     else:
         keyword = "CREATE"
 
+    if parameters is not None and not merge:
+        return "CREATE ({})-[{}:{} {}]->({})\n".format(
+            source_var, edge_var, edge_label,
+            generic.add_parameter(
+                parameters, generic.generate_attributes_json(attrs)),
+            target_var)
+
     query = "{} ({})-[{}:{} {{ {} }}]->({})\n".format(
         keyword, source_var, edge_var, edge_label,
         generic.generate_attributes(attrs), target_var)
@@ -139,7 +155,7 @@ def remove_nodes(var_names, breakline=True):
     return "DETACH DELETE {}{}".format(', '.join(v for v in var_names), n)
 
 
-def add_attributes(var_name, attrs):
+def add_attributes(var_name, attrs, parameters=None):
     """Generate a subquery to add attributes to an existing node."""
     query = ""
     for k, value in attrs.items():
@@ -158,21 +174,25 @@ def add_attributes(var_name, attrs):
                     "Non universal RegexSet is not allowed as "
                     "an attribute value (not implemented)")
         elif isinstance(value, FiniteSet):
-            # normalize elements to string
-            elements = []
-            for el in value:
-                if type(el) == str:
-                    elements.append("'{}'".format(el))
-                else:
-                    elements.append("{}".format(el))
+            if parameters is None:
+                # normalize elements to string
+                elements = []
+                for el in value:
+                    if type(el) == str:
+                        elements.append("'{}'".format(el))
+                    else:
+                        elements.append("{}".format(el))
+                elements_repr = "[{}]".format(", ".join(elements))
+            else:
+                elements_repr = generic.add_parameter(
+                    parameters, list(value.fset))
             query += (
                 "FOREACH (dummy IN CASE WHEN '{}' IN keys({}) THEN [] ELSE [1] END |".format(
                     k, var_name) +
-                "\tSET {}.{} = [{}])\n".format(var_name, k, ", ".join(
-                    el for el in elements)) +
+                "\tSET {}.{} = {})\n".format(var_name, k, elements_repr) +
                 "FOREACH(dummy IN CASE WHEN '{}' IN keys({}) THEN [1] ELSE [] END |\n".format(
                     k, var_name) +
-                "\tFOREACH(val in [{}] |\n".format(", ".join(el for el in elements)) +
+                "\tFOREACH(val in {} |\n".format(elements_repr) +
                 "\t\tFOREACH(dummy1 IN CASE WHEN NOT val IN {}.{} THEN [1] ELSE [] END |\n".format(
                     var_name, k) +
                 "\t\t\tSET {}.{} = extract(el in {}.{} | toString(el)) + [val])))\n".format(var_name, k, var_name, k)
@@ -184,7 +204,7 @@ def add_attributes(var_name, attrs):
     return query
 
 
-def remove_attributes(var_name, attrs):
+def remove_attributes(var_name, attrs, parameters=None):
     """Generate a subquery to remove attributes to an existing node."""
     query = ""
     for k, value in attrs.items():
@@ -203,19 +223,18 @@ def remove_attributes(var_name, attrs):
                     "Non universal RegexSet is not allowed as "
                     "an attribute value (not implemented)")
         elif isinstance(value, FiniteSet):
-            elements = []
-            for el in value:
-                if type(el) == str:
-                    elements.append("'{}'".format(el))
-                else:
-                    elements.append("{}".format(el))
+            if parameters is None:
+                elements_repr = "[{}]".format(
+                    ", ".join(["{}".format(
+                        "'{}'".format(val) if type(val) != bool else "true" if val else "false") for val in value]))
+            else:
+                elements_repr = generic.add_parameter(
+                    parameters, list(value.fset))
             query += (
                 "FOREACH(dummy IN CASE WHEN '{}' IN keys({}) THEN [1] ELSE [] END |\n".format(
                     k, var_name) +
-                "\tSET {}.{} = filter(v in {}.{} WHERE NOT v IN [{}])\n".format(
-                    var_name, k, var_name, k,
-                    ", ".join(["{}".format(
-                        "'{}'".format(val) if type(val) != bool else "true" if val else "false") for val in value])) +
+                "\tSET {}.{} = filter(v in {}.{} WHERE NOT v IN {})\n".format(
+                    var_name, k, var_name, k, elements_repr) +
                 "\tFOREACH(dumy2 IN CASE WHEN size({}.{})=0 THEN [1] ELSE [] END |\n".format(
                     var_name, k) +
                 "\t\tREMOVE {}.{}))\n".format(
@@ -231,7 +250,7 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
                   node_label, edge_labels, sucs_to_ignore=None,
                   preds_to_ignore=None, suc_vars_to_ignore=None,
                   pred_vars_to_ignore=None,
-                  carry_vars=None, ignore_naming=False):
+                  carry_vars=None, ignore_naming=False, parameters=None):
     """Generate query for cloning a node.
 
     Parameters
@@ -256,6 +275,9 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
         while reconnecting edges to the new clone node
     carry_vars : iterable
         Collection of variables to carry
+    parameters : dict, optional
+        Parameters of the query, if provided the clone id and the ids
+        of the neighbours to ignore are passed as parameters
 
     Returns
     -------
@@ -278,6 +300,9 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
     carry_vars.add(original_var)
     query = ""
 
+    if ignore_naming is not True:
+        clone_id = generic.id_literal(clone_id, parameters)
+
     if ignore_naming is True:
         query += (
             "// create a node corresponding to the clone\n" +
@@ -302,7 +327,7 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
     else:
         query += (
             "// search for a node with the same id as the clone id\n" +
-            "OPTIONAL MATCH (same_id_node:{} {{ id : '{}'}}) \n".format(
+            "OPTIONAL MATCH (same_id_node:{} {{ id : {}}}) \n".format(
                 node_label, clone_id) +
             "WITH same_id_node,  " +
             "CASE WHEN same_id_node IS NOT NULL "
@@ -312,7 +337,7 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
             "// generate new id if the same id node was found\n" +
             "// and filter edges which will be removed \n" +
             "WITH same_id_node, same_id_node_new_count, " +
-            "'{}' + CASE WHEN same_id_node_new_count <> 0 ".format(clone_id) +
+            "{} + CASE WHEN same_id_node_new_count <> 0 ".format(clone_id) +
             "THEN toString(same_id_node_new_count) ELSE '' END as {}, ".format(
                 clone_id_var) +
             ", ".join(carry_vars) + "\n" +
@@ -338,17 +363,30 @@ def cloning_query(original_var, clone_var, clone_id, clone_id_var,
     carry_vars.add(clone_id_var)
     carry_vars.add(clone_var)
 
-    query += (
-        "WITH [{}] as sucIgnore, ".format(
-            ", ".join(
-                ["'{}'".format(n) for n in sucs_to_ignore] +
-                ["id({})".format(n) for n in suc_vars_to_ignore])) +
-        "[{}] as predIgnore, ".format(
-            ", ".join(
-                ["'{}'".format(n) for n in preds_to_ignore] +
-                ["id({})".format(n) for n in pred_vars_to_ignore])) +
-        ", ".join(carry_vars) + " \n"
-    )
+    if parameters is None:
+        query += (
+            "WITH [{}] as sucIgnore, ".format(
+                ", ".join(
+                    ["'{}'".format(n) for n in sucs_to_ignore] +
+                    ["id({})".format(n) for n in suc_vars_to_ignore])) +
+            "[{}] as predIgnore, ".format(
+                ", ".join(
+                    ["'{}'".format(n) for n in preds_to_ignore] +
+                    ["id({})".format(n) for n in pred_vars_to_ignore])) +
+            ", ".join(carry_vars) + " \n"
+        )
+    else:
+        query += (
+            "WITH {} + [{}] as sucIgnore, ".format(
+                generic.ids_literal(sucs_to_ignore, parameters),
+                ", ".join(
+                    "id({})".format(n) for n in suc_vars_to_ignore)) +
+            "{} + [{}] as predIgnore, ".format(
+                generic.ids_literal(preds_to_ignore, parameters),
+                ", ".join(
+                    "id({})".format(n) for n in pred_vars_to_ignore)) +
+            ", ".join(carry_vars) + " \n"
+        )
 
     carry_vars.add("sucIgnore")
     carry_vars.add("predIgnore")
@@ -517,7 +555,7 @@ def merging_query(original_vars, merged_var, merged_id, merged_id_var,
 
 def merging_query1(original_vars, merged_var, merged_id, merged_id_var,
                    node_label, edge_label, merge_typing=False,
-                   carry_vars=None, ignore_naming=False):
+                   carry_vars=None, ignore_naming=False, parameters=None):
     """Generate query for merging nodes.
 
     Parameters
@@ -537,6 +575,9 @@ def merging_query1(original_vars, merged_var, merged_id, merged_id_var,
         Labels of the edges to merge, default is 'edge'
     carry_vars : str
         Collection of variables to carry
+    parameters : dict, optional
+        Parameters of the query, if provided the id of the merged
+        node is passed as a parameter
 
     Returns
     -------
@@ -585,9 +626,10 @@ def merging_query1(original_vars, merged_var, merged_id, merged_id_var,
             ", ".join(carry_vars) + "\n"
         )
     else:
+        merged_id = generic.id_literal(merged_id, parameters)
         query += (
             "// search for a node with the same id as the clone id\n" +
-            "OPTIONAL MATCH (same_id_node:{} {{ id : '{}'}}) \n".format(
+            "OPTIONAL MATCH (same_id_node:{} {{ id : {}}}) \n".format(
                 node_label, merged_id) +
             "WITH same_id_node,  " +
             "CASE WHEN same_id_node IS NOT NULL "
@@ -597,7 +639,7 @@ def merging_query1(original_vars, merged_var, merged_id, merged_id_var,
             "// generate new id if the same id node was found\n" +
             "// and filter edges which will be removed \n" +
             "WITH same_id_node, same_id_node_new_count, " +
-            "'{}' + CASE WHEN same_id_node_new_count <> 0 ".format(merged_id) +
+            "{} + CASE WHEN same_id_node_new_count <> 0 ".format(merged_id) +
             "THEN toString(same_id_node_new_count) ELSE '' END as {}, ".format(
                 merged_id_var) +
             ", ".join(carry_vars) + "\n"
@@ -737,7 +779,8 @@ def merging_query1(original_vars, merged_var, merged_id, merged_id_var,
 
 
 def find_matching(pattern, node_label, edge_label,
-                  nodes=None, pattern_typing=None, undirected_edges=None):
+                  nodes=None, pattern_typing=None, undirected_edges=None,
+                  parameters=None):
     """Query that performs pattern match in the graph.
 
     Parameters
@@ -750,6 +793,10 @@ def find_matching(pattern, node_label, edge_label,
         Label of the node to match, default is 'node'
     edge_label
         Label of the edges to match, default is 'edge'
+    parameters : dict, optional
+        Parameters of the query, if provided the node ids, types and
+        attribute values are passed as parameters, so that the
+        template only depends on the structure of the pattern
     """
     if undirected_edges is None:
         undirected_edges = []
@@ -801,9 +848,10 @@ def find_matching(pattern, node_label, edge_label,
         typing_strs = []
         for typing_graph, mapping in pattern_typing.items():
             typing_strs.append(" AND ".join(
-                "`{}`.id IN [{}]".format(
+                "`{}`.id IN {}".format(
                     "{}_type_{}".format(n, typing_graph),
-                    ", ".join("'{}'".format(t) for t in pattern_typing[typing_graph][n]))
+                    generic.ids_literal(
+                        pattern_typing[typing_graph][n], parameters))
                 for n in pattern.nodes() if n in pattern_typing[typing_graph].keys()
             ))
 
@@ -815,33 +863,33 @@ def find_matching(pattern, node_label, edge_label,
             where_appeared = True
         else:
             query += "AND "
+        nodes_repr = generic.ids_literal(nodes, parameters)
         query +=\
             " AND ".join(
-                "`{}`.id IN [{}]".format(
-                    pattern_n, ", ".join("'{}'".format(n) for n in nodes))
+                "`{}`.id IN {}".format(pattern_n, nodes_repr)
                 for pattern_n in pattern_nodes) + "\n"
 
+    def _value_repr(el):
+        if parameters is not None:
+            return generic.add_parameter(parameters, el)
+        if type(el) == str:
+            return "'{}'".format(el)
+        return "{}".format(el)
+
     nodes_with_attrs = []
     edges_with_attrs = []
     for n, attrs in pattern.nodes(data=True):
         if len(attrs) != 0:
             for k in attrs.keys():
                 for el in attrs[k]:
-                    if type(el) == str:
-                        nodes_with_attrs.append((n, k, "'{}'".format(el)))
-                    else:
-                        nodes_with_attrs.append((n, k, "{}".format(el)))
+                    nodes_with_attrs.append((n, k, _value_repr(el)))
 
     for s, t, attrs in pattern_edges:
         if len(attrs) != 0:
             for k in attrs.keys():
                 for el in attrs[k]:
-                    if type(el) == str:
-                        edges_with_attrs.append(
-                            ("{}_to_{}".format(s, t), k, "'{}'".format(el)))
-                    else:
-                        edges_with_attrs.append(
-                            ("{}_to_{}".format(s, t), k, "{}".format(el)))
+                    edges_with_attrs.append(
+                        ("{}_to_{}".format(s, t), k, _value_repr(el)))
 
     if len(nodes_with_attrs) != 0:
         if where_appeared is True:
@@ -869,7 +917,8 @@ def find_matching(pattern, node_label, edge_label,
 
 
 def match_pattern_instance(pattern, pattern_vars, instance,
-                           node_label, edge_label, match_edges=True):
+                           node_label, edge_label, match_edges=True,
+                           parameters=None):
     """Query to match an instance of the pattern.
 
     Parameters
@@ -883,9 +932,13 @@ def match_pattern_instance(pattern, pattern_vars, instance,
         values are ids of the nodes of the graph
     node_label :
     edge_label :
+    parameters : dict, optional
+        Parameters of the query, if provided the ids of the
+        nodes of the instance are passed as parameters
     """
     query =\
-        generic.match_nodes(instance, node_label=node_label)
+        generic.match_nodes(
+            instance, node_label=node_label, parameters=parameters)
 
     if match_edges and len(pattern.edges()) > 0:
         query +=\
@@ -1441,7 +1494,8 @@ def multiple_cloning_query(original_var, clone_var, clone_id, clone_id_var,
     return query, carry_vars
 
 def rule_to_cypher(rule, instance, node_label="node",
-                   edge_label="edge", generate_var_ids=False):
+                   edge_label="edge", generate_var_ids=False,
+                   parameters=None):
     """Convert a rule on the instance to a Cypher query.
 
     instance : dict
@@ -1453,6 +1507,11 @@ def rule_to_cypher(rule, instance, node_label="node",
         If True the names of the variables will be generated as uuid
         (unreadable, but more secure: guaranteed to avoid any var name
         collisions)
+    parameters : dict, optional
+        Parameters of the query, if provided the ids of the instance
+        nodes and the attribute values are passed as parameters,
+        so that applying the same rule to different instances
+        produces the same query template
     """
     # If names of nodes of the rule graphs (L, P, R) are used as
     # var names, we need to perform escaping on these names
@@ -1491,7 +1550,8 @@ def rule_to_cypher(rule, instance, node_label="node",
         query += "// Match nodes and edges of the instance \n"
         query += match_pattern_instance(
             rule.lhs, lhs_vars, match_instance_vars,
-            node_label=node_label, edge_label=edge_label)
+            node_label=node_label, edge_label=edge_label,
+            parameters=parameters)
         query += "\n\n"
     else:
         query += "// Empty instance \n\n"
@@ -1513,7 +1573,7 @@ def rule_to_cypher(rule, instance, node_label="node",
         sucs_to_ignore = dict()
 
         # Set a p_node that will correspond to the original
-        fixed_node = generic.keys_by_value(
+        fixed_node = keys_by_value(
             preserved_nodes_index,
             min([preserved_nodes_index[p_node] for p_node in p_nodes]))[0]
         fixed_nodes[lhs_node] = fixed_node
@@ -1561,7 +1621,8 @@ def rule_to_cypher(rule, instance, node_label="node",
                 suc_vars_to_ignore=suc_vars_to_ignore,
                 pred_vars_to_ignore=pred_vars_to_ignore,
                 carry_vars=carry_variables,
-                ignore_naming=True)
+                ignore_naming=True,
+                parameters=parameters)
             query += q
             query += generic.with_vars(carry_variables)
             query += "\n\n"
@@ -1595,7 +1656,7 @@ def rule_to_cypher(rule, instance, node_label="node",
     for n in rule.lhs.nodes():
         if n not in rule.removed_nodes():
             if n not in rule.cloned_nodes().keys():
-                new_var_name = p_vars[generic.keys_by_value(rule.p_lhs, n)[0]]
+                new_var_name = p_vars[keys_by_value(rule.p_lhs, n)[0]]
                 vars_to_rename[lhs_vars[n]] = new_var_name
                 carry_variables.remove(lhs_vars[n])
             elif n in fixed_nodes.keys():
@@ -1658,7 +1719,7 @@ def rule_to_cypher(rule, instance, node_label="node",
     # Generate node attrs removal subquery
     for node, attrs in rule.removed_node_attrs().items():
         query += "// Removing properties from node '{}' of P \n".format(node)
-        query += remove_attributes(p_vars[node], attrs)
+        query += remove_attributes(p_vars[node], attrs, parameters)
         query += "\n\n"
 
     # Generate edge attrs removal subquery
@@ -1671,7 +1732,8 @@ def rule_to_cypher(rule, instance, node_label="node",
         query += "MATCH ({})-[{}:edge]->({})\n".format(
             p_vars[u], p_vars[u] + "_" + p_vars[v], p_vars[v])
         carry_variables.add(p_vars[u] + "_" + p_vars[v])
-        query += remove_attributes(p_vars[u] + "_" + p_vars[v], attrs)
+        query += remove_attributes(
+            p_vars[u] + "_" + p_vars[v], attrs, parameters)
         query += "\n\n"
 
     # Generate merging subquery
@@ -1689,7 +1751,8 @@ def rule_to_cypher(rule, instance, node_label="node",
             edge_label=edge_label,
             merge_typing=True,
             carry_vars=carry_variables,
-            ignore_naming=True)
+            ignore_naming=True,
+            parameters=parameters)
         query += q
         query += "\n\n"
 
@@ -1704,7 +1767,8 @@ def rule_to_cypher(rule, instance, node_label="node",
             rhs_vars[rhs_node], rhs_node, new_node_id_var,
             node_label=node_label,
             carry_vars=carry_variables,
-            ignore_naming=True)
+            ignore_naming=True,
+            parameters=parameters)
         query += q
         query += "\n\n"
 
@@ -1742,7 +1806,7 @@ def rule_to_cypher(rule, instance, node_label="node",
     for rhs_node, attrs in rule.added_node_attrs().items():
         query += "// Adding properties to the node " +\
             "'{}' from the rhs \n".format(rhs_node)
-        query += add_attributes(rhs_vars[rhs_node], attrs)
+        query += add_attributes(rhs_vars[rhs_node], attrs, parameters)
         query += "\n\n"
 
     # Generate edges addition subquery
@@ -1758,7 +1822,8 @@ def rule_to_cypher(rule, instance, node_label="node",
             source_var=rhs_vars[u],
             target_var=rhs_vars[v],
             edge_label=edge_label,
-            attrs=rule.rhs.adj[u][v])
+            attrs=rule.rhs.adj[u][v],
+            parameters=parameters)
         if (u, v) in rule.added_edge_attrs().keys():
             carry_variables.add(new_edge_var)
         query += "\n\n"
@@ -1777,7 +1842,7 @@ def rule_to_cypher(rule, instance, node_label="node",
                 rhs_vars[u], edge_var, rhs_vars[v])
             carry_variables.add(edge_var)
 
-        query += add_attributes(edge_var, attrs)
+        query += add_attributes(edge_var, attrs, parameters)
         query += generic.with_vars(carry_variables)
         query += "\n\n"
 
@@ -7,11 +7,14 @@ import os
 import json
 import warnings
 
+from contextlib import contextmanager
+
 from neo4j import GraphDatabase
 
 from regraph.graphs import Graph
 from regraph.backends.networkx.graphs import NXGraph
-from regraph.utils import (normalize_attrs,
+from regraph.utils import (_LRUCache,
+                           normalize_attrs,
                            normalize_relation,
                            load_nodes_from_json,
                            load_edges_from_json,)
@@ -20,6 +23,87 @@ from .cypher_utils import generic
 from .cypher_utils import rewriting
 
 
+class _UnitOfWork(object):
+    """Session and transaction shared by the queries of a batch.
+
+    Outside of a batch every query is run in its own session. Inside
+    of a batch all the queries are run in a single explicit transaction
+    that is committed when the outermost batch exits (and rolled back
+    if it exits with an exception).
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._session = None
+        self._transaction = None
+
+    def run(self, query, parameters=None):
+        """Run a query in the current unit of work."""
+        if self._transaction is not None:
+            return self._transaction.run(query, parameters)
+        with self._driver.session() as session:
+            return session.run(query, parameters)
+
+    def stream(self, query, parameters=None):
+        """Run a query and stream the resulting records."""
+        if self._transaction is not None:
+            for record in self._transaction.run(query, parameters):
+                yield record
+        else:
+            with self._driver.session() as session:
+                for record in session.run(query, parameters):
+                    yield record
+
+    @contextmanager
+    def transaction(self):
+        """Provide an explicit transaction.
+
+        The transaction of the current batch is reused if any,
+        otherwise a new transaction is committed on exit.
+        """
+        if self._transaction is not None:
+            yield self._transaction
+        else:
+            with self._driver.session() as session:
+                tx = session.begin_transaction()
+                yield tx
+                tx.commit()
+
+    @contextmanager
+    def batch(self):
+        """Run all the queries of the block in a single transaction."""
+        if self._transaction is not None:
+            # Nested batches are part of the outermost one
+            yield
+            return
+        self._session = self._driver.session()
+        self._transaction = self._session.begin_transaction()
+        try:
+            yield
+        except BaseException:
+            self._transaction.rollback()
+            raise
+        else:
+            self._transaction.commit()
+        finally:
+            self._transaction = None
+            self._session.close()
+            self._session = None
+
+
+def _copy_cached(value):
+    """Copy a cached value, so that callers cannot modify the cache."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, set):
+        return set(value)
+    return [
+        tuple(dict(el) if isinstance(el, dict) else el for el in item)
+        if isinstance(item, tuple) else item
+        for item in value
+    ]
+
+
 class Neo4jGraph(Graph):
     """Class implementing Neo4j graph instance.
 
@@ -37,13 +121,21 @@ class Neo4jGraph(Graph):
         Label of nodes inducing the manipulated subgraph.
     _edge_label : str
         Type of relations used in the manipulated subgraph.
+    _unit_of_work : _UnitOfWork
+        Session and transaction used to execute the queries
+        (see `batch`)
+    _cache : dict
+        Read-through caches of the node and edge lists, node
+        attributes, successors and predecessors (None if
+        caching is disabled, see `set_cache_size`)
     """
 
     def __init__(self, driver=None, uri=None,
                  user=None, password=None,
                  node_label="node",
                  edge_label="edge",
-                 unique_node_ids=True):
+                 unique_node_ids=True,
+                 cache_size=None):
         """Initialize Neo4jGraph object.
 
         Parameters
@@ -65,6 +157,12 @@ class Neo4jGraph(Graph):
         unique_node_ids : bool, optional
             Flag, if True the uniqueness constraint on the property
             'id' of nodes is imposed, by default True
+        cache_size : int, optional
+            Maximum number of nodes whose attributes, successors and
+            predecessors are cached by the object, by default None
+            (no caching). The cache is invalidated by the methods of
+            the object modifying the graph, if the graph is modified
+            by other means, `clear_cache` should be called.
 
         If database driver is provided, uses it for
         connecting to database, otherwise creates
@@ -75,6 +173,9 @@ class Neo4jGraph(Graph):
                 uri, auth=(user, password))
         else:
             self._driver = driver
+        self._unit_of_work = _UnitOfWork(self._driver)
+        self._cache = None
+        self.set_cache_size(cache_size)
 
         self._node_label = node_label
         self._edge_label = edge_label
@@ -86,12 +187,128 @@ class Neo4jGraph(Graph):
                 warnings.warn(
                     "Failed to create id uniqueness constraint")
 
-    def _execute(self, query):
-        """Execute a Cypher query."""
-        with self._driver.session() as session:
-            if len(query) > 0:
-                result = session.run(query)
-                return result
+    def _execute(self, query, parameters=None):
+        """Execute a Cypher query.
+
+        Parameters
+        ----------
+        query : str
+            Cypher query (template)
+        parameters : dict, optional
+            Parameters of the query
+        """
+        if len(query) > 0:
+            return self._unit_of_work.run(query, parameters)
+
+    def _execute_stream(self, query, parameters=None):
+        """Execute a Cypher query and stream the resulting records.
+
+        The session stays open while the records are consumed, so
+        that they are fetched from the Bolt cursor on demand instead
+        of being materialized at once.
+        """
+        return self._unit_of_work.stream(query, parameters)
+
+    @contextmanager
+    def batch(self):
+        """Execute a block of operations as a single unit of work.
+
+        All the queries issued inside of the block share one session
+        and one explicit transaction, committed once when the block
+        exits (or rolled back if an exception is raised). Batches
+        can be nested, in which case the outermost one commits.
+        Schema updates (uniqueness constraints) are always performed
+        in their own sessions.
+
+        Examples
+        --------
+        >>> with graph.batch():
+        ...     graph.add_node("a")
+        ...     graph.add_node("b")
+        ...     graph.add_edge("a", "b")
+        """
+        try:
+            with self._unit_of_work.batch():
+                yield
+        except BaseException:
+            # the cache may hold the values read from the rolled back
+            # transaction
+            self.clear_cache()
+            raise
+
+    def set_cache_size(self, cache_size):
+        """Set the size of the read-through cache of the graph.
+
+        Parameters
+        ----------
+        cache_size : int or None
+            Maximum number of nodes whose attributes, successors and
+            predecessors are cached, the least recently used entries
+            are discarded first. If None, caching is disabled.
+        """
+        if cache_size is None:
+            self._cache = None
+        elif self._cache is None:
+            self._cache = {
+                "nodes": _LRUCache(2),
+                "edges": _LRUCache(2),
+                "attrs": _LRUCache(cache_size),
+                "successors": _LRUCache(cache_size),
+                "predecessors": _LRUCache(cache_size)
+            }
+        else:
+            for name in ["attrs", "successors", "predecessors"]:
+                self._cache[name].resize(cache_size)
+
+    def clear_cache(self):
+        """Remove all the entries from the read-through cache.
+
+        Should be called when the graph was modified in the database
+        without using the methods of this object (for example, by
+        another client or by a rewriting in a hierarchy).
+        """
+        if self._cache is not None:
+            for cache in self._cache.values():
+                cache.invalidate()
+
+    def cache_info(self):
+        """Get statistics of the read-through cache of the graph.
+
+        Returns
+        -------
+        info : dict
+            Dictionary whose keys are the names of the caches ("nodes",
+            "edges", "attrs", "successors", "predecessors") and whose
+            values are dictionaries with the number of cache hits
+            ("hits"), misses ("misses"), the ratio of hits ("hit_rate"),
+            the number of cached entries ("size") and the maximum number
+            of entries ("maxsize"). None if caching is disabled.
+        """
+        if self._cache is None:
+            return None
+        info = dict()
+        for name, cache in self._cache.items():
+            info[name] = cache.info()
+            lookups = cache.hits + cache.misses
+            info[name]["hit_rate"] = (
+                cache.hits / lookups if lookups > 0 else 0.0
+            )
+        return info
+
+    def _read_through(self, name, key, factory):
+        """Get a value from the cache `name`, read it with `factory` if absent."""
+        if self._cache is None:
+            return factory()
+        return _copy_cached(self._cache[name].get(key, factory))
+
+    def _invalidate(self, name, keys=None):
+        """Remove the entries of `keys` (all if None) from the cache `name`."""
+        if self._cache is not None:
+            if keys is None:
+                self._cache[name].invalidate()
+            else:
+                for key in keys:
+                    self._cache[name].discard(key)
 
     def _close(self):
         """Close connection to the database."""
@@ -106,6 +323,7 @@ class Neo4jGraph(Graph):
         """
         query = generic.clear_graph(self._node_label)
         result = self._execute(query)
+        self.clear_cache()
         return result
 
     def _set_constraint(self, prop):
@@ -124,7 +342,8 @@ class Neo4jGraph(Graph):
         """
         query = "CREATE " + generic.constraint_query(
             'n', self._node_label, prop)
-        result = self._execute(query)
+        with self._driver.session() as session:
+            result = session.run(query)
         return result
 
     def _drop_constraint(self, prop):
@@ -141,13 +360,19 @@ class Neo4jGraph(Graph):
         """
         try:
             query = "DROP " + generic.constraint_query('n', self._node_label, prop)
-            result = self.execute(query)
+            with self._driver.session() as session:
+                result = session.run(query)
             return result
         except:
             warnings.warn("Failed to drop constraint")
 
     def nodes(self, data=False):
         """Return a list of nodes of the graph."""
+        return self._read_through(
+            "nodes", data, lambda: self._read_nodes(data))
+
+    def _read_nodes(self, data=False):
+        """Read the list of nodes of the graph from the database."""
         query = generic.get_nodes(node_label=self._node_label, data=data)
         result = self._execute(query)
 
@@ -165,6 +390,11 @@ class Neo4jGraph(Graph):
 
     def edges(self, data=False):
         """Return the list of edges of the graph."""
+        return self._read_through(
+            "edges", data, lambda: self._read_edges(data))
+
+    def _read_edges(self, data=False):
+        """Read the list of edges of the graph from the database."""
         query = generic.get_edges(
             self._node_label,
             self._node_label,
@@ -173,12 +403,13 @@ class Neo4jGraph(Graph):
         result = self._execute(query)
         edges = []
 
+        nodes = set(self.nodes())
         for d in result:
-            if d["source_id"] not in self.nodes():
+            if d["source_id"] not in nodes:
                 s = int(d["source_id"])
             else:
                 s = d["source_id"]
-            if d["target_id"] not in self.nodes():
+            if d["target_id"] not in nodes:
                 t = int(d["target_id"])
             else:
                 t = d["target_id"]
@@ -198,13 +429,15 @@ class Neo4jGraph(Graph):
         graph : networkx.(Di)Graph or regraph.neo4j.Neo4jGraph
         node_id : hashable, node id.
         """
-        query = generic.get_node_attrs(
-            node_id, self._node_label,
-            "attributes")
-        result = self._execute(query)
-        attrs = generic.properties_to_attributes(
-            result, "attributes")
-        return attrs
+        def _read_attrs():
+            parameters = {}
+            query = generic.get_node_attrs(
+                node_id, self._node_label,
+                "attributes", parameters=parameters)
+            result = self._execute(query, parameters)
+            return generic.properties_to_attributes(
+                result, "attributes")
+        return self._read_through("attrs", node_id, _read_attrs)
 
     def get_edge(self, s, t):
         """Get edge attributes.
@@ -215,12 +448,13 @@ class Neo4jGraph(Graph):
         s : hashable, source node id.
         t : hashable, target node id.
         """
+        parameters = {}
         query = generic.get_edge_attrs(
             s, t,
             self._node_label,
             self._edge_label,
-            "attributes")
-        result = self._execute(query)
+            "attributes", parameters=parameters)
+        result = self._execute(query, parameters)
         return generic.properties_to_attributes(
             result, "attributes")
 
@@ -237,19 +471,98 @@ class Neo4jGraph(Graph):
         if attrs is None:
             attrs = dict()
         normalize_attrs(attrs)
+        parameters = {}
         query =\
             rewriting.add_node(
                 "n", node, 'new_id',
                 node_label=self._node_label,
                 attrs=attrs,
                 literal_id=True,
-                ignore_naming=ignore_naming)[0] +\
+                ignore_naming=ignore_naming,
+                parameters=parameters)[0] +\
             generic.return_vars(['new_id'])
 
-        result = self._execute(query)
+        result = self._execute(query, parameters)
         new_id = result.single()['new_id']
+        self._invalidate("nodes")
+        for name in ["attrs", "successors", "predecessors"]:
+            self._invalidate(name, [new_id])
         return new_id
 
+    def add_nodes_from(self, node_list, chunk_size=generic.BULK_CHUNK_SIZE):
+        """Add nodes from a node list.
+
+        The nodes are sent to the database in chunks of `chunk_size`
+        elements, each chunk is created by a single `UNWIND` query.
+        As in `add_node`, a node whose id is already used in the
+        graph is created with a new id.
+
+        Parameters
+        ----------
+        node_list : iterable
+            Iterable containing a collection of nodes, optionally,
+            with their attributes
+        chunk_size : int, optional
+            Number of nodes sent per query
+        """
+        def _normalized_nodes():
+            for n in node_list:
+                node_id, node_attrs = n, None
+                if type(n) != str:
+                    try:
+                        node_id, node_attrs = n
+                    except (TypeError, ValueError):
+                        pass
+                attrs = dict(node_attrs) if node_attrs else dict()
+                normalize_attrs(attrs)
+                yield node_id, attrs
+
+        for chunk in generic.chunks(_normalized_nodes(), chunk_size):
+            parameters = {}
+            query = generic.add_nodes_batch(
+                chunk, self._node_label, parameters=parameters)
+            self._execute(query, parameters)
+        # nodes with already existing ids are renamed, so any id
+        # may be new
+        self.clear_cache()
+
+    def add_edges_from(self, edge_list, chunk_size=generic.BULK_CHUNK_SIZE):
+        """Add edges from an edge list.
+
+        The edges are sent to the database in chunks of `chunk_size`
+        elements, each chunk is created by a single `UNWIND` query.
+
+        Parameters
+        ----------
+        edge_list : iterable
+            Iterable containing a collection of edges, optionally,
+            with their attributes
+        chunk_size : int, optional
+            Number of edges sent per query
+        """
+        def _normalized_edges():
+            for e in edge_list:
+                if len(e) == 2:
+                    attrs = dict()
+                elif len(e) == 3:
+                    attrs = dict(e[2]) if e[2] else dict()
+                else:
+                    raise ReGraphError(
+                        "Was expecting 2 or 3 elements per tuple, got %s." %
+                        str(len(e))
+                    )
+                normalize_attrs(attrs)
+                yield e[0], e[1], attrs
+
+        for chunk in generic.chunks(_normalized_edges(), chunk_size):
+            parameters = {}
+            query = generic.add_edges_batch(
+                chunk, self._node_label, self._edge_label,
+                parameters=parameters)
+            self._execute(query, parameters)
+        for name in ["edges", "successors", "predecessors"]:
+            self._invalidate(name)
+
     def remove_node(self, node):
         """Remove node.
 
@@ -258,12 +571,18 @@ class Neo4jGraph(Graph):
         graph : networkx.(Di)Graph
         node_id : hashable, node to remove.
         """
+        parameters = {}
         query =\
             generic.match_node(
                 "n", node,
-                node_label=self._node_label) +\
+                node_label=self._node_label,
+                parameters=parameters) +\
             rewriting.remove_node("n")
-        result = self._execute(query)
+        result = self._execute(query, parameters)
+        self._invalidate("attrs", [node])
+        # adjacency of the neighbours of the node changes as well
+        for name in ["nodes", "edges", "successors", "predecessors"]:
+            self._invalidate(name)
         return result
 
     def add_edge(self, s, t, attrs=None, **attr):
@@ -280,18 +599,28 @@ class Neo4jGraph(Graph):
         if attrs is None:
             attrs = dict()
         normalize_attrs(attrs)
+        parameters = {}
         query = generic.match_nodes(
             {"s": s, "t": t},
-            node_label=self._node_label)
+            node_label=self._node_label,
+            parameters=parameters)
         query += rewriting.add_edge(
             edge_var='new_edge',
             source_var="s",
             target_var="t",
             edge_label=self._edge_label,
-            attrs=attrs)
-        result = self._execute(query)
+            attrs=attrs,
+            parameters=parameters)
+        result = self._execute(query, parameters)
+        self._invalidate_edge(s, t)
         return result
 
+    def _invalidate_edge(self, s, t):
+        """Remove the cache entries affected by a change of the edge s->t."""
+        self._invalidate("edges")
+        self._invalidate("successors", [s])
+        self._invalidate("predecessors", [t])
+
     def remove_edge(self, s, t):
         """Remove edge from the graph.
 
@@ -301,13 +630,16 @@ class Neo4jGraph(Graph):
         s : hashable, source node id.
         t : hashable, target node id.
         """
+        parameters = {}
         query =\
             generic.match_edge(
                 "s", "t", s, t, 'edge_var',
                 self._node_label, self._node_label,
-                edge_label='edge') +\
+                edge_label=self._edge_label,
+                parameters=parameters) +\
             rewriting.remove_edge('edge_var')
-        result = self._execute(query)
+        result = self._execute(query, parameters)
+        self._invalidate_edge(s, t)
         return result
 
     def update_node_attrs(self, node_id, attrs, normalize=True):
@@ -321,11 +653,16 @@ class Neo4jGraph(Graph):
 
         """
         normalize_attrs(attrs)
+        parameters = {}
         query = (
-            generic.match_node("n", node_id, self._node_label) +
-            generic.set_attributes("n", attrs, update=True)
+            generic.match_node(
+                "n", node_id, self._node_label, parameters=parameters) +
+            generic.set_attributes(
+                "n", attrs, update=True, parameters=parameters)
         )
-        result = self._execute(query)
+        result = self._execute(query, parameters)
+        self._invalidate("attrs", [node_id])
+        self._invalidate("nodes", [True])
         return result
 
     def update_edge_attrs(self, s, t, attrs, normalize=True):
@@ -340,23 +677,33 @@ class Neo4jGraph(Graph):
 
         """
         normalize_attrs(attrs)
+        parameters = {}
         query = (
             generic.match_edge(
                 "s", "t", s, t, "rel",
                 self._node_label, self._node_label,
-                self._edge_label) +
-            generic.set_attributes("rel", attrs, update=True)
+                self._edge_label, parameters=parameters) +
+            generic.set_attributes(
+                "rel", attrs, update=True, parameters=parameters)
         )
-        result = self._execute(query)
+        result = self._execute(query, parameters)
+        self._invalidate("edges", [True])
         return result
 
     def successors(self, node_id):
         """Return the set of successors."""
+        return self._read_through(
+            "successors", node_id, lambda: self._read_successors(node_id))
+
+    def _read_successors(self, node_id):
+        """Read the set of successors from the database."""
+        parameters = {}
         query = generic.successors_query(
-            node_id, node_id,
+            "n", node_id,
             node_label=self._node_label,
-            edge_label=self._edge_label)
-        result = self._execute(query)
+            edge_label=self._edge_label,
+            parameters=parameters)
+        result = self._execute(query, parameters)
         succ = set()
         for record in result:
             if record["suc"] is not None:
@@ -365,11 +712,19 @@ class Neo4jGraph(Graph):
 
     def predecessors(self, node_id):
         """Return the set of predecessors."""
+        return self._read_through(
+            "predecessors", node_id,
+            lambda: self._read_predecessors(node_id))
+
+    def _read_predecessors(self, node_id):
+        """Read the set of predecessors from the database."""
+        parameters = {}
         query = generic.predecessors_query(
-            node_id, node_id,
+            "n", node_id,
             node_label=self._node_label,
-            edge_label=self._edge_label)
-        result = self._execute(query)
+            edge_label=self._edge_label,
+            parameters=parameters)
+        result = self._execute(query, parameters)
         pred = set()
         for record in result:
             if record["pred"] is not None:
@@ -403,57 +758,88 @@ class Neo4jGraph(Graph):
                       graph_typing=None, pattern_typing=None,
                       undirected_edges=None):
         """Find matching of a pattern in a graph."""
+        return list(self.iter_matching(
+            pattern, nodes, graph_typing, pattern_typing,
+            undirected_edges=undirected_edges))
+
+    def iter_matching(self, pattern, nodes=None,
+                      graph_typing=None, pattern_typing=None,
+                      undirected_edges=None, limit=None):
+        """Iterate over the instances of a pattern in a graph.
+
+        The records of the matching query are streamed from the
+        database cursor and converted to instances one by one.
+
+        Parameters
+        ----------
+        pattern : Graph object
+            Pattern graph to search for
+        nodes : iterable, optional
+            Subset of nodes to search for matching
+        graph_typing : dict of dict, optional
+            Dictionary defining typing of graph nodes
+        pattern_typing : dict of dict, optional
+            Dictionary definiting typing of pattern nodes
+        limit : int, optional
+            Maximum number of instances to produce
+
+        Returns
+        -------
+        instances : iterator of dict's
+            Iterator over instances of matching found in the graph
+        """
         new_pattern_typing = dict()
         if pattern_typing:
             for graph, pattern_mapping in pattern_typing.items():
                 new_pattern_typing[graph] = normalize_relation(
                     pattern_mapping)
 
-        if len(pattern.nodes()) != 0:
-
-            # filter nodes by typing
-            matching_nodes = set()
-            for pattern_node in pattern.nodes():
-                for node in self.nodes():
-                    type_matches = True
-                    if new_pattern_typing:
-                        # check types match
-                        for graph, pattern_mapping in new_pattern_typing.items():
-                            if node in graph_typing[graph].keys() and\
-                               pattern_node in pattern_mapping.keys():
-                                if graph_typing[graph][node] not in pattern_mapping[
-                                        pattern_node]:
-                                    type_matches = False
-                    if type_matches and nodes and node in nodes:
-                        matching_nodes.add(node)
-
-            query = rewriting.find_matching(
-                pattern,
-                node_label=self._node_label,
-                edge_label=self._edge_label,
-                nodes=matching_nodes,
-                pattern_typing=new_pattern_typing,
-                undirected_edges=undirected_edges)
-
-            result = self._execute(query)
-            instances = list()
-
-            for record in result:
-                instance = dict()
-                for k, v in record.items():
-                    instance[k] = dict(v)["id"]
-
-                new_instance = dict()
-                for pattern_node, v in instance.items():
-                    if pattern_node not in pattern.nodes():
-                        new_instance[int(pattern_node)] = v
-                    else:
-                        new_instance[pattern_node] = v
-
-                instances.append(new_instance)
-        else:
-            instances = []
-        return instances
+        if len(pattern.nodes()) == 0:
+            return iter([])
+
+        # filter nodes by typing
+        matching_nodes = set()
+        for pattern_node in pattern.nodes():
+            for node in self.nodes():
+                type_matches = True
+                if new_pattern_typing:
+                    # check types match
+                    for graph, pattern_mapping in new_pattern_typing.items():
+                        if node in graph_typing[graph].keys() and\
+                           pattern_node in pattern_mapping.keys():
+                            if graph_typing[graph][node] not in pattern_mapping[
+                                    pattern_node]:
+                                type_matches = False
+                if type_matches and nodes and node in nodes:
+                    matching_nodes.add(node)
+
+        parameters = {}
+        query = rewriting.find_matching(
+            pattern,
+            node_label=self._node_label,
+            edge_label=self._edge_label,
+            nodes=matching_nodes,
+            pattern_typing=new_pattern_typing,
+            undirected_edges=undirected_edges,
+            parameters=parameters)
+        if limit is not None:
+            query += "\nLIMIT {}".format(
+                generic.add_parameter(parameters, limit))
+
+        pattern_nodes = pattern.nodes()
+
+        def _record_to_instance(record):
+            instance = dict()
+            for pattern_node, v in record.items():
+                if pattern_node not in pattern_nodes:
+                    pattern_node = int(pattern_node)
+                instance[pattern_node] = dict(v)["id"]
+            return instance
+
+        return (
+            _record_to_instance(record)
+            for record in self._execute_stream(query, parameters)
+        )
 
     def relabel_node(self, node_id, new_id):
         """Relabel a node in the graph.
@@ -470,25 +856,33 @@ class Neo4jGraph(Graph):
                 "Cannot relabel '{}' to '{}', '{}' ".format(
                     node_id, new_id, new_id) +
                 "already exists in the graph")
-        query = generic.set_id(self._node_label, node_id, new_id)
-        result = self._execute(query)
+        parameters = {}
+        query = generic.set_id(
+            self._node_label, node_id, new_id, parameters=parameters)
+        result = self._execute(query, parameters)
+        self.clear_cache()
         return result
 
     @classmethod
     def from_json(cls, driver=None, uri=None, user=None, password=None,
-                  json_data=None, node_label="node", edge_label="edge"):
+                  json_data=None, node_label="node", edge_label="edge",
+                  chunk_size=generic.BULK_CHUNK_SIZE):
         """Create a Neo4jGraph from a json-like dictionary.
 
         Parameters
         ----------
         json_data : dict
             JSON-like dictionary with graph representation
+        chunk_size : int, optional
+            Number of nodes/edges sent per query
         """
         graph = cls(
             driver=driver, uri=uri, user=user, password=password,
             node_label=node_label, edge_label=edge_label)
-        graph.add_nodes_from(load_nodes_from_json(json_data))
-        graph.add_edges_from(load_edges_from_json(json_data))
+        graph.add_nodes_from(
+            load_nodes_from_json(json_data), chunk_size=chunk_size)
+        graph.add_edges_from(
+            load_edges_from_json(json_data), chunk_size=chunk_size)
         return graph
 
     @classmethod
@@ -540,15 +934,109 @@ class Neo4jGraph(Graph):
                     filename)
             )
 
-    def nodes_disconnected_from(self, node_id):
-        """Find nodes disconnected from the input node."""
-        query = (
-            "MATCH (n:{} {{id: '{}'}}), (m:{})\n".format(
-                self._node_label, node_id, self._node_label) +
-            "WHERE NOT (n)-[:{}*1..]-(m) AND n.id <> m.id\n".format(
-                self._edge_label) +
-            "RETURN collect(m.id) as disconnected_nodes"
-        )
-        res = self._execute(query)
+    def nodes_disconnected_from(self, node_id, max_depth=None):
+        """Find nodes disconnected from the input node.
+
+        Parameters
+        ----------
+        node_id : hashable
+            Id of the node
+        max_depth : int, optional
+            Maximum length of the (undirected) paths connecting
+            nodes, by default unbounded (the connected component
+            is computed by a node-visiting traversal of APOC)
+
+        Returns
+        -------
+        nodes : list
+            Ids of the nodes not connected to the input node
+        """
+        parameters = {}
+        query = generic.disconnected_nodes_query(
+            node_id, self._node_label, self._edge_label,
+            max_depth=max_depth, parameters=parameters)
+        res = self._execute(query, parameters)
         for record in res:
             return record["disconnected_nodes"]
+
+    def ancestors(self, t, max_depth=None):
+        """Return the set of ancestors.
+
+        The ancestors are found by a single traversal query
+        performed by the database.
+
+        Parameters
+        ----------
+        t : hashable
+            Id of the node
+        max_depth : int, optional
+            Maximum length of the paths to the ancestors,
+            by default unbounded
+        """
+        parameters = {}
+        query = generic.ancestor_ids_query(
+            t, self._node_label, self._edge_label,
+            max_depth=max_depth, parameters=parameters)
+        result = self._execute(query, parameters)
+        ancestors = set()
+        for record in result:
+            ancestors.update(record["ancestors"])
+        return ancestors
+
+    def descendants(self, s, max_depth=None):
+        """Return the set of descendants.
+
+        The descendants are found by a single traversal query
+        performed by the database.
+
+        Parameters
+        ----------
+        s : hashable
+            Id of the node
+        max_depth : int, optional
+            Maximum length of the paths to the descendants,
+            by default unbounded
+        """
+        parameters = {}
+        query = generic.descendant_ids_query(
+            s, self._node_label, self._edge_label,
+            max_depth=max_depth, parameters=parameters)
+        result = self._execute(query, parameters)
+        descendants = set()
+        for record in result:
+            descendants.update(record["descendants"])
+        return descendants
+
+    def subgraph(self, nodes):
+        """Get a subgraph induced by the collection of nodes.
+
+        The nodes, their attributes and the edges between them are
+        retrieved by a single query.
+
+        Parameters
+        ----------
+        nodes : iterable
+            Ids of the nodes inducing the subgraph
+
+        Returns
+        -------
+        subgraph : regraph.NXGraph
+            In-memory copy of the induced subgraph
+        """
+        parameters = {}
+        query = generic.subgraph_query(
+            nodes, self._node_label, self._edge_label,
+            parameters=parameters)
+        result = self._execute(query, parameters)
+
+        g = NXGraph()
+        edges = []
+        for record in result:
+            attrs = generic.convert_props_to_attrs(dict(record["attrs"]))
+            g.add_node(record["node_id"], attrs)
+            for edge in record["edges"]:
+                edges.append((
+                    record["node_id"], edge["target"],
+                    generic.convert_props_to_attrs(dict(edge["attrs"]))))
+        g.add_edges_from(edges)
+        return g
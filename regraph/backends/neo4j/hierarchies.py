@@ -21,8 +21,9 @@ from regraph.exceptions import (HierarchyError,
                                 ReGraphWarning,
                                 RewritingError)
 from regraph.hierarchies import Hierarchy
-from regraph.backends.neo4j.graphs import Neo4jGraph
-from .cypher_utils.generic import (constraint_query,
+from regraph.backends.neo4j.graphs import Neo4jGraph, _UnitOfWork
+from .cypher_utils.generic import (BULK_CHUNK_SIZE,
+                                   constraint_query,
                                    get_nodes,
                                    get_edges,
                                    clear_graph,
@@ -37,8 +38,14 @@ from .cypher_utils.generic import (constraint_query,
                                    match_node,
                                    shortest_path_query,
                                    match_edge,
+                                   id_literal,
+                                   chunks,
+                                   load_graph_from_json,
                                    )
 from .cypher_utils.propagation import (set_intergraph_edge,
+                                       set_intergraph_edges,
+                                       retarget_intergraph_edges,
+                                       remove_intergraph_edges,
                                        check_homomorphism,
                                        check_consistency,
                                        get_typing,
@@ -114,22 +121,26 @@ class Neo4jHierarchy(Hierarchy):
 
     def successors(self, node_id):
         """Return the set of successors."""
+        parameters = {}
         query = successors_query(var_name='g',
                                  node_id=node_id,
                                  node_label=self._graph_label,
-                                 edge_label=self._typing_label)
-        succ = self.execute(query).value()
+                                 edge_label=self._typing_label,
+                                 parameters=parameters)
+        succ = self.execute(query, parameters).value()
         if succ[0] is None:
             succ = []
         return succ
 
     def predecessors(self, node_id):
         """Return the set of predecessors."""
+        parameters = {}
         query = predecessors_query(var_name='g',
                                    node_id=node_id,
                                    node_label=self._graph_label,
-                                   edge_label=self._typing_label)
-        preds = self.execute(query).value()
+                                   edge_label=self._typing_label,
+                                   parameters=parameters)
+        preds = self.execute(query, parameters).value()
         if preds[0] is None:
             preds = []
         return preds
@@ -181,10 +192,11 @@ class Neo4jHierarchy(Hierarchy):
         graph_id : hashable
             Id of the graph
         """
+        parameters = {}
         query = get_node_attrs(
             graph_id, self._graph_label,
-            "attributes")
-        result = self.execute(query)
+            "attributes", parameters=parameters)
+        result = self.execute(query, parameters)
         return properties_to_attributes(
             result, "attributes")
 
@@ -209,10 +221,11 @@ class Neo4jHierarchy(Hierarchy):
         target : hashable
             Id of the target graph
         """
+        parameters = {}
         query = get_edge_attrs(
-            source_id, target_id, self._typing_label,
-            "attributes")
-        result = self.execute(query)
+            source_id, target_id, self._graph_label, self._typing_label,
+            "attributes", parameters=parameters)
+        result = self.execute(query, parameters)
         return properties_to_attributes(result, "attributes")
 
     def set_typing_attrs(self, source, target, attrs):
@@ -238,10 +251,11 @@ class Neo4jHierarchy(Hierarchy):
         right : hashable
             Id of the right graph
         """
+        parameters = {}
         query = get_edge_attrs(
-            left_id, right_id, self._relation_label,
-            "attributes")
-        result = self.execute(query)
+            left_id, right_id, self._graph_label, self._relation_label,
+            "attributes", parameters=parameters)
+        result = self.execute(query, parameters)
         return properties_to_attributes(result, "attributes")
 
     def set_relation_attrs(self, left, right, attrs):
@@ -264,10 +278,11 @@ class Neo4jHierarchy(Hierarchy):
         Parameters
         ----------
         """
+        parameters = {}
         query = set_intergraph_edge(
             left_graph, right_graph, left_node, right_node,
-            "relation")
-        self.execute(query)
+            "relation", parameters=parameters)
+        self.execute(query, parameters)
 
     def add_graph(self, graph_id, graph, attrs=None):
         """Add a new graph to the hierarchy.
@@ -285,7 +300,8 @@ class Neo4jHierarchy(Hierarchy):
         self.add_graph_from_data(
             graph_id, graph.nodes(data=True), graph.edges(data=True), attrs)
 
-    def add_graph_from_data(self, graph_id, node_list, edge_list, attrs=None):
+    def add_graph_from_data(self, graph_id, node_list, edge_list, attrs=None,
+                            chunk_size=BULK_CHUNK_SIZE):
         """Add a new graph to the hierarchy from the input node/edge lists.
 
         Parameters
@@ -298,19 +314,23 @@ class Neo4jHierarchy(Hierarchy):
             List of edges (with attributes)
         graph_attrs : dict, optional
             Dictionary containing attributes of the new node
+        chunk_size : int, optional
+            Number of nodes/edges sent per query
         """
         try:
             # Create a node in the hierarchy
-            query = "CREATE ({}:{} {{ id : '{}' }}) \n".format(
+            parameters = {}
+            query = "CREATE ({}:{} {{ id : {} }}) \n".format(
                 'new_graph',
                 self._graph_label,
-                graph_id)
+                id_literal(graph_id, parameters))
             if attrs is not None:
                 normalize_attrs(attrs)
                 query += set_attributes(
                     var_name='new_graph',
-                    attrs=attrs)
-            self.execute(query)
+                    attrs=attrs,
+                    parameters=parameters)
+            self.execute(query, parameters)
         except(ConstraintError):
             raise HierarchyError(
                 "The graph '{}' is already in the database.".format(graph_id))
@@ -318,10 +338,34 @@ class Neo4jHierarchy(Hierarchy):
             driver=self._driver,
             node_label=graph_id,
             unique_node_ids=True)
+        g._unit_of_work = self._unit_of_work
         if node_list is not None:
-            g.add_nodes_from(node_list)
+            g.add_nodes_from(node_list, chunk_size=chunk_size)
         if edge_list is not None:
-            g.add_edges_from(edge_list)
+            g.add_edges_from(edge_list, chunk_size=chunk_size)
+
+    def add_graph_from_json(self, graph_id, json_data, attrs=None,
+                            chunk_size=BULK_CHUNK_SIZE):
+        """Add a new graph to the hirarchy from its JSON-reprsentation.
+
+        Nodes and edges are streamed from `json_data` to the database
+        in chunks of `chunk_size` elements.
+
+        Parameters
+        ----------
+        graph_id : hashable
+            Id of the new graph
+        json_data : dict
+            JSON-like dictionary containing the representation of the graph
+        attrs : dict
+            Attributes to attach to the new graph
+        chunk_size : int, optional
+            Number of nodes/edges sent per query
+        """
+        self.add_graph_from_data(graph_id, None, None, attrs)
+        for query, parameters in load_graph_from_json(
+                json_data, graph_id, "edge", chunk_size=chunk_size):
+            self.execute(query, parameters)
 
     def add_empty_graph(self, graph_id, attrs=None):
         """"Add a new empty graph to the hierarchy.
@@ -373,26 +417,21 @@ class Neo4jHierarchy(Hierarchy):
         normalize_attrs(tmp_attrs)
 
         if len(mapping) > 0:
-            with self._driver.session() as session:
-                tx = session.begin_transaction()
-                for u, v in mapping.items():
-                    query = (
-                        set_intergraph_edge(
-                            source, target,
-                            u, v, "typing",
-                            attrs=tmp_attrs))
-                    tx.run(query)
-                tx.commit()
+            with self._unit_of_work.transaction() as tx:
+                for pairs in chunks(mapping.items(), BULK_CHUNK_SIZE):
+                    parameters = {}
+                    query = set_intergraph_edges(
+                        source, target, pairs, "typing",
+                        attrs=tmp_attrs, parameters=parameters)
+                    tx.run(query, parameters)
 
         valid_typing = True
         paths_commute = True
         if check:
             # We first check that the homorphism is valid
             try:
-                with self._driver.session() as session:
-                    tx = session.begin_transaction()
+                with self._unit_of_work.transaction() as tx:
                     valid_typing = check_homomorphism(tx, source, target)
-                    tx.commit()
             except InvalidHomomorphism as homomorphism_error:
                 valid_typing = False
                 del_query = (
@@ -404,10 +443,8 @@ class Neo4jHierarchy(Hierarchy):
                 raise homomorphism_error
             # We then check that the new typing preserv consistency
             try:
-                with self._driver.session() as session:
-                    tx = session.begin_transaction()
+                with self._unit_of_work.transaction() as tx:
                     paths_commute = check_consistency(tx, source, target)
-                    tx.commit()
             except InvalidHomomorphism as consistency_error:
                 paths_commute = False
                 del_query = (
@@ -419,23 +456,26 @@ class Neo4jHierarchy(Hierarchy):
                 raise consistency_error
 
         if valid_typing and paths_commute:
+            parameters = {}
             skeleton_query = (
                 match_nodes(
                     var_id_dict={'g_src': source, 'g_tar': target},
-                    node_label=self._graph_label) +
+                    node_label=self._graph_label,
+                    parameters=parameters) +
                 add_edge(
                     edge_var='new_hierarchy_edge',
                     source_var='g_src',
                     target_var='g_tar',
                     edge_label=self._typing_label,
-                    attrs=attrs) +
+                    attrs=attrs,
+                    parameters=parameters) +
                 with_vars(["new_hierarchy_edge"]) +
                 "MATCH (:{})-[t:typing]-(:{})\n".format(
                     source, target) +
                 "REMOVE t.tmp\n"
 
             )
-            self.execute(skeleton_query)
+            self.execute(skeleton_query, parameters)
         # return result
 
     def add_relation(self, left, right, relation, attrs=None):
@@ -482,16 +522,18 @@ class Neo4jHierarchy(Hierarchy):
 
         for key, values in new_rel.items():
             for v in values:
+                parameters = {}
                 query = (
-                    "MATCH (u:{} {{id: '{}'}}), (v:{} {{id: '{}'}})\n".format(
-                        left, key, right, v) +
+                    "MATCH (u:{} {{id: {}}}), (v:{} {{id: {}}})\n".format(
+                        left, id_literal(key, parameters),
+                        right, id_literal(v, parameters)) +
                     add_edge(
                         edge_var="rel",
                         source_var="u",
                         target_var="v",
                         edge_label="relation")
                 )
-                self.execute(query)
+                self.execute(query, parameters)
 
         # query = ""
         # rel_creation_queries = []
@@ -522,18 +564,21 @@ class Neo4jHierarchy(Hierarchy):
         # print(query)
         # rel_addition_result = self.execute(query)
 
+        parameters = {}
         skeleton_query = (
             match_nodes(
                 var_id_dict={'g_left': left, 'g_right': right},
-                node_label=self._graph_label) +
+                node_label=self._graph_label,
+                parameters=parameters) +
             add_edge(
                 edge_var='new_hierarchy_edge',
                 source_var='g_left',
                 target_var='g_right',
                 edge_label=self._relation_label,
-                attrs=attrs)
+                attrs=attrs,
+                parameters=parameters)
         )
-        skeleton_addition_result = self.execute(skeleton_query)
+        skeleton_addition_result = self.execute(skeleton_query, parameters)
         return (None, skeleton_addition_result)
 
     def remove_graph(self, graph_id, reconnect=False):
@@ -582,11 +627,13 @@ class Neo4jHierarchy(Hierarchy):
 
         # Remove the graph (and reconnect if True)
         if reconnect:
+            parameters = {}
             query = (
                 match_node(
                     var_name="graph_to_rm",
                     node_id=graph_id,
-                    node_label=self._graph_label) +
+                    node_label=self._graph_label,
+                    parameters=parameters) +
                 "OPTIONAL MATCH (pred)-[:{}]->(n)-[:{}]->(suc)\n".format(
                     self._typing_label, self._typing_label) +
                 "WITH pred, suc WHERE pred IS NOT NULL\n" +
@@ -596,12 +643,14 @@ class Neo4jHierarchy(Hierarchy):
                     target_var='suc',
                     edge_label="typing")
             )
-            self.execute(query)
+            self.execute(query, parameters)
+        parameters = {}
         query = match_node(var_name="graph_to_rm",
                            node_id=graph_id,
-                           node_label=self._graph_label)
+                           node_label=self._graph_label,
+                           parameters=parameters)
         query += remove_nodes(["graph_to_rm"])
-        self.execute(query)
+        self.execute(query, parameters)
 
     def remove_typing(self, s, t):
         """Remove a typing from the hierarchy."""
@@ -613,12 +662,14 @@ class Neo4jHierarchy(Hierarchy):
         )
         self.execute(query)
         # Remove the corresponding edge from the skeleton
+        parameters = {}
         query = match_edge(
             "source", "target", s, t, "e",
             self._graph_label, self._graph_label,
-            edge_label=self._typing_label)
+            edge_label=self._typing_label,
+            parameters=parameters)
         query += remove_edge("e")
-        self.execute(query)
+        self.execute(query, parameters)
 
     def remove_relation(self, left, right):
         """Remove a relation from the hierarchy."""
@@ -629,12 +680,14 @@ class Neo4jHierarchy(Hierarchy):
         )
         self.execute(query)
         # Remove the corresponding edge from the skeleton
+        parameters = {}
         query = match_edge(
             "left", "right", left, right, "e",
             self._graph_label, self._graph_label,
-            edge_label=self._relation_label)
+            edge_label=self._relation_label,
+            parameters=parameters)
         query += remove_edge("e")
-        self.execute(query)
+        self.execute(query, parameters)
 
     def bfs_tree(self, graph, reverse=False):
         """BFS tree from the graph to all other reachable graphs."""
@@ -664,9 +717,11 @@ class Neo4jHierarchy(Hierarchy):
 
     def shortest_path(self, source, target):
         """Shortest path from 'source' to 'target'."""
+        parameters = {}
         query = shortest_path_query(
-            source, target, self._graph_label, self._typing_label)
-        result = self.execute(query)
+            source, target, self._graph_label, self._typing_label,
+            parameters=parameters)
+        result = self.execute(query, parameters)
         return result.single()["path"]
 
     def copy_graph(self, graph_id, new_graph_id, attach_graphs=[]):
@@ -783,26 +838,17 @@ class Neo4jHierarchy(Hierarchy):
             for k, v in old_mapping.items()
             if k in mapping and mapping[k] != v
         }
-        for k, v in typing_to_update.items():
-            query = (
-                "MATCH (s:{} {{id: '{}'}})-[r:{}]->(t:{} {{id: '{}'}}), ".format(
-                    source, k, self._graph_typing_label, target, old_mapping[k]) +
-                "(new_t:{} {{id: '{}'}})\n".format(target, v) +
-                "DELETE r\n" +
-                "MERGE (s)-[:{}]->(new_t)\n".format(self._graph_typing_label)
-            )
-            self.execute(query)
+        self._execute_batches(
+            retarget_intergraph_edges, source, target,
+            [(k, old_mapping[k], v) for k, v in typing_to_update.items()],
+            self._graph_typing_label)
 
         new_typing = {
             k: v for k, v in mapping.items() if k not in typing_to_update
         }
-        for k, v in new_typing.items():
-            query = (
-                "MATCH (s:{} {{id: '{}'}}), (new_t:{} {{id: '{}'}})\n".format(
-                    source, k, target, v) +
-                "MERGE (s)-[:{}]->(new_t)\n".format(self._graph_typing_label)
-            )
-            self.execute(query)
+        self._execute_batches(
+            set_intergraph_edges, source, target,
+            new_typing.items(), self._graph_typing_label)
 
     def _update_relation(self, left, right, relation):
         """Update the relation dictionaries (left and right)."""
@@ -819,24 +865,24 @@ class Neo4jHierarchy(Hierarchy):
             else (k, v)
             for k, v in old_relation.items()
         ])
-        for k, vs in relations_to_add.items():
-            for v in vs:
-                query = (
-                    "MATCH (s:{} {{id: '{}'}}), (t:{} {{id: '{}'}}) \n".format(
-                        left, k, right, v) +
-                    "MERGE (s)-[:{}]->(t)\n".format(
-                        self._graph_relation_label)
-                )
-                self.execute(query)
-
-        for k, vs in relation_to_remove.items():
-            for v in vs:
-                query = (
-                    "MATCH (s:{} {{id: '{}'}})-[r:{}]-(t:{} {{id: '{}'}})\n".format(
-                        left, k, self._graph_relation_label, right, v) +
-                    "DELETE r\n"
-                )
-                self.execute(query)
+        self._execute_batches(
+            set_intergraph_edges, left, right,
+            [(k, v) for k, vs in relations_to_add.items() for v in vs],
+            self._graph_relation_label)
+        self._execute_batches(
+            remove_intergraph_edges, left, right,
+            [(k, v) for k, vs in relation_to_remove.items() for v in vs],
+            self._graph_relation_label)
+
+    def _execute_batches(self, query_generator, domain, codomain,
+                         elements, label):
+        """Execute a batch query for chunks of node pairs (or triples)."""
+        for chunk in chunks(elements, BULK_CHUNK_SIZE):
+            parameters = {}
+            self.execute(
+                query_generator(
+                    domain, codomain, chunk, label, parameters=parameters),
+                parameters)
 
     def _get_rule_liftings(self, graph_id, rule, instance, p_typing):
         pass
@@ -897,6 +943,7 @@ class Neo4jHierarchy(Hierarchy):
                 uri, auth=(user, password))
         else:
             self._driver = driver
+        self._unit_of_work = _UnitOfWork(self._driver)
 
         self._graph_label = graph_label
         self._typing_label = typing_label
@@ -908,14 +955,15 @@ class Neo4jHierarchy(Hierarchy):
         try:
             query = "CREATE " + constraint_query(
                 'n', self._graph_label, 'id')
-            self.execute(query)
+            with self._driver.session() as session:
+                session.run(query)
         except:
             pass
 
     @classmethod
     def load(cls, uri=None, user=None, password=None,
              driver=None, filename=None, ignore=None,
-             clear=False):
+             clear=False, check=True):
         """Load the hierarchy."""
         if os.path.isfile(filename):
             with open(filename, "r+") as f:
@@ -923,7 +971,7 @@ class Neo4jHierarchy(Hierarchy):
                 hierarchy = cls.from_json(
                     uri=uri, user=user, password=password,
                     driver=driver, json_data=json_data, ignore=ignore,
-                    clear=clear)
+                    clear=clear, check=check)
             return hierarchy
         else:
             raise ReGraphError("File '{}' does not exist!".format(filename))
@@ -931,7 +979,7 @@ class Neo4jHierarchy(Hierarchy):
     @classmethod
     def from_json(cls, uri=None, user=None, password=None,
                   driver=None, json_data=None, ignore=None,
-                  clear=False):
+                  clear=False, check=True, chunk_size=BULK_CHUNK_SIZE):
         """Create hierarchy object from JSON representation.
 
         Parameters
@@ -964,6 +1012,11 @@ class Neo4jHierarchy(Hierarchy):
         directed : bool, optional
             True if graphs from JSON representation should be loaded as
             directed graphs, False otherwise, default value -- True
+        check : bool, optional
+            If False, the loaded typings are trusted and are not
+            checked to be valid and consistent
+        chunk_size : int, optional
+            Number of nodes/edges of the graphs sent per query
 
         Returns
         -------
@@ -987,7 +1040,8 @@ class Neo4jHierarchy(Hierarchy):
                 else:
                     attrs = attrs_from_json(graph_data["attrs"])
                 hierarchy.add_graph_from_json(
-                    graph_data["id"], graph_data["graph"], attrs)
+                    graph_data["id"], graph_data["graph"], attrs,
+                    chunk_size=chunk_size)
 
         # add typing
         for typing_data in json_data["typing"]:
@@ -1004,7 +1058,7 @@ class Neo4jHierarchy(Hierarchy):
                     typing_data["from"],
                     typing_data["to"],
                     typing_data["mapping"],
-                    attrs)
+                    attrs, check=check)
 
         # add relations
         for relation_data in json_data["relations"]:
@@ -1033,12 +1087,35 @@ class Neo4jHierarchy(Hierarchy):
         """Close connection to the database."""
         self._driver.close()
 
-    def execute(self, query):
-        """Execute a Cypher query."""
-        with self._driver.session() as session:
-            if len(query) > 0:
-                result = session.run(query)
-                return result
+    def execute(self, query, parameters=None):
+        """Execute a Cypher query.
+
+        Parameters
+        ----------
+        query : str
+            Cypher query (template)
+        parameters : dict, optional
+            Parameters of the query
+        """
+        if len(query) > 0:
+            return self._unit_of_work.run(query, parameters)
+
+    def batch(self):
+        """Execute a block of operations as a single unit of work.
+
+        All the queries issued inside of the block (including the
+        queries on the graphs of the hierarchy) share one session and
+        one explicit transaction, committed once when the block exits
+        (or rolled back if an exception is raised). Batches can be
+        nested, in which case the outermost one commits.
+
+        Examples
+        --------
+        >>> with hierarchy.batch():
+        ...     hierarchy.add_graph("g", graph)
+        ...     hierarchy.add_typing("g", "t", typing)
+        """
+        return self._unit_of_work.batch()
 
     def _clear(self):
         """Clear the hierarchy."""
@@ -1058,12 +1135,19 @@ class Neo4jHierarchy(Hierarchy):
                 session.run("DROP " + constraint[0])
 
     def _access_graph(self, graph_id, edge_label=None):
-        """Access a graph of the hierarchy."""
+        """Access a graph of the hierarchy.
+
+        The uniqueness constraint on the node ids is created when
+        the graph is added, the returned graph object shares the
+        unit of work of the hierarchy.
+        """
         if edge_label is None:
             edge_label = "edge"
         g = Neo4jGraph(
             self._driver,
-            node_label=graph_id, edge_label=edge_label)
+            node_label=graph_id, edge_label=edge_label,
+            unique_node_ids=False)
+        g._unit_of_work = self._unit_of_work
         return g
 
 
@@ -1137,6 +1221,7 @@ class TypedNeo4jGraph(Neo4jHierarchy):
         """
         self._driver = GraphDatabase.driver(
             uri, auth=(user, password))
+        self._unit_of_work = _UnitOfWork(self._driver)
 
         if clear is True:
             self._clear()
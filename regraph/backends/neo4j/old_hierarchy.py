@@ -17,7 +17,7 @@ from .cypher_utils.generic import (predecessors_query,
                                    get_nodes,
                                    get_edges,
                                    set_attributes,
-                                   load_graph_from_json_apoc,
+                                   stream_graph_from_json,
                                    match_nodes,
                                    match_node,
                                    with_vars,
@@ -251,7 +251,7 @@ class Neo4jHierarchy(object):
             if holistic:
                 with self._driver.session() as session:
                     tx = session.begin_transaction()
-                    load_graph_from_json_apoc(
+                    stream_graph_from_json(
                         tx, json_data, graph_id, self._graph_edge_label)
                     tx.commit()
             else:
@@ -4,7 +4,6 @@ This module implements data structures wrapping the `networkx.DiGraph` class.
 """
 import itertools
 import networkx as nx
-from networkx.algorithms import isomorphism
 
 import warnings
 
@@ -12,18 +11,189 @@ from regraph.exceptions import (ReGraphError,
                                 GraphError,
                                 GraphAttrsWarning,
                                 )
+from regraph.attribute_sets import FiniteSet
 from regraph.graphs import Graph
 from regraph.backends.networkx.plotting import plot_graph
 
 from regraph.utils import (normalize_attrs,
+                           normalized_attrs_copy,
                            safe_deepcopy_dict,
                            valid_attributes,
                            normalize_relation,
                            )
 
 
+def _intersect_candidates(pools):
+    """Intersect collections of candidate nodes.
+
+    Returns `None` if no collection is given, otherwise the
+    elements of the smallest collection that belong to all the
+    other collections (in the order of the smallest collection).
+    """
+    if len(pools) == 0:
+        return None
+    pools = sorted(pools, key=len)
+    others = [
+        p if isinstance(p, (set, dict)) else set(p)
+        for p in pools[1:]
+    ]
+    return [
+        n for n in pools[0]
+        if all(n in p for p in others)
+    ]
+
+
+def _matching_order(pattern, candidates):
+    """Order pattern nodes for the backtracking search.
+
+    Every connected component of the pattern starts with its most
+    constrained node (the one with the fewest candidates), then the
+    node with the largest number of already ordered neighbours is
+    picked, so that every next node can be looked up in the adjacency
+    of the nodes matched before it.
+    """
+    neighbours = {
+        n: set(pattern.successors(n)).union(pattern.predecessors(n))
+        for n in pattern.nodes()
+    }
+    order = []
+    ordered = set()
+    remaining = list(pattern.nodes())
+    while remaining:
+        frontier = [n for n in remaining if neighbours[n] & ordered]
+        if frontier:
+            next_node = max(
+                frontier,
+                key=lambda n: (
+                    len(neighbours[n] & ordered),
+                    -len(candidates[n])))
+        else:
+            next_node = min(
+                remaining,
+                key=lambda n: (len(candidates[n]), -len(neighbours[n])))
+        order.append(next_node)
+        ordered.add(next_node)
+        remaining.remove(next_node)
+    return order
+
+
+def _iter_monomorphisms(succ, pred, pattern, candidates):
+    """Generate injective edge-preserving maps from a pattern to a graph.
+
+    Parameters
+    ----------
+    succ : dict
+        Adjacency of the graph to search for matches (dictionary-like
+        object whose keys are nodes and whose values are dictionaries
+        from the successors of the respective nodes to the attributes
+        of the edges, e.g. `networkx.DiGraph.adj`)
+    pred : dict
+        Dictionary-like object whose keys are nodes and whose values
+        are collections of their predecessors
+    pattern : regraph.Graph
+        Pattern graph
+    candidates : dict
+        Dictionary whose keys are pattern nodes and whose values are
+        collections of graph nodes the respective pattern node can be
+        mapped to
+
+    Yields
+    ------
+    instance : dict
+        Dictionary whose keys are nodes of the pattern and whose values
+        are the corresponding nodes of the graph
+    """
+    order = _matching_order(pattern, candidates)
+    position = {n: i for i, n in enumerate(order)}
+    candidate_sets = {n: set(c) for n, c in candidates.items()}
+
+    # For every pattern node collect the edges connecting it to
+    # the nodes preceding it in the order (including self-loops)
+    out_constraints = {n: [] for n in order}
+    in_constraints = {n: [] for n in order}
+    for s, t in pattern.edges():
+        attrs = pattern.get_edge(s, t)
+        if position[s] <= position[t]:
+            in_constraints[t].append((s, attrs))
+        else:
+            out_constraints[s].append((t, attrs))
+
+    instance = dict()
+    used = set()
+
+    def _edges_hold(pattern_node, node):
+        for s, attrs in in_constraints[pattern_node]:
+            source = node if s == pattern_node else instance[s]
+            if node not in succ[source] or\
+               not valid_attributes(attrs, succ[source][node]):
+                return False
+        for t, attrs in out_constraints[pattern_node]:
+            target = instance[t]
+            if target not in succ[node] or\
+               not valid_attributes(attrs, succ[node][target]):
+                return False
+        return True
+
+    def _pool(pattern_node):
+        # Look the node up in the adjacency of an already matched
+        # neighbour rather than scanning all of its candidates
+        for s, _ in in_constraints[pattern_node]:
+            if s != pattern_node:
+                return [
+                    n for n in succ[instance[s]]
+                    if n in candidate_sets[pattern_node]]
+        for t, _ in out_constraints[pattern_node]:
+            return [
+                n for n in pred[instance[t]]
+                if n in candidate_sets[pattern_node]]
+        return candidates[pattern_node]
+
+    def _extend(depth):
+        if depth == len(order):
+            yield dict(instance)
+            return
+        pattern_node = order[depth]
+        for node in _pool(pattern_node):
+            if node in used or not _edges_hold(pattern_node, node):
+                continue
+            instance[pattern_node] = node
+            used.add(node)
+            yield from _extend(depth + 1)
+            used.remove(node)
+            del instance[pattern_node]
+
+    return _extend(0)
+
+
 class NXGraph(Graph):
-    """Wrapper for NetworkX directed graphs."""
+    """Wrapper for NetworkX directed graphs.
+
+    Attributes
+    ----------
+    _graph : networkx.DiGraph
+        Wrapped NetworkX graph
+    _attribute_index : dict
+        Inverted index of node attributes (`None` if the index is
+        not built), keys are pairs (attribute key, element of a
+        finite set of values) and values are ordered collections
+        (dicts with `None` values) of nodes having this element in the
+        value of the attribute
+    _non_finite_index : dict
+        Dictionary whose keys are attribute keys and whose values are
+        ordered collections of nodes with non-finite values of
+        the respective attribute (such nodes cannot be indexed by
+        the elements of their values)
+    _indexed_entries : dict
+        Dictionary whose keys are node ids and whose values are
+        the entries of the index referring to the respective nodes
+    _materialized : set
+        Nodes whose attribute and adjacency dictionaries were copied
+        by the graph since the last snapshot was taken (`None` if no
+        snapshot of the graph was taken, see `snapshot`)
+    _structure_version : int
+        Counter of the additions and removals of nodes and edges,
+        allows to detect modifications of the structure of the graph
+    """
 
     node_dict_factory = dict
     adj_dict_factory = dict
@@ -40,6 +210,146 @@ class NXGraph(Graph):
                 )
         else:
             self._graph = nx.DiGraph()
+        self._attribute_index = None
+        self._non_finite_index = None
+        self._indexed_entries = None
+        self._materialized = None
+        self._structure_version = 0
+
+    def snapshot(self):
+        """Take a copy-on-write snapshot of the graph.
+
+        The snapshot shares the attribute and adjacency dictionaries
+        of the nodes (as well as the attribute dictionaries of the
+        edges) with the graph. Both the graph and the snapshot copy
+        the dictionaries of a node only when the node or its incident
+        edges are modified for the first time after the snapshot was
+        taken, so that only the changed part of the graph is
+        materialized. Note that modifications of attribute
+        dictionaries performed in place (i.e. not through the methods
+        of the graph) are visible in both graphs.
+
+        Returns
+        -------
+        snapshot : NXGraph
+            Copy of the graph
+        """
+        g = nx.DiGraph()
+        g.graph.update(self._graph.graph)
+        g._node = self.node_dict_factory(self._graph._node)
+        g._succ = self.adj_dict_factory(self._graph._succ)
+        g._pred = self.adj_dict_factory(self._graph._pred)
+
+        new_graph = NXGraph(g)
+        new_graph._materialized = set()
+        self._materialized = set()
+        return new_graph
+
+    def _materialize(self, node_id):
+        """Copy the dictionaries of a node shared with snapshots."""
+        if self._materialized is None or node_id in self._materialized:
+            return
+        self._graph._node[node_id] = dict(self._graph._node[node_id])
+        self._graph._succ[node_id] = dict(self._graph._succ[node_id])
+        self._graph._pred[node_id] = dict(self._graph._pred[node_id])
+        self._materialized.add(node_id)
+
+    def _materialize_edge(self, s, t):
+        """Copy the attribute dictionary of an edge shared with snapshots."""
+        if self._materialized is None:
+            return
+        self._materialize(s)
+        self._materialize(t)
+        attrs = dict(self._graph._succ[s][t])
+        self._graph._succ[s][t] = attrs
+        self._graph._pred[t][s] = attrs
+
+    def build_attribute_index(self):
+        """Build an inverted index of node attributes.
+
+        Once built, the index is kept up to date by the methods of
+        the graph modifying nodes and their attributes and it is
+        used by `find_matching` to select candidate nodes for
+        the pattern nodes with finite sets of attribute values.
+        Note that modifications of attribute dictionaries performed
+        in place (i.e. not through the methods of the graph) are not
+        reflected in the index.
+        """
+        self._attribute_index = dict()
+        self._non_finite_index = dict()
+        self._indexed_entries = dict()
+        for node in self._graph.nodes():
+            self._index_node(node)
+
+    def drop_attribute_index(self):
+        """Drop the inverted index of node attributes."""
+        self._attribute_index = None
+        self._non_finite_index = None
+        self._indexed_entries = None
+
+    def has_attribute_index(self):
+        """Test if the inverted index of node attributes is built."""
+        return self._attribute_index is not None
+
+    def _index_node(self, node_id):
+        """Add the attributes of a node to the index."""
+        entries = []
+        for key, value in self._graph.nodes[node_id].items():
+            if isinstance(value, FiniteSet):
+                for element in value:
+                    if (key, element) not in self._attribute_index:
+                        self._attribute_index[(key, element)] = dict()
+                    self._attribute_index[(key, element)][node_id] = None
+                    entries.append((key, element))
+            elif value is not None:
+                if key not in self._non_finite_index:
+                    self._non_finite_index[key] = dict()
+                self._non_finite_index[key][node_id] = None
+                entries.append((key, ))
+        self._indexed_entries[node_id] = entries
+
+    def _unindex_node(self, node_id):
+        """Remove the attributes of a node from the index."""
+        for entry in self._indexed_entries.pop(node_id, []):
+            if len(entry) == 2:
+                postings = self._attribute_index[entry]
+            else:
+                postings = self._non_finite_index[entry[0]]
+            postings.pop(node_id, None)
+            if len(postings) == 0:
+                if len(entry) == 2:
+                    del self._attribute_index[entry]
+                else:
+                    del self._non_finite_index[entry[0]]
+
+    def _indexed_candidates(self, attrs):
+        """Find candidate nodes for the attributes using the index.
+
+        Returns `None` if the index cannot restrict the set of nodes,
+        otherwise, returns a list of nodes that contains all the nodes
+        whose attributes are valid for `attrs` (note that the validity
+        of attributes of the returned nodes still has to be tested).
+        """
+        if self._attribute_index is None:
+            return None
+
+        key_candidates = []
+        for key, value in attrs.items():
+            if not isinstance(value, FiniteSet) or len(value) == 0:
+                continue
+            postings = [
+                self._attribute_index.get((key, element), dict())
+                for element in value
+            ]
+            postings.sort(key=len)
+            nodes = [
+                n for n in postings[0]
+                if all(n in p for p in postings[1:])
+            ]
+            # nodes with non-finite values can contain any element
+            nodes += list(self._non_finite_index.get(key, dict()))
+            key_candidates.append(nodes)
+        return _intersect_candidates(key_candidates)
 
     def nodes(self, data=False):
         """Return the list of nodes."""
@@ -88,10 +398,14 @@ class NXGraph(Graph):
         if attrs is None:
             new_attrs = dict()
         else:
-            new_attrs = safe_deepcopy_dict(attrs)
-            normalize_attrs(new_attrs)
+            new_attrs = normalized_attrs_copy(attrs)
         if node_id not in self.nodes():
             self._graph.add_node(node_id, **new_attrs)
+            self._structure_version += 1
+            if self._materialized is not None:
+                self._materialized.add(node_id)
+            if self._attribute_index is not None:
+                self._index_node(node_id)
             return node_id
         else:
             raise GraphError("Node '{}' already exists!".format(node_id))
@@ -105,7 +419,16 @@ class NXGraph(Graph):
         node_id : hashable, node to remove.
         """
         if node_id in self.nodes():
+            if self._materialized is not None:
+                for n in itertools.chain(
+                        self._graph._succ[node_id],
+                        self._graph._pred[node_id]):
+                    self._materialize(n)
+                self._materialized.discard(node_id)
             self._graph.remove_node(node_id)
+            self._structure_version += 1
+            if self._attribute_index is not None:
+                self._unindex_node(node_id)
         else:
             raise GraphError("Node '{}' does not exist!".format(node_id))
         return
@@ -131,17 +454,19 @@ class NXGraph(Graph):
                     "The attr_dict argument must be a dictionary."
                 )
 
-        new_attrs = safe_deepcopy_dict(attrs)
         if s not in self.nodes():
             raise GraphError("Node '{}' does not exist!".format(s))
         if t not in self.nodes():
             raise GraphError("Node '{}' does not exist!".format(t))
-        normalize_attrs(new_attrs)
+        new_attrs = normalized_attrs_copy(attrs)
 
         if (s, t) in self.edges():
             raise GraphError(
                 "Edge '{}'->'{}' already exists!".format(s, t))
+        self._materialize(s)
+        self._materialize(t)
         self._graph.add_edge(s, t, **new_attrs)
+        self._structure_version += 1
 
     def remove_edge(self, s, t):
         """Remove edge from the graph.
@@ -155,7 +480,10 @@ class NXGraph(Graph):
         if (s, t) not in self.edges():
             raise GraphError(
                 "Edge '{}->{}' does not exist!".format(s, t))
+        self._materialize(s)
+        self._materialize(t)
         self._graph.remove_edge(s, t)
+        self._structure_version += 1
 
     def update_node_attrs(self, node_id, attrs, normalize=True):
         """Update attributes of a node.
@@ -180,6 +508,7 @@ class NXGraph(Graph):
         else:
             if normalize is True:
                 normalize_attrs(new_attrs)
+            self._materialize(node_id)
             attrs_to_remove = set()
             for k in self._graph.nodes[node_id].keys():
                 if k not in new_attrs.keys():
@@ -187,6 +516,9 @@ class NXGraph(Graph):
             self._graph.add_node(node_id, **new_attrs)
             for k in attrs_to_remove:
                 del self._graph.nodes[node_id][k]
+            if self._attribute_index is not None:
+                self._unindex_node(node_id)
+                self._index_node(node_id)
 
     def update_edge_attrs(self, s, t, attrs, normalize=True):
         """Update attributes of a node.
@@ -210,6 +542,7 @@ class NXGraph(Graph):
 
         if normalize is True:
             normalize_attrs(attrs)
+        self._materialize_edge(s, t)
         attrs_to_remove = set()
         for k in self._graph.adj[s][t].keys():
             if k not in attrs.keys():
@@ -367,8 +700,9 @@ class NXGraph(Graph):
         * the attribute dictionary of a pattern node is a subdictionary of
           its image in the graph;
 
-        Uses `networkx.isomorphism.(Di)GraphMatcher` class, which implements
-        subgraph matching algorithm.
+        Matches are enumerated by a VF2-style backtracking search that
+        extends partial instances one pattern node at a time along the
+        edges of the pattern (see `_iter_monomorphisms`).
 
         In addition, two parameters `graph_typing` and `pattern_typing`
         can be specified. They restrict the space of admisible solutions
@@ -395,6 +729,36 @@ class NXGraph(Graph):
             pattern, and values are corresponding nodes of the graph.
 
         """
+        return list(self.iter_matching(
+            pattern, nodes, graph_typing, pattern_typing))
+
+    def iter_matching(self, pattern, nodes=None, graph_typing=None,
+                      pattern_typing=None, limit=None,
+                      inverse_graph_typing=None):
+        """Iterate over the instances of a pattern in a graph.
+
+        Instances are produced lazily by the matcher, so that the
+        search can be interrupted as soon as enough instances have
+        been consumed. See `find_matching` for the description of
+        the parameters.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of instances to produce
+        inverse_graph_typing : dict of dict, optional
+            Dictionary whose keys are typing graphs and whose values
+            are the inverses of the respective graph typings (dictionaries
+            whose keys are type nodes and whose values are collections of
+            nodes of the graph typed by them). If provided, the candidate
+            nodes of typed pattern nodes are looked up in the inverse
+            typings instead of testing the types of all the nodes
+
+        Returns
+        -------
+        instances : iterator of dict's
+            Iterator over instances of matching found in the graph
+        """
         new_pattern_typing = dict()
         if pattern_typing:
             for graph, pattern_mapping in pattern_typing.items():
@@ -413,115 +777,78 @@ class NXGraph(Graph):
                     "pattern typing")
 
         if nodes is not None:
-            g = self._graph.subgraph(nodes)
+            nodes = set(nodes)
         else:
-            g = self._graph
-
-        labels_mapping = dict([(n, i + 1) for i, n in enumerate(g.nodes())])
-        g = self.get_relabeled_graph(labels_mapping, raw=True)
-        inverse_mapping = dict(
-            [(value, key) for key, value in labels_mapping.items()]
-        )
-
-        matching_nodes = set()
+            nodes = self._graph.nodes()
+
+        def _typing_holds(pattern_node, node):
+            for g, pattern_mapping in new_pattern_typing.items():
+                if node in graph_typing[g] and\
+                   pattern_node in pattern_mapping:
+                    if graph_typing[g][node] not in pattern_mapping[
+                            pattern_node]:
+                        return False
+            return True
+
+        if inverse_graph_typing is None:
+            inverse_graph_typing = {}
+
+        untyped_nodes = dict()
+
+        def _typed_candidates(g, types):
+            if g not in untyped_nodes:
+                # nodes not typed by 'g' match any type, there are
+                # none if the typing is total, otherwise only the
+                # nodes to search in are scanned
+                if len(graph_typing[g]) == len(self._graph):
+                    untyped_nodes[g] = []
+                else:
+                    untyped_nodes[g] = [
+                        n for n in nodes
+                        if n not in graph_typing[g]]
+            pool = dict.fromkeys(untyped_nodes[g])
+            for t in types:
+                pool.update(dict.fromkeys(
+                    inverse_graph_typing[g].get(t, [])))
+            return pool
 
         # find all the nodes matching the nodes in pattern
+        candidates = dict()
         for pattern_node in pattern.nodes():
-            for node in g.nodes():
-                if new_pattern_typing:
-                    # check types match
-                    match = False
-                    for graph, pattern_mapping in new_pattern_typing.items():
-                        if node in graph_typing[graph].keys() and\
-                           pattern_node in pattern_mapping.keys():
-                            if graph_typing[graph][node] in pattern_mapping[
-                                    pattern_node]:
-                                if valid_attributes(
-                                        pattern.get_node(pattern_node),
-                                        g.nodes[node]):
-                                    match = True
-                        else:
-                            if valid_attributes(
-                                    pattern.get_node(pattern_node),
-                                    g.nodes[node]):
-                                match = True
-                    if match:
-                        matching_nodes.add(node)
-                else:
-                    if valid_attributes(
-                            pattern.get_node(pattern_node),
-                            g.nodes[node]):
-                        matching_nodes.add(node)
-
-        # find all the isomorphic subgraphs
-        reduced_graph = g.subgraph(matching_nodes)
-        instances = []
-        isomorphic_subgraphs = []
-        for sub_nodes in itertools.combinations(reduced_graph.nodes(),
-                                                len(pattern.nodes())):
-            subg = reduced_graph.subgraph(sub_nodes)
-            for edgeset in itertools.combinations(subg.edges(),
-                                                  len(pattern.edges())):
-                edge_induced_graph = nx.DiGraph(list(edgeset))
-                edge_induced_graph.add_nodes_from(
-                    [n for n in subg.nodes()
-                     if n not in edge_induced_graph.nodes()])
-                if isinstance(pattern, Graph):
-                    matching_obj = isomorphism.DiGraphMatcher(
-                        pattern._graph, edge_induced_graph)
-                else:
-                    matching_obj = isomorphism.DiGraphMatcher(
-                        pattern, edge_induced_graph)
-                for isom in matching_obj.isomorphisms_iter():
-                    isomorphic_subgraphs.append((subg, isom))
-
-        for subgraph, mapping in isomorphic_subgraphs:
-            # print(subgraph.nodes(), mapping)
-            # check node matches
-            # exclude subgraphs which nodes information does not
-            # correspond to pattern
-            for (pattern_node, node) in mapping.items():
-                if new_pattern_typing:
-                    for g, pattern_mapping in new_pattern_typing.items():
-                        if inverse_mapping[node] in graph_typing[g].keys() and\
-                           pattern_node in pattern_mapping.keys():
-                            if graph_typing[g][
-                                inverse_mapping[node]] not in pattern_mapping[
-                                    pattern_node]:
-                                break
-                        if not valid_attributes(
-                                pattern.get_node(pattern_node),
-                                subgraph.nodes[node]):
-                            break
-                    else:
-                        continue
-                    break
-                else:
-                    if not valid_attributes(
-                            pattern.get_node(pattern_node),
-                            subgraph.nodes[node]):
-                        break
-            else:
-                # check edge attribute matched
-                for edge in pattern.edges():
-                    pattern_attrs = pattern.get_edge(edge[0], edge[1])
-                    target_attrs = subgraph.adj[
-                        mapping[edge[0]]][mapping[edge[1]]]
-                    if not valid_attributes(pattern_attrs, target_attrs):
-                        break
-                else:
-                    instances.append(mapping)
-
-        # bring back original labeling
-        for instance in instances:
-            for key, value in instance.items():
-                instance[key] = inverse_mapping[value]
-
-        return instances
+            pattern_attrs = pattern.get_node(pattern_node)
+            pools = [
+                _typed_candidates(g, pattern_mapping[pattern_node])
+                for g, pattern_mapping in new_pattern_typing.items()
+                if g in inverse_graph_typing and
+                pattern_node in pattern_mapping
+            ]
+            indexed_pool = self._indexed_candidates(pattern_attrs)
+            if indexed_pool is not None:
+                pools.append(indexed_pool)
+            pool = _intersect_candidates(pools)
+            if pool is None:
+                pool = self._graph.nodes()
+            candidates[pattern_node] = [
+                node for node in pool
+                if node in nodes and
+                _typing_holds(pattern_node, node) and
+                valid_attributes(pattern_attrs, self._graph.nodes[node])
+            ]
+
+        return itertools.islice(
+            _iter_monomorphisms(
+                self._graph.adj, self._graph.pred, pattern, candidates),
+            limit)
 
     @classmethod
     def copy(cls, graph):
-        """Copy the input graph object."""
+        """Copy the input graph object.
+
+        Copies of NetworkX graphs are copy-on-write snapshots
+        (see `snapshot`).
+        """
+        if cls is NXGraph and type(graph) is NXGraph:
+            return graph.snapshot()
         new_graph = cls()
         new_graph.add_nodes_from(graph.nodes(data=True))
         new_graph.add_edges_from(graph.edges(data=True))
@@ -24,7 +24,15 @@ from regraph.category_utils import (compose,
                                     pullback_complement)
 from regraph.utils import (normalize_attrs,
                            normalize_relation,
-                           keys_by_value,)
+                           keys_by_value,
+                           inverse_mapping)
+
+
+def _compose_typing(typing, mapping):
+    """Compose a (graph or rule) typing with a mapping."""
+    if isinstance(typing, tuple):
+        return tuple(compose(t, mapping) for t in typing)
+    return compose(typing, mapping)
 
 
 class NXHierarchy(Hierarchy, NXGraph):
@@ -32,7 +40,27 @@ class NXHierarchy(Hierarchy, NXGraph):
 
     Attributes
     ----------
-
+    attrs : dict
+        Attributes of the hierarchy
+    relation_edges : dict
+        Dictionary whose keys are pairs of graph ids and whose
+        values are the relations between the respective graphs
+    _inverse_typings : dict
+        Cache of inverse typings, keys are pairs of graph ids
+        (source, target) of typing edges and values are pairs whose
+        first element is the typing the inverse was computed from
+        and whose second element is the inverse typing (dictionary
+        whose keys are nodes of the target and whose values are lists
+        of nodes of the source typed by them)
+    _transitive_typings : dict
+        Cache of typings composed along the paths of the hierarchy,
+        keys are pairs of node ids (source, target) not connected by
+        a typing edge and values are pairs whose first element is the
+        set of typing edges of the path and whose second element is
+        the composed typing
+    _transitive_typing_keys : dict
+        Dictionary whose keys are typing edges and whose values are
+        sets of keys of `_transitive_typings` whose paths contain them
     """
 
     rel_dict_factory = dict
@@ -92,20 +120,156 @@ class NXHierarchy(Hierarchy, NXGraph):
 
     def get_typing(self, source, target):
         """Get a typing dict associated to the edge 'source->target'."""
+        typing = self._get_typing(source, target)
+        if (source, target) in self.edges():
+            return typing
+        # the cached typing is not exposed to in-place modifications
+        if isinstance(typing, tuple):
+            return tuple(dict(t) for t in typing)
+        return dict(typing)
+
+    def _get_typing(self, source, target):
+        """Get a typing, composed typings are taken from the cache.
+
+        Unlike `get_typing`, the cached composed typings are returned
+        without being copied and should not be modified.
+        """
         if (source, target) in self.edges():
             if self.is_graph(source):
                 return self.get_edge(source, target)["mapping"]
             else:
                 edge = self.get_edge(source, target)
                 return (edge["lhs_mapping"], edge["rhs_mapping"])
+        if (source, target) in self._transitive_typings:
+            self._typing_cache_hits += 1
+            _, typing = self._transitive_typings[(source, target)]
+            return typing
+
+        self._typing_cache_misses += 1
+        try:
+            path = nx.shortest_path(self._graph, source, target)
+        except:
+            raise HierarchyError(
+                "No path from '{}' to '{}' in the hierarchy".format(
+                    source, target))
+        # the rest of the path is a shortest path as well, its
+        # composed typing is reused (and cached)
+        typing = _compose_typing(
+            self._get_typing(source, path[1]),
+            self._get_typing(path[1], target))
+        path_edges = {(source, path[1])}
+        if (path[1], target) in self._transitive_typings:
+            path_edges.update(
+                self._transitive_typings[(path[1], target)][0])
         else:
-            try:
-                path = nx.shortest_path(self._graph, source, target)
-            except:
-                raise HierarchyError(
-                    "No path from '{}' to '{}' in the hierarchy".format(
-                        source, target))
-            return self.compose_path_typing(path)
+            path_edges.add((path[1], target))
+        self._cache_typing((source, target), path_edges, typing)
+        return typing
+
+    def _cache_typing(self, key, path_edges, typing):
+        """Add a typing composed along a path to the cache."""
+        self._transitive_typings[key] = (path_edges, typing)
+        for edge in path_edges:
+            self._transitive_typing_keys.setdefault(edge, set()).add(key)
+
+    def typing_cache_info(self):
+        """Get statistics of the cache of composed typings.
+
+        Typings between graphs not connected by a typing edge
+        (see `get_typing`) are composed along the shortest path
+        between them and cached until a typing on the path
+        is modified or removed, or a new typing creates
+        a new path between them.
+
+        Returns
+        -------
+        info : dict
+            Dictionary with the number of cache hits ("hits"),
+            misses ("misses") and of cached typings ("size")
+        """
+        return {
+            "hits": self._typing_cache_hits,
+            "misses": self._typing_cache_misses,
+            "size": len(self._transitive_typings)
+        }
+
+    def _drop_transitive_typing(self, key):
+        """Remove a composed typing from the cache."""
+        path_edges, _ = self._transitive_typings.pop(key)
+        for edge in path_edges:
+            keys = self._transitive_typing_keys[edge]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self._transitive_typing_keys[edge]
+
+    def _invalidate_typing(self, source, target):
+        """Drop the cached data depending on the typing edge."""
+        self._inverse_typings.pop((source, target), None)
+        for key in list(self._transitive_typing_keys.get(
+                (source, target), [])):
+            self._drop_transitive_typing(key)
+
+    def _invalidate_new_typing(self, source, target):
+        """Drop the composed typings a new typing edge may shorten."""
+        self._inverse_typings.pop((source, target), None)
+        if len(self._transitive_typings) == 0:
+            return
+        sources = nx.ancestors(self._graph, source)
+        sources.add(source)
+        targets = nx.descendants(self._graph, target)
+        targets.add(target)
+        for s, t in list(self._transitive_typings.keys()):
+            if s in sources and t in targets:
+                self._drop_transitive_typing((s, t))
+
+    def get_inverse_typing(self, source, target):
+        """Get the inverse of the typing 'source->target'.
+
+        Inverses of typing edges are cached, the cache entry of
+        an edge is invalidated when its typing is updated. Note that
+        modifications of typing dictionaries performed in place (and
+        not through the methods of the hierarchy) are not detected.
+
+        Returns
+        -------
+        inverse_typing : dict
+            Dictionary whose keys are nodes of the target graph and
+            whose values are lists of nodes of the source graph
+            typed by them
+        """
+        typing = self.get_typing(source, target)
+        if (source, target) in self._inverse_typings:
+            cached_typing, inverse_typing = self._inverse_typings[
+                (source, target)]
+            if cached_typing is typing:
+                return inverse_typing
+
+        inverse_typing = inverse_mapping(typing)
+        if (source, target) in self.edges():
+            self._inverse_typings[(source, target)] = (
+                typing, inverse_typing)
+        return inverse_typing
+
+    def iter_matching(self, graph_id, pattern,
+                      pattern_typing=None, nodes=None, limit=None):
+        """Iterate over the instances of a pattern in a specified graph.
+
+        Candidate nodes of the typed pattern nodes are looked up
+        in the (cached) inverse typings of the graph. See
+        `Hierarchy.iter_matching` for the description of the parameters.
+        """
+        if pattern_typing is None:
+            pattern_typing = dict()
+
+        graph_typing = self._get_graph_pattern_typing(
+            graph_id, pattern, pattern_typing)
+        inverse_graph_typing = {
+            typing_graph: self.get_inverse_typing(graph_id, typing_graph)
+            for typing_graph in graph_typing
+        }
+        return self.get_graph(graph_id).iter_matching(
+            pattern, nodes, graph_typing, pattern_typing, limit=limit,
+            inverse_graph_typing=inverse_graph_typing)
 
     def get_relation(self, left, right):
         """Get a relation dict associated to the rel 'left-right'."""
@@ -257,7 +421,8 @@ class NXHierarchy(Hierarchy, NXGraph):
         if edge_list is not None:
             g.add_edges_from(edge_list)
 
-    def add_typing(self, source, target, mapping=None, attrs=None):
+    def add_typing(self, source, target, mapping=None, attrs=None,
+                   check=True):
         """Add homomorphism to the hierarchy.
 
         Parameters
@@ -272,6 +437,11 @@ class NXHierarchy(Hierarchy, NXGraph):
         attrs : dict, optional
             Dictionary containing attributes of the new
             typing edge. Empty by default
+        check : bool, optional
+            If False, the typing is trusted: the absence of cycles,
+            the validity of the homomorphism and the commutativity
+            of the paths are not checked (see `check_consistency`).
+            True by default
 
         Raises
         ------
@@ -314,25 +484,27 @@ class NXHierarchy(Hierarchy, NXGraph):
                 "Target of a typing should be a graph"
             )
 
-        # check no cycles are produced
-        self.add_edge(source, target)
-        if not nx.is_directed_acyclic_graph(self._graph):
+        if check:
+            # check no cycles are produced
+            self.add_edge(source, target)
+            if not nx.is_directed_acyclic_graph(self._graph):
+                self.remove_edge(source, target)
+                raise HierarchyError(
+                    "Edge '{}->{}' creates a cycle in the hierarchy!".format(
+                        source, target)
+                )
             self.remove_edge(source, target)
-            raise HierarchyError(
-                "Edge '{}->{}' creates a cycle in the hierarchy!".format(
-                    source, target)
-            )
-        self.remove_edge(source, target)
 
-        # check if the homomorphism is valid
-        check_homomorphism(
-            self.get_graph(source),
-            self.get_graph(target),
-            mapping,
-        )
+            # check if the homomorphism is valid
+            check_homomorphism(
+                self.get_graph(source),
+                self.get_graph(target),
+                mapping,
+            )
 
-        # check if newly created path commutes with existing shortest paths
-        self._check_consistency(source, target, mapping)
+            # check if newly created path commutes with existing
+            # shortest paths
+            self._check_consistency(source, target, mapping)
 
         self.add_edge(source, target)
         if attrs is not None:
@@ -344,6 +516,7 @@ class NXHierarchy(Hierarchy, NXGraph):
                 "mapping": mapping,
                 "attrs": attrs
             }, normalize=False)
+        self._invalidate_new_typing(source, target)
         return
 
     def add_relation(self, left, right, relation, attrs=None):
@@ -479,6 +652,7 @@ class NXHierarchy(Hierarchy, NXGraph):
     def remove_typing(self, s, t):
         """Remove a typing from the hierarchy."""
         self.remove_edge(s, t)
+        self._invalidate_typing(s, t)
 
     def remove_relation(self, left, right):
         """Remove a relation from the hierarchy."""
@@ -603,89 +777,138 @@ class NXHierarchy(Hierarchy, NXGraph):
         return
 
     def _check_consistency(self, source, target, mapping=None):
-        all_paths = dict(nx.all_pairs_shortest_path(self._graph))
+        """Check that a new typing commutes with the existing paths.
+
+        Only the paths going through the new typing edge are examined:
+        the typings of the ancestors of `source` by `source` and the
+        typings of `target` by its descendants are obtained once, and
+        the typings they induce via the new edge are compared to the
+        typings along the existing paths between the same graphs.
+        Typings composed along the paths are taken from (and added to)
+        the cache of `get_typing`.
+        """
+        if mapping is None:
+            mapping = dict()
 
-        paths_to_source = {}
-        paths_from_target = {}
-        for s in self.nodes():
-            if source in all_paths[s].keys():
-                paths_to_source[s] = all_paths[s][source]
-            if s == target:
-                for key in all_paths[target].keys():
-                    paths_from_target[key] = all_paths[target][key]
-
-        for s in paths_to_source.keys():
-            if self.is_rule(paths_to_source[s][0]):
-                for t in paths_from_target.keys():
-                    # find homomorphism from s to t via new path
-                    if s == source:
+        # Typings of the ancestors of the source by the source
+        to_source = self._composed_typings(source, reverse=True)
+        # Typings of the target by its descendants
+        from_target = self._composed_typings(target)
+
+        # Graphs lying on the existing paths from the ancestors
+        # of the source (including the source) to the descendants
+        # of the target (including the target)
+        affected_targets = set(from_target.keys())
+        affected_targets.add(target)
+        region = set(affected_targets)
+        visit = list(affected_targets)
+        while len(visit) > 0:
+            n = visit.pop()
+            for pred in self.predecessors(n):
+                if pred not in region:
+                    region.add(pred)
+                    visit.append(pred)
+
+        for s in list(to_source.keys()) + [source]:
+            if s == source:
+                new_typing = mapping
+            else:
+                new_typing = _compose_typing(to_source[s], mapping)
+
+            # Typings of the existing paths from 's'
+            existing_typings = self._composed_typings(s, region)
+            for t in affected_targets:
+                if t not in existing_typings:
+                    continue
+                if t == target:
+                    path_typing = new_typing
+                else:
+                    path_typing = _compose_typing(new_typing, from_target[t])
+                existing_typing = existing_typings[t]
+                if self.is_rule(s):
+                    if existing_typing[0] != path_typing[0]:
                         raise HierarchyError(
-                            "Found a rule typing some node in the self!"
+                            "Invalid lhs typing: homomorphism does "
+                            "not commute with an existing " +
+                            "path from '{}' to '{}'!".format(s, t)
                         )
-                    new_lhs_h, new_rhs_h = self.compose_path_typing(
-                        paths_to_source[s])
-                    new_lhs_h = compose(new_lhs_h, mapping)
-                    new_rhs_h = compose(new_rhs_h, mapping)
-
-                    if t != target:
-                        new_lhs_h = compose(
-                            new_lhs_h,
-                            self.compose_path_typing(paths_from_target[t])
-                        )
-                        new_rhs_h = compose(
-                            new_rhs_h,
-                            self.compose_path_typing(paths_from_target[t]),
-                        )
-                    try:
-                        # find homomorphisms from s to t via other paths
-                        s_t_paths = nx.all_shortest_paths(self._graph, s, t)
-                        for path in s_t_paths:
-                            lhs_h, rhs_h = self.compose_path_typing(path)
-                            if lhs_h != new_lhs_h:
-                                raise HierarchyError(
-                                    "Invalid lhs typing: homomorphism does "
-                                    "not commute with an existing " +
-                                    "path from '{}' to '{}'!".format(s, t)
-                                )
-                            if rhs_h != new_rhs_h:
-                                raise HierarchyError(
-                                    "Invalid rhs typing: homomorphism does "
-                                    "not commute with an existing " +
-                                    "path from '{}' to '{}'!".format(s, t)
-                                )
-                    except(nx.NetworkXNoPath):
-                        pass
-            else:
-                for t in paths_from_target.keys():
-                    # find homomorphism from s to t via new path
-                    if s != source:
-                        new_homomorphism = self.compose_path_typing(
-                            paths_to_source[s])
-                    else:
-                        new_homomorphism = dict([(key, key)
-                                                 for key, _ in mapping.items()])
-                    new_homomorphism = compose(
-                        new_homomorphism, mapping)
-                    if t != target:
-                        new_homomorphism = compose(
-                            new_homomorphism,
-                            self.compose_path_typing(paths_from_target[t])
+                    if existing_typing[1] != path_typing[1]:
+                        raise HierarchyError(
+                            "Invalid rhs typing: homomorphism does "
+                            "not commute with an existing " +
+                            "path from '{}' to '{}'!".format(s, t)
                         )
+                elif existing_typing != path_typing:
+                    raise HierarchyError(
+                        "Homomorphism does not commute with an " +
+                        "existing path from '{}' to '{}'!".format(
+                            s, t)
+                    )
 
-                    # find homomorphisms from s to t via other paths
-                    s_t_paths = nx.all_shortest_paths(self._graph, s, t)
-                    try:
-                        # check only the first path
-                        for path in s_t_paths:
-                            path_homomorphism = self.compose_path_typing(path)
-                            if path_homomorphism != new_homomorphism:
-                                raise HierarchyError(
-                                    "Homomorphism does not commute with an " +
-                                    "existing path from '{}' to '{}'!".format(
-                                        s, t)
-                                )
-                    except(nx.NetworkXNoPath):
-                            pass
+    def _composed_typings(self, node_id, region=None, reverse=False):
+        """Compose typings along the shortest paths from/to a node.
+
+        The paths are explored breadth-first, the typings composed along
+        them are taken from the cache of `get_typing` or added to it.
+
+        Parameters
+        ----------
+        node_id : hashable
+            Id of the node of the hierarchy
+        region : set, optional
+            Set of nodes of the hierarchy the paths are restricted to
+        reverse : bool, optional
+            If True, the typings of the ancestors of the node
+            by the node are computed, otherwise the typings of the node
+            by its descendants are computed
+
+        Returns
+        -------
+        typings : dict
+            Dictionary whose keys are the reached nodes of the hierarchy
+            and whose values are the composed typings (pairs of typings
+            of the lhs and the rhs, if the source of the path is a rule).
+            The typings may be shared with the cache and should not be
+            modified.
+        """
+        typings = dict()
+        path_edges = {node_id: set()}
+        current_level = [node_id]
+        while len(current_level) > 0:
+            next_level = []
+            for n in current_level:
+                if reverse:
+                    neighbours = self.predecessors(n)
+                else:
+                    neighbours = self.successors(n)
+                for m in neighbours:
+                    if m == node_id or m in typings:
+                        continue
+                    if region is not None and m not in region:
+                        continue
+                    edge = (m, n) if reverse else (n, m)
+                    key = (m, node_id) if reverse else (node_id, m)
+                    if n == node_id:
+                        typings[m] = self._get_typing(*edge)
+                        path_edges[m] = {edge}
+                    elif key in self._transitive_typings:
+                        self._typing_cache_hits += 1
+                        path_edges[m], typings[m] =\
+                            self._transitive_typings[key]
+                    else:
+                        self._typing_cache_misses += 1
+                        if reverse:
+                            typing = _compose_typing(
+                                self._get_typing(*edge), typings[n])
+                        else:
+                            typing = _compose_typing(
+                                typings[n], self._get_typing(*edge))
+                        typings[m] = typing
+                        path_edges[m] = path_edges[n] | {edge}
+                        self._cache_typing(key, path_edges[m], typing)
+                    next_level.append(m)
+            current_level = next_level
+        return typings
 
     def _propagate_clone(self, origin_id, node_id, p_origin_m,
                          origin_m_origin, p_typing,
@@ -778,6 +1001,7 @@ class NXHierarchy(Hierarchy, NXGraph):
                     if rhs_m_rhs[rhs_clone] == original_rhs_node:
                         rule.p_rhs[n] = rhs_clone
                         break
+            rule._invalidate_delta()
 
         self._restrictive_update_incident_homs(node_id, g_m_g)
         self._restrictive_update_incident_rels(node_id, g_m_g)
@@ -978,6 +1202,11 @@ class NXHierarchy(Hierarchy, NXGraph):
 
         self.rel_dict_factory = reldf = self.rel_dict_factory
         self.relation_edges = reldf()
+        self._inverse_typings = dict()
+        self._transitive_typings = dict()
+        self._transitive_typing_keys = dict()
+        self._typing_cache_hits = 0
+        self._typing_cache_misses = 0
 
     def rules(self, data=True):
         """Return a list of rules in the hierarchy."""
@@ -1178,6 +1407,7 @@ class NXHierarchy(Hierarchy, NXGraph):
                 "attrs": attrs
             },
             normalize=False)
+        self._invalidate_new_typing(rule_id, graph_id)
         return
 
     def get_rule_typing(self, rule_id, graph_id):
@@ -1278,6 +1508,13 @@ class NXHierarchy(Hierarchy, NXGraph):
 
         nx.DiGraph.remove_node(self._graph, node_id)
 
+        for s, t in list(self._inverse_typings.keys()):
+            if s == node_id or t == node_id:
+                del self._inverse_typings[s, t]
+        for s, t in list(self._transitive_typing_keys.keys()):
+            if s == node_id or t == node_id:
+                self._invalidate_typing(s, t)
+
         # Update dicts representing relations
         for u, v in self.relation_edges.keys():
             if u == node_id or v == node_id:
@@ -1421,6 +1658,7 @@ class NXHierarchy(Hierarchy, NXGraph):
 
     def _update_mapping(self, source, target, mapping):
         """Update the mapping dictionary from source to target."""
+        self._invalidate_typing(source, target)
         if self.is_graph(source):
             self.update_edge_attrs(
                 source, target,
@@ -1453,6 +1691,7 @@ class NXHierarchy(Hierarchy, NXGraph):
         )
 
     def _update_rule_homomorphism(self, source, target, lhs_h, rhs_h):
+        self._invalidate_typing(source, target)
         self.update_edge_attrs(
             source, target,
             {
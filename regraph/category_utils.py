@@ -1,9 +1,7 @@
 """Category operations used by graph rewriting tool."""
-import copy
-
 from regraph.backends.networkx.graphs import NXGraph
 
-from regraph.utils import (keys_by_value,
+from regraph.utils import (inverse_mapping,
                            merge_attributes,
                            restrict_mapping,
                            dict_sub,
@@ -164,40 +162,45 @@ def pullback(b, c, d, b_d, c_d):
     a_b = {}
     a_c = {}
 
-    f = b_d
-    g = c_d
+    # Group the nodes of c by their images in d, so that
+    # every node of b is paired only with the nodes of its fiber
+    c_fibers = dict()
+    for n2 in c.nodes():
+        if c_d[n2] in c_fibers:
+            c_fibers[c_d[n2]].append(n2)
+        else:
+            c_fibers[c_d[n2]] = [n2]
 
+    b_fibers = dict()
     for n1 in b.nodes():
-        for n2 in c.nodes():
-            if f[n1] == g[n2]:
-                new_attrs = merge_attributes(b.get_node(n1),
-                                             c.get_node(n2),
-                                             'intersection')
-                if n1 not in a.nodes():
-                    a.add_node(n1, new_attrs)
-                    a_b[n1] = n1
-                    a_c[n1] = n2
-                else:
-                    i = 1
+        b_fibers[n1] = []
+        for n2 in c_fibers.get(b_d[n1], []):
+            new_attrs = merge_attributes(b.get_node(n1),
+                                         c.get_node(n2),
+                                         'intersection')
+            if n1 not in a.nodes():
+                new_name = n1
+            else:
+                i = 1
+                new_name = str(n1) + str(i)
+                while new_name in a.nodes():
+                    i += 1
                     new_name = str(n1) + str(i)
-                    while new_name in a.nodes():
-                        i += 1
-                        new_name = str(n1) + str(i)
-                    # if n2 not in a.nodes():
-                    a.add_node(new_name, new_attrs)
-                    a_b[new_name] = n1
-                    a_c[new_name] = n2
+            a.add_node(new_name, new_attrs)
+            a_b[new_name] = n1
+            a_c[new_name] = n2
+            b_fibers[n1].append(new_name)
 
+    # Generate edges from the edges of b, keeping
+    # those whose projections are edges in c
     for n1 in a.nodes():
-        for n2 in a.nodes():
-            if (a_b[n1], a_b[n2]) in b.edges():
-                if (a_c[n1], a_c[n2]) in c.edges():
-                    a.add_edge(n1, n2)
-                    a.set_edge(
-                        n1,
-                        n2,
+        for b_n2 in b.successors(a_b[n1]):
+            for n2 in b_fibers[b_n2]:
+                if c.exists_edge(a_c[n1], a_c[n2]):
+                    a.add_edge(
+                        n1, n2,
                         merge_attributes(
-                            b.get_edge(a_b[n1], a_b[n2]),
+                            b.get_edge(a_b[n1], b_n2),
                             c.get_edge(a_c[n1], a_c[n2]),
                             'intersection'))
     check_homomorphism(a, b, a_b)
@@ -216,17 +219,20 @@ def pushout(a, b, c, a_b, a_c, inplace=False):
     if inplace is True:
         d = b
     else:
-        d = NXGraph()
-        d.add_nodes_from(b.nodes(data=True))
-        d.add_edges_from(b.edges(data=True))
+        d = NXGraph.copy(b)
 
     b_d = id_of(b.nodes())
     c_d = dict()
 
+    a_b_inverse = inverse_mapping(a_b)
+    a_c_inverse = inverse_mapping(a_c)
+    # inverse of 'b_d' (updated together with 'b_d')
+    d_b = {n: {n} for n in b.nodes()}
+
     # Add/merge nodes
     merged_nodes = dict()
     for c_n in c.nodes():
-        a_keys = keys_by_value(a_c, c_n)
+        a_keys = a_c_inverse.get(c_n, [])
         # Add nodes
         if len(a_keys) == 0:
             if c_n not in d.nodes():
@@ -285,12 +291,19 @@ def pushout(a, b, c, a_b, a_c, inplace=False):
             c_d[c_n] = new_name
 
             for node in nodes_to_merge:
+                d_b[b_d[node]].discard(node)
                 b_d[node] = new_name
+                if new_name in d_b:
+                    d_b[new_name].add(node)
+                else:
+                    d_b[new_name] = {node}
 
-            for k in c_d.keys():
-                for vv in keys_by_value(a_c, k):
-                    if b_d[a_b[vv]] == new_name:
-                        c_d[k] = new_name
+            # redirect the nodes of c whose preimages are sent to
+            # the merged node
+            for b_node in d_b[new_name]:
+                for vv in a_b_inverse.get(b_node, []):
+                    if a_c[vv] in c_d:
+                        c_d[a_c[vv]] = new_name
 
     # Add edges
     for (n1, n2) in c.edges():
@@ -301,7 +314,7 @@ def pushout(a, b, c, a_b, a_c, inplace=False):
 
     # Add node attrs
     for c_n in c.nodes():
-        a_keys = keys_by_value(a_c, c_n)
+        a_keys = a_c_inverse.get(c_n, [])
         # Add attributes to the nodes which stayed invariant
         if len(a_keys) == 1:
             attrs_to_add = dict_sub(
@@ -352,16 +365,16 @@ def pullback_complement(a, b, d, a_b, b_d, inplace=False):
     if inplace is True:
         c = d
     else:
-        c = NXGraph()
-        c.add_nodes_from(d.nodes(data=True))
-        c.add_edges_from(d.edges(data=True))
+        c = NXGraph.copy(d)
 
     a_c = dict()
     c_d = id_of(c.nodes())
 
+    a_b_inverse = inverse_mapping(a_b)
+
     # Remove/clone nodes
     for b_node in b.nodes():
-        a_keys = keys_by_value(a_b, b_node)
+        a_keys = a_b_inverse.get(b_node, [])
         # Remove nodes
         if len(a_keys) == 0:
             c.remove_node(b_d[b_node])
@@ -384,8 +397,8 @@ def pullback_complement(a, b, d, a_b, b_d, inplace=False):
 
     # Remove edges
     for (b_n1, b_n2) in b.edges():
-        a_keys_1 = keys_by_value(a_b, b_n1)
-        a_keys_2 = keys_by_value(a_b, b_n2)
+        a_keys_1 = a_b_inverse.get(b_n1, [])
+        a_keys_2 = a_b_inverse.get(b_n2, [])
         if len(a_keys_1) > 0 and len(a_keys_2) > 0:
             for k1 in a_keys_1:
                 for k2 in a_keys_2:
@@ -416,16 +429,15 @@ def pullback_complement(a, b, d, a_b, b_d, inplace=False):
 
 def image_factorization(a, b, a_b):
     """Compute the image factorization given A, B and A->B."""
-    c = NXGraph()
-    c.add_nodes_from(a.nodes(data=True))
-    c.add_edges_from(a.edges(data=True))
+    c = NXGraph.copy(a)
 
     a_c = {}
     c_b = {}
 
+    a_b_inverse = inverse_mapping(a_b)
     for n in b.nodes():
-        if n in a_b.values():
-            a_nodes = keys_by_value(a_b, n)
+        if n in a_b_inverse:
+            a_nodes = a_b_inverse[n]
             if len(a_nodes) > 1:
                 new_id = c.merge_nodes(a_nodes)
             else:
@@ -440,16 +452,18 @@ def image_factorization(a, b, a_b):
 def get_unique_map_to_pullback(p, p_a, p_b, z_a, z_b):
     """Find a unique map to pullback."""
     z_p = dict()
+    z_a_inverse = inverse_mapping(z_a)
+    z_b_inverse = inverse_mapping(z_b)
     for value in p:
         z_keys_from_a = set()
         if value in p_a.keys():
             a_value = p_a[value]
-            z_keys_from_a = set(keys_by_value(z_a, a_value))
+            z_keys_from_a = set(z_a_inverse.get(a_value, []))
 
         z_keys_from_b = set()
         if value in p_b.keys():
             b_value = p_b[value]
-            z_keys_from_b.update(keys_by_value(z_b, b_value))
+            z_keys_from_b.update(z_b_inverse.get(b_value, []))
 
         z_keys = z_keys_from_a.intersection(z_keys_from_b)
         for z_key in z_keys:
@@ -461,15 +475,17 @@ def get_unique_map_to_pullback(p, p_a, p_b, z_a, z_b):
 def get_unique_map_from_pushout(p, a_p, b_p, a_z, b_z):
     """Find a unique map to pushout."""
     p_z = dict()
+    a_p_inverse = inverse_mapping(a_p)
+    b_p_inverse = inverse_mapping(b_p)
     for value in p:
         z_values = set()
 
-        a_values = set(keys_by_value(a_p, value))
+        a_values = set(a_p_inverse.get(value, []))
         for a_value in a_values:
             if a_value in a_z.keys():
                 z_values.add(a_z[a_value])
 
-        b_values = set(keys_by_value(b_p, value))
+        b_values = set(b_p_inverse.get(value, []))
         for b_value in b_values:
             if b_value in b_z.keys():
                 z_values.add(b_z[b_value])
@@ -491,13 +507,15 @@ def get_unique_map_to_pullback_complement(a_p, p_c,
             "Morphism 'a_p' is required to be a mono "
             "to use the UP of the pullback complement")
     z_p = {}
+    a_prime_z_inverse = inverse_mapping(a_prime_z)
+    p_c_inverse = inverse_mapping(p_c)
     for z_element, c_element in z_c.items():
-        a_prime_elements = keys_by_value(a_prime_z, z_element)
+        a_prime_elements = a_prime_z_inverse.get(z_element, [])
         p_elements1 = set()  # candidate p elements
         for a_prime_element in a_prime_elements:
             p_elements1.add(a_p[a_prime_a[a_prime_element]])
         # resolve ambiguity going the other way
-        p_elements2 = keys_by_value(p_c, c_element)
+        p_elements2 = p_c_inverse.get(c_element, [])
         if len(p_elements1) == 0:
             if len(p_elements2) == 1:
                 z_p[z_element] = list(p_elements2)[0]
@@ -580,10 +598,12 @@ def relation_to_span(g1, g2, relation, edges=False, attrs=False):
             left_h[new_node] = a
             right_h[new_node] = b
 
+    left_inverse = inverse_mapping(left_h)
     for n1 in new_graph.nodes():
-        for n2 in new_graph.nodes():
-            if (left_h[n1], left_h[n2]) in g1.edges() and\
-               (right_h[n1], right_h[n2]) in g2.edges():
+        for left_n2 in g1.successors(left_h[n1]):
+            for n2 in left_inverse.get(left_n2, []):
+                if (right_h[n1], right_h[n2]) not in g2.edges():
+                    continue
                 new_graph.add_edge(n1, n2)
                 common_attrs = attrs_intersection(
                     g1.get_edge(left_h[n1], left_h[n2]),
@@ -626,7 +646,7 @@ def pushout_from_relation(g1, g2, relation, inplace=False):
     if inplace is True:
         g12 = g1
     else:
-        g12 = copy.deepcopy(g1)
+        g12 = NXGraph.copy(g1)
 
     g1_g12 = id_of(g12.nodes())
     g2_g12 = dict()
@@ -4,6 +4,7 @@ This module contains abstract classes for graph objects in ReGraph. Such
 graph objects represent simple graphs with dictionary-like attributes
 on nodes and edges.
 """
+import itertools
 import json
 import os
 
@@ -163,6 +164,29 @@ class Graph(ABC):
         """Find matching of a pattern in a graph."""
         pass
 
+    def iter_matching(self, pattern, nodes=None, limit=None):
+        """Iterate over the instances of a pattern in a graph.
+
+        Backends able to produce instances lazily override this
+        method, by default the instances found by `find_matching`
+        are iterated over.
+
+        Parameters
+        ----------
+        pattern : Graph object
+            Pattern graph to search for
+        nodes : iterable, optional
+            Subset of nodes to search for matching
+        limit : int, optional
+            Maximum number of instances to produce
+
+        Returns
+        -------
+        instances : iterator of dict's
+            Iterator over instances of matching found in the graph
+        """
+        return itertools.islice(self.find_matching(pattern, nodes), limit)
+
     def print_graph(self):
         """Pretty-print the graph."""
         print("\nNodes:\n")
@@ -1018,6 +1042,42 @@ class Graph(ABC):
                 rhs_g[u], rhs_g[v], attrs)
         return rhs_g
 
+    def rewrite_many(self, rule, instances):
+        """Perform SqPO rewriting of the graph at several instances.
+
+        The rule is applied at all the instances in a single
+        rewriting step: all the restrictive changes are performed
+        first, followed by all the expansive ones.
+
+        Parameters
+        ----------
+        rule : regraph.Rule
+            SqPO rewriting rule
+        instances : iterable of dict
+            Non-overlapping instances of the input rule
+
+        Returns
+        -------
+        rhs_instances : list of dict
+            Instances of the rule's right-hand side in the
+            result of rewriting (one per input instance)
+
+        Raises
+        ------
+        RewritingError
+            If some instances overlap.
+        """
+        instances = list(instances)
+        if len(instances) == 0:
+            return []
+        union_rule, union_instance, _, rhs_copies = rule._replicate(
+            instances)
+        rhs_g = self.rewrite(union_rule, union_instance)
+        return [
+            {n: rhs_g[rhs_copy[n]] for n in rule.rhs.nodes()}
+            for rhs_copy in rhs_copies
+        ]
+
     def number_of_edges(self, u, v):
         """Return number of directed edges from u to v."""
         return 1
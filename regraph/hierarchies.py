@@ -215,7 +215,7 @@ class Hierarchy(ABC):
         pass
 
     @abstractmethod
-    def add_typing(self, source, target, mapping, attrs=None):
+    def add_typing(self, source, target, mapping, attrs=None, check=True):
         """Add homomorphism to the hierarchy.
 
         Parameters
@@ -230,6 +230,9 @@ class Hierarchy(ABC):
         attrs : dict
             Dictionary containing attributes of the new
             typing edge
+        check : bool, optional
+            If False, the validity of the homomorphism and
+            the consistency of the hierarchy are not checked
 
         Raises
         ------
@@ -520,7 +523,7 @@ class Hierarchy(ABC):
         return json_data
 
     @classmethod
-    def from_json(cls, json_data, ignore=None):
+    def from_json(cls, json_data, ignore=None, check=True):
         """Create a hierarchy object from JSON-representation.
 
         Parameters
@@ -541,6 +544,11 @@ class Hierarchy(ABC):
                 "relations": <collection of tuples containing
                     relations to ignore>,
             }
+        check : bool, optional
+            If True, the consistency of the loaded hierarchy is
+            checked once all the typings are added (see
+            `Hierarchy.check_consistency`), otherwise the input
+            is trusted and no checks are performed
 
         Returns
         -------
@@ -577,7 +585,10 @@ class Hierarchy(ABC):
                     typing_data["from"],
                     typing_data["to"],
                     typing_data["mapping"],
-                    attrs)
+                    attrs, check=False)
+
+        if check:
+            hierarchy.check_consistency()
 
         # add relations
         for relation_data in json_data["relations"]:
@@ -603,7 +614,7 @@ class Hierarchy(ABC):
         return hierarchy
 
     @classmethod
-    def load(cls, filename, ignore=None):
+    def load(cls, filename, ignore=None, check=True):
         """Load the hierarchy from a file.
 
         Parameters
@@ -612,6 +623,8 @@ class Hierarchy(ABC):
             Path to the file containing JSON-representation of the hierarchy
         ignore : dict
             Dictionary with graph elemenets to ignore when loading
+        check : bool, optional
+            If True, the consistency of the loaded hierarchy is checked
         Returns
         -------
         hierarchy : regraph.hierarchies.Hierarchy
@@ -619,7 +632,7 @@ class Hierarchy(ABC):
         if os.path.isfile(filename):
             with open(filename, "r+") as f:
                 json_data = json.loads(f.read())
-                hierarchy = cls.from_json(json_data, ignore)
+                hierarchy = cls.from_json(json_data, ignore, check)
             return hierarchy
         else:
             raise ReGraphError("File '{}' does not exist!".format(filename))
@@ -663,6 +676,65 @@ class Hierarchy(ABC):
                 types[successor] = mapping[node_id]
         return types
 
+    def check_consistency(self):
+        """Check the typings of the graphs in the hierarchy.
+
+        The graphs are visited once in the reverse topological order
+        (typing graphs before the graphs they type): every typing is
+        checked to be a valid homomorphism and all the paths between
+        every pair of graphs are checked to commute.
+
+        Raises
+        ------
+        HierarchyError
+            If the typings contain a cycle or if some paths do not commute
+        InvalidHomomorphism
+            If some typing is not a valid homomorphism
+        """
+        graphs = set(self.graphs())
+
+        # Topological sort (from the graphs typed by nothing)
+        out_degree = {
+            g: len([s for s in self.successors(g) if s in graphs])
+            for g in graphs
+        }
+        order = [g for g in self.graphs() if out_degree[g] == 0]
+        i = 0
+        while i < len(order):
+            for pred in self.predecessors(order[i]):
+                if pred in out_degree:
+                    out_degree[pred] -= 1
+                    if out_degree[pred] == 0:
+                        order.append(pred)
+            i += 1
+        if len(order) != len(graphs):
+            raise HierarchyError(
+                "Typings of the hierarchy contain a cycle!")
+
+        # Typings of every graph by all of its descendants
+        descendant_typings = dict()
+        for graph_id in order:
+            typings = dict()
+            for suc in self.successors(graph_id):
+                typing = self.get_typing(graph_id, suc)
+                check_homomorphism(
+                    self.get_graph(graph_id), self.get_graph(suc), typing)
+                paths = [(suc, typing)] + [
+                    (descendant, compose(typing, descendant_typing))
+                    for descendant, descendant_typing in descendant_typings[
+                        suc].items()
+                ]
+                for descendant, path_typing in paths:
+                    if descendant in typings and\
+                       typings[descendant] != path_typing:
+                        raise HierarchyError(
+                            "Homomorphism from '{}' to '{}' does not "
+                            "commute with an existing path from "
+                            "'{}' to '{}'!".format(
+                                graph_id, suc, graph_id, descendant))
+                    typings[descendant] = path_typing
+            descendant_typings[graph_id] = typings
+
     def get_ancestors(self, graph_id):
         """Return ancestors of a graph with the typing morphisms."""
         ancestors = dict()
@@ -1526,14 +1598,40 @@ class Hierarchy(ABC):
         instances : list of dict
             List of matched instances
         """
+        return list(self.iter_matching(
+            graph_id, pattern, pattern_typing, nodes))
+
+    def iter_matching(self, graph_id, pattern,
+                      pattern_typing=None, nodes=None, limit=None):
+        """Iterate over the instances of a pattern in a specified graph.
+
+        Parameters
+        ----------
+        graph_id : hashable
+            Id of a graph in the hierarchy to search for matches
+        pattern : Graph object
+            A pattern to match
+        pattern_typing : dict
+            A dictionary that specifies a typing of a pattern (see
+            `find_matching`)
+        nodes : iterable
+            Subset of nodes where matching should be performed
+        limit : int, optional
+            Maximum number of instances to produce
+
+        Returns
+        -------
+        instances : iterator of dict
+            Iterator over matched instances, instances are produced
+            lazily by the backend of the graph
+        """
         if pattern_typing is None:
             pattern_typing = dict()
 
         graph_typing = self._get_graph_pattern_typing(
             graph_id, pattern, pattern_typing)
-        instances = self.get_graph(graph_id).find_matching(
-            pattern, nodes, graph_typing, pattern_typing)
-        return instances
+        return self.get_graph(graph_id).iter_matching(
+            pattern, nodes, graph_typing, pattern_typing, limit=limit)
 
     def advanced_find_matching(self, graph_id, pattern_dict,
                                pattern_typing=None, nodes=None):
@@ -1616,6 +1714,84 @@ class Hierarchy(ABC):
 
         return rhs_g_prime
 
+    def rewrite_many(self, graph_id, rule, instances,
+                     p_typings=None, rhs_typings=None, strict=False):
+        """Rewrite a graph at several instances and propagate the changes.
+
+        The rule is applied at all the instances in a single
+        rewriting step: the restrictive changes are performed and
+        propagated backward once, then the expansive changes are
+        performed and propagated forward once.
+
+        Parameters
+        ----------
+        graph_id
+            Id of the graph in the hierarchy to rewrite
+        rule : regraph.rule.Rule
+            Rule object to apply
+        instances : iterable of dict
+            Non-overlapping instances of the lhs of the rule in
+            the graph subject to rewriting
+        p_typings : list of dict, optional
+            Typings of graphs in the hierarchy by the interface of
+            the rule (one per instance, see `Hierarchy.rewrite`)
+        rhs_typings : list of dict, optional
+            Typings of the rhs by graphs of the hierarchy
+            (one per instance, see `Hierarchy.rewrite`)
+        strict : bool, optional
+            Rewriting is strict when propagation down is not allowed
+
+        Returns
+        -------
+        rhs_instances : list of dict
+            Instances of the rhs of the rule in the result of
+            rewriting (one per input instance)
+
+        Raises
+        ------
+        HierarchyError
+            If the graph is not in the database
+        RewritingError
+            If the instances overlap or if the provided
+            p and rhs typings are inconsistent
+        """
+        instances = list(instances)
+        if len(instances) == 0:
+            return []
+        if p_typings is None:
+            p_typings = [None] * len(instances)
+        if rhs_typings is None:
+            rhs_typings = [None] * len(instances)
+
+        union_rule, union_instance, p_copies, rhs_copies = rule._replicate(
+            instances)
+
+        p_typing = dict()
+        for typing, p_copy in zip(p_typings, p_copies):
+            if typing is None:
+                continue
+            for g, g_typing in normalize_typing_relation(typing).items():
+                union_typing = p_typing.setdefault(g, dict())
+                for node, p_nodes in g_typing.items():
+                    union_typing.setdefault(node, set()).update(
+                        p_copy[p_node] for p_node in p_nodes)
+
+        rhs_typing = dict()
+        for typing, rhs_copy in zip(rhs_typings, rhs_copies):
+            if typing is None:
+                continue
+            for g, g_typing in normalize_typing_relation(typing).items():
+                union_typing = rhs_typing.setdefault(g, dict())
+                for rhs_node, g_nodes in g_typing.items():
+                    union_typing[rhs_copy[rhs_node]] = g_nodes
+
+        rhs_g_prime = self.rewrite(
+            graph_id, union_rule, union_instance,
+            p_typing, rhs_typing, strict)
+        return [
+            {n: rhs_g_prime[rhs_copy[n]] for n in rule.rhs.nodes()}
+            for rhs_copy in rhs_copies
+        ]
 
     def apply_rule_hierarchy(self, rule_hierarchy, instances):
         """Apply rule hierarchy.
@@ -12,6 +12,7 @@ from regraph.backends.networkx.plotting import plot_rule
 
 from regraph.command_parser import parser
 from regraph.utils import (keys_by_value,
+                           inverse_mapping,
                            make_canonical_commands,
                            dict_sub,
                            attrs_union,
@@ -27,7 +28,52 @@ from regraph.category_utils import (identity,
                                     pullback,
                                     compose)
 from regraph.exceptions import (ReGraphWarning, ParsingError,
-                                RuleError)
+                                RuleError, RewritingError)
+
+
+class _RuleMapping(dict):
+    """Dictionary counting its modifications.
+
+    Used for the mappings `p_lhs` and `p_rhs` of a rule, the
+    counter allows to detect modifications of the mappings
+    made directly on the dictionaries.
+    """
+
+    _version = 0
+
+    def _modified(self):
+        self._version += 1
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._modified()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._modified()
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self._modified()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._modified()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self._modified()
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._modified()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._modified()
+        return dict.setdefault(self, key, default)
 
 
 class Rule(object):
@@ -121,8 +167,63 @@ class Rule(object):
             check_homomorphism(p, rhs, p_rhs)
             self.p_rhs = copy.deepcopy(p_rhs)
 
+        self._delta = None
         return
 
+    @property
+    def p(self):
+        """Preserved part of the rule."""
+        return self._p
+
+    @p.setter
+    def p(self, graph):
+        self._p = graph
+        self._invalidate_delta()
+
+    @property
+    def lhs(self):
+        """Left-hand side of the rule."""
+        return self._lhs
+
+    @lhs.setter
+    def lhs(self, graph):
+        self._lhs = graph
+        self._invalidate_delta()
+
+    @property
+    def rhs(self):
+        """Right-hand side of the rule."""
+        return self._rhs
+
+    @rhs.setter
+    def rhs(self, graph):
+        self._rhs = graph
+        self._invalidate_delta()
+
+    @property
+    def p_lhs(self):
+        """Homomorphism between `p` and `lhs`."""
+        return self._p_lhs
+
+    @p_lhs.setter
+    def p_lhs(self, mapping):
+        if not isinstance(mapping, _RuleMapping):
+            mapping = _RuleMapping(mapping)
+        self._p_lhs = mapping
+        self._invalidate_delta()
+
+    @property
+    def p_rhs(self):
+        """Homomorphism between `p` and `rhs`."""
+        return self._p_rhs
+
+    @p_rhs.setter
+    def p_rhs(self, mapping):
+        if not isinstance(mapping, _RuleMapping):
+            mapping = _RuleMapping(mapping)
+        self._p_rhs = mapping
+        self._invalidate_delta()
+
     @classmethod
     def from_transform(cls, pattern, commands=None):
         """Initialize a rule from the transformation.
@@ -284,6 +385,7 @@ class Rule(object):
             If the node to clone is already being removed by the rule
             or if node with the specified clone id already exists in p.
         """
+        self._invalidate_delta()
         p_nodes = keys_by_value(self.p_lhs, n)
         if len(p_nodes) == 0:
             raise RuleError(
@@ -317,6 +419,7 @@ class Rule(object):
             Id of the node in `p` that should be removed
             by the rule.
         """
+        self._invalidate_delta()
         # remove corresponding nodes from p and rhs
         if p_node_id in self.p.nodes():
             self.p.remove_node(p_node_id)
@@ -348,6 +451,7 @@ class Rule(object):
             If some of the nodes are not found in `p`,
             or if a corresponding edge in `p` does not exist.
         """
+        self._invalidate_delta()
 
         if (n1, n2) in self.p.edges():
             self.p.remove_edge(n1, n2)
@@ -378,6 +482,7 @@ class Rule(object):
             is itself is being removed by the rule.
 
         """
+        self._invalidate_delta()
         if n not in self.p.nodes():
             raise RuleError(
                 "Node '{}' does not exist in the preserved part".format(
@@ -407,6 +512,7 @@ class Rule(object):
             is itself is being removed by the rule.
 
         """
+        self._invalidate_delta()
         if n1 not in self.p.nodes():
             raise RuleError(
                 "Node '{}' does not exist in the preserved "
@@ -446,6 +552,7 @@ class Rule(object):
         RuleError
             If node with this id already exists in the `rhs`.
         """
+        self._invalidate_delta()
         if node_id not in self.rhs.nodes():
             self.rhs.add_node(node_id, attrs)
         else:
@@ -472,6 +579,7 @@ class Rule(object):
         RuleError
             If some node from the list already exists in the `rhs`.
         """
+        self._invalidate_delta()
         for n in node_list:
             try:
                 node_id, node_attrs = n
@@ -499,6 +607,7 @@ class Rule(object):
             If some of the nodes (`n1` or `n2`) do not exist
             or if there is already an edge between them in `rhs`.
         """
+        self._invalidate_delta()
         if n1 not in self.rhs.nodes():
             raise RuleError(
                 "Node with the id '{}' does not exist in the "
@@ -534,6 +643,7 @@ class Rule(object):
             If some of the nodes (`n1` or `n2`) do not exist
             or if there is already an edge between them in `rhs`.
         """
+        self._invalidate_delta()
         for e in edge_list:
             if len(e) == 2:
                 self.inject_add_edge(e[0], e[1])
@@ -566,6 +676,7 @@ class Rule(object):
             If a node with some id specified in `node_list` does not
             exist in the preserved part of the rule.
         """
+        self._invalidate_delta()
         # Update graphs
         new_name = None
 
@@ -610,6 +721,7 @@ class Rule(object):
             If node `n` does not exist in the rhs of the rule
 
         """
+        self._invalidate_delta()
         if n not in self.rhs.nodes():
             raise RuleError(
                 "Node '{}' exists in the RHS of the rule".format(n))
@@ -636,6 +748,7 @@ class Rule(object):
             `rhs`, or if an edge is incident to smth thats
             is going to be removed by the rule.
         """
+        self._invalidate_delta()
         if (n1, n2) not in self.rhs.edges():
             raise RuleError(
                 "Edge '{}->{}' does not exist in the "
@@ -661,6 +774,7 @@ class Rule(object):
             If node `n` does not exist in the left-hand side or
             is being removed by the rule.
         """
+        self._invalidate_delta()
         if n not in self.lhs.nodes():
             raise RuleError(
                 "Node '%s' does not exist in the left hand "
@@ -679,6 +793,7 @@ class Rule(object):
 
     def inject_update_edge_attrs(self, n1, n2, attrs):
         """Inject an update of edge attrs by the rule."""
+        self._invalidate_delta()
         if n1 not in self.lhs.nodes():
             raise RuleError(
                 "Node '%s' does not exist in the left hand side of the rule" %
@@ -787,6 +902,47 @@ class Rule(object):
     #         rhs_g_prime = graph.rewrite(self, instance)
 
     #     return (g_prime, rhs_g_prime)
+    def _invalidate_delta(self):
+        """Drop the cached summary of the changes made by the rule."""
+        self._delta = None
+
+    def _get_delta(self):
+        """Get the summary of the changes made by the rule.
+
+        The summary (a dictionary) contains the inverses of
+        `p_lhs` and `p_rhs` together with the derived node and edge
+        views of the rule. It is computed once and reused until
+        the rule is modified: the `inject_*` and the primitive
+        `_add_*`/`_remove_*` methods drop it explicitly, while
+        direct modifications of the components of the rule
+        are detected with the mutation counters of the mappings and
+        of the graphs (only the views not depending on attributes
+        are cached).
+        """
+        version = (
+            self._p_lhs._version, self._p_rhs._version,
+            getattr(self._p, "_structure_version", 0),
+            getattr(self._lhs, "_structure_version", 0),
+            getattr(self._rhs, "_structure_version", 0)
+        )
+        delta = getattr(self, "_delta", None)
+        if delta is None or delta["version"] != version:
+            delta = {
+                "version": version,
+                "p_lhs_inverse": inverse_mapping(self.p_lhs),
+                "p_rhs_inverse": inverse_mapping(self.p_rhs)
+            }
+            self._delta = delta
+        return delta
+
+    def _delta_view(self, name, compute):
+        """Get a view of the rule stored in its cached summary."""
+        delta = self._get_delta()
+        if name not in delta:
+            delta[name] = compute(
+                delta["p_lhs_inverse"], delta["p_rhs_inverse"])
+        return delta[name]
+
     def added_nodes(self):
         """Get nodes added by the rule.
 
@@ -795,12 +951,11 @@ class Rule(object):
         nodes : set
             Set of nodes from `rhs` added by the rule.
         """
-        nodes = set()
-        for r_node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, r_node)
-            if len(p_nodes) == 0:
-                nodes.add(r_node)
-        return nodes
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            return set(
+                r_node for r_node in self.rhs.nodes()
+                if r_node not in p_rhs_inverse)
+        return set(self._delta_view("added_nodes", _compute))
 
     def added_edges(self):
         """Get edges added by the rule.
@@ -810,13 +965,11 @@ class Rule(object):
         edges : set
             Set of edges from `rhs` added by the rule.
         """
-        edges = set()
-        for s, t in self.rhs.edges():
-            s_p_nodes = keys_by_value(self.p_rhs, s)
-            t_p_nodes = keys_by_value(self.p_rhs, t)
-            if len(s_p_nodes) == 0 or len(t_p_nodes) == 0:
-                edges.add((s, t))
-            else:
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            edges = set()
+            for s, t in self.rhs.edges():
+                s_p_nodes = p_rhs_inverse.get(s, [])
+                t_p_nodes = p_rhs_inverse.get(t, [])
                 found_edge = False
                 for s_p_node in s_p_nodes:
                     for t_p_node in t_p_nodes:
@@ -824,7 +977,8 @@ class Rule(object):
                             found_edge = True
                 if not found_edge:
                     edges.add((s, t))
-        return edges
+            return edges
+        return set(self._delta_view("added_edges", _compute))
 
     def added_node_attrs(self):
         """Get node attributes added by the rule.
@@ -835,9 +989,10 @@ class Rule(object):
             Dictionary where keys are nodes from `rhs`
             and values are attribute dictionaries to add.
         """
+        p_rhs_inverse = self._get_delta()["p_rhs_inverse"]
         attrs = dict()
         for node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, node)
+            p_nodes = p_rhs_inverse.get(node, [])
             if len(p_nodes) == 0:
                 if len(self.rhs.get_node(node)) > 0:
                     attrs[node] = self.rhs.get_node(node)
@@ -858,10 +1013,11 @@ class Rule(object):
             Dictionary where keys are edges from `rhs`
             and values are attribute dictionaries to add.
         """
+        p_rhs_inverse = self._get_delta()["p_rhs_inverse"]
         attrs = dict()
         for s, t in self.rhs.edges():
-            s_p_nodes = keys_by_value(self.p_rhs, s)
-            t_p_nodes = keys_by_value(self.p_rhs, t)
+            s_p_nodes = p_rhs_inverse.get(s, [])
+            t_p_nodes = p_rhs_inverse.get(t, [])
             if len(s_p_nodes) == 0 or len(t_p_nodes) == 0:
                 if len(self.rhs.get_edge(s, t)) > 0:
                     attrs[(s, t)] = self.rhs.get_edge(s, t)
@@ -891,12 +1047,17 @@ class Rule(object):
             Dictionary where keys are nodes from `rhs` and
             values are sets of nodes from `p` that are merged.
         """
-        nodes = dict()
-        for node in self.rhs.nodes():
-            p_nodes = keys_by_value(self.p_rhs, node)
-            if len(p_nodes) > 1:
-                nodes[node] = set(p_nodes)
-        return nodes
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            return {
+                node: set(p_rhs_inverse[node])
+                for node in self.rhs.nodes()
+                if len(p_rhs_inverse.get(node, [])) > 1
+            }
+        return {
+            node: set(p_nodes)
+            for node, p_nodes in self._delta_view(
+                "merged_nodes", _compute).items()
+        }
 
     def removed_nodes(self):
         """Get nodes removed by the rule.
@@ -906,12 +1067,11 @@ class Rule(object):
         nodes : set
             Set of nodes from `lhs` removed by the rule.
         """
-        nodes = set()
-        for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
-            if len(p_nodes) == 0:
-                nodes.add(node)
-        return nodes
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            return set(
+                node for node in self.lhs.nodes()
+                if node not in p_lhs_inverse)
+        return set(self._delta_view("removed_nodes", _compute))
 
     def removed_edges(self):
         """Get edges removed by the rule.
@@ -921,16 +1081,15 @@ class Rule(object):
         edges : set
             Set of edges from `lhs` removed by the rule.
         """
-        edges = set()
-        for s, t in self.lhs.edges():
-            s_p_nodes = keys_by_value(self.p_lhs, s)
-            t_p_nodes = keys_by_value(self.p_lhs, t)
-            if len(s_p_nodes) != 0 and len(t_p_nodes) != 0:
-                for s_p_node in s_p_nodes:
-                    for t_p_node in t_p_nodes:
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            edges = set()
+            for s, t in self.lhs.edges():
+                for s_p_node in p_lhs_inverse.get(s, []):
+                    for t_p_node in p_lhs_inverse.get(t, []):
                         if (s_p_node, t_p_node) not in self.p.edges():
                             edges.add((s_p_node, t_p_node))
-        return edges
+            return edges
+        return set(self._delta_view("removed_edges", _compute))
 
     def removed_node_attrs(self):
         """Get node attributes removed by the rule.
@@ -941,10 +1100,10 @@ class Rule(object):
             Dictionary where keys are nodes from `p`
             and values are attribute dictionaries to remove.
         """
+        p_lhs_inverse = self._get_delta()["p_lhs_inverse"]
         attrs = dict()
         for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
-            for p_node in p_nodes:
+            for p_node in p_lhs_inverse.get(node, []):
                 new_attrs = dict_sub(
                     self.lhs.get_node(node), self.p.get_node(p_node))
                 if len(new_attrs) > 0:
@@ -961,12 +1120,11 @@ class Rule(object):
             Dictionary where keys are edges from `p`
             and values are attribute dictionaries to remove.
         """
+        p_lhs_inverse = self._get_delta()["p_lhs_inverse"]
         attrs = dict()
         for s, t in self.lhs.edges():
-            s_p_nodes = keys_by_value(self.p_lhs, s)
-            t_p_nodes = keys_by_value(self.p_lhs, t)
-            for s_p_node in s_p_nodes:
-                for t_p_node in t_p_nodes:
+            for s_p_node in p_lhs_inverse.get(s, []):
+                for t_p_node in p_lhs_inverse.get(t, []):
                     if (s_p_node, t_p_node) in self.p.edges():
                         new_attrs = dict_sub(
                             self.lhs.get_edge(s, t),
@@ -986,12 +1144,17 @@ class Rule(object):
             Dictionary where keys are nodes from `lhs` and
             values are sets of corresponding nodes from `p`.
         """
-        nodes = dict()
-        for node in self.lhs.nodes():
-            p_nodes = keys_by_value(self.p_lhs, node)
-            if len(p_nodes) > 1:
-                nodes[node] = set(p_nodes)
-        return nodes
+        def _compute(p_lhs_inverse, p_rhs_inverse):
+            return {
+                node: set(p_lhs_inverse[node])
+                for node in self.lhs.nodes()
+                if len(p_lhs_inverse.get(node, [])) > 1
+            }
+        return {
+            node: set(p_nodes)
+            for node, p_nodes in self._delta_view(
+                "cloned_nodes", _compute).items()
+        }
 
     def is_restrictive(self):
         """Check if the rule is  restrictive.
@@ -1074,6 +1237,7 @@ class Rule(object):
         return commands
 
     def _add_node_lhs(self, node_id, attrs=None):
+        self._invalidate_delta()
         if node_id not in self.lhs.nodes():
             self.lhs.add_node(node_id, attrs)
             new_p_node_id = node_id
@@ -1094,6 +1258,7 @@ class Rule(object):
                 "of the rule" % node_id)
 
     def _add_edge_lhs(self, source, target, attrs=None):
+        self._invalidate_delta()
         if (source, target) not in self.lhs.edges():
             if source in self.lhs.nodes() and target in self.rhs.nodes():
                 self.lhs.add_edge(source, target, attrs)
@@ -1116,6 +1281,7 @@ class Rule(object):
                 "of the rule".format(source, target))
 
     def _add_edge_attrs_lhs(self, source, target, attrs=None):
+        self._invalidate_delta()
         if (source, target) in self.lhs.edges():
             self.lhs.add_edge_attrs(source, target, attrs)
             for s_p_node in keys_by_value(self.p_lhs, source):
@@ -1136,6 +1302,7 @@ class Rule(object):
         if there exist nodes from `p` that map to this node
         they are removed as well.
         """
+        self._invalidate_delta()
         if node_id in self.lhs.nodes():
             self.lhs.remove_node(node_id)
             p_nodes = keys_by_value(self.p_lhs, node_id)
@@ -1152,6 +1319,7 @@ class Rule(object):
         if there exist nodes from `p` that map to this node
         they are removed as well.
         """
+        self._invalidate_delta()
         p_keys = keys_by_value(self.p_rhs, node_id)
         for p_node in p_keys:
             self.p.remove_node(p_node)
@@ -1161,14 +1329,17 @@ class Rule(object):
 
     def _add_edge_rhs(self, n1, n2, attrs=None):
         """Add an edge in the rhs."""
+        self._invalidate_delta()
         self.rhs.add_edge(n1, n2, attrs)
 
     def _remove_edge_p(self, node1, node2):
         """Remove edge from the p of the graph."""
+        self._invalidate_delta()
         self.p.remove_edge(node1, node2)
 
     def _remove_edge_rhs(self, node1, node2):
         """Remove edge from the rhs of the graph."""
+        self._invalidate_delta()
         self.rhs.remove_edge(node1, node2)
         for pn1 in keys_by_value(self.p_rhs, node1):
             for pn2 in keys_by_value(self.p_rhs, node2):
@@ -1177,6 +1348,7 @@ class Rule(object):
 
     def _clone_rhs_node(self, node, new_name=None):
         """Clone an rhs node."""
+        self._invalidate_delta()
         if node not in self.rhs.nodes():
             raise RuleError(
                 "Node '%s' is not a node of right hand side" %
@@ -1195,6 +1367,7 @@ class Rule(object):
 
     def _merge_nodes_rhs(self, n1, n2, new_name):
         """Merge nodes in rhs."""
+        self._invalidate_delta()
         if n1 not in self.rhs.nodes():
             raise RuleError("Node '%s' is not a node of the rhs" % n1)
         if n2 not in self.rhs.nodes():
@@ -1206,6 +1379,7 @@ class Rule(object):
 
     def _add_node_attrs_rhs(self, n, attrs):
         """Add attrs to a node in the rhs."""
+        self._invalidate_delta()
         if n not in self.rhs.nodes():
             raise RuleError(
                 "Node %s does not exist in the right "
@@ -1214,6 +1388,7 @@ class Rule(object):
 
     def _remove_node_attrs_rhs(self, n, attrs):
         """Remove attrs of a node in the rhs."""
+        self._invalidate_delta()
         if n not in self.rhs.nodes():
             raise RuleError(
                 "Node '%s' does not exist in the right hand "
@@ -1226,6 +1401,7 @@ class Rule(object):
 
     def _remove_node_attrs_p(self, n, attrs):
         """Remove attrs of a node in the p."""
+        self._invalidate_delta()
         if n not in self.p.nodes():
             raise RuleError(
                 "Node '%s' does not exist in the preserved "
@@ -1248,6 +1424,7 @@ class Rule(object):
             )
 
     def _add_node_attrs_lhs(self, n, attrs):
+        self._invalidate_delta()
         if n not in self.lhs.nodes():
             raise RuleError(
                 "Node '%s' does not exist in the lhs "
@@ -1259,6 +1436,7 @@ class Rule(object):
             self.rhs.add_node_attrs(self.p_rhs[p_node], attrs)
 
     def _remove_attrs(self):
+        self._invalidate_delta()
         for n in self.lhs.nodes():
             self.lhs.set_node_attrs(n, dict(), update=True)
         for n in self.p.nodes():
@@ -1274,6 +1452,7 @@ class Rule(object):
             self.rhs.set_edge_attrs(u, v, dict(), update=True)
 
     def _escape(self):
+        self._invalidate_delta()
         lhs_relabel = {}
         for node in self.lhs.nodes():
             new_name = remove_forbidden(node)
@@ -1443,6 +1622,78 @@ class Rule(object):
         """Test if the rule is identity."""
         return not self.is_restrictive() and not self.is_relaxing()
 
+    def _replicate(self, instances):
+        """Replicate the rule for a collection of instances.
+
+        Builds the disjoint union of as many copies of the rule
+        as there are instances, together with the union of the
+        instances. Applying the resulting rule is equivalent to
+        applying the original rule at every instance.
+
+        Parameters
+        ----------
+        instances : list of dict
+            Instances of the lhs of the rule.
+
+        Returns
+        -------
+        rule : regraph.rules.Rule
+            Disjoint union of the copies of the rule
+        instance : dict
+            Instance of the lhs of the new rule
+        p_copies : list of dict
+            For every instance, the mapping from the nodes of `p`
+            to the nodes of `p` of the new rule
+        rhs_copies : list of dict
+            For every instance, the mapping from the nodes of `rhs`
+            to the nodes of `rhs` of the new rule
+
+        Raises
+        ------
+        RewritingError
+            If some instances overlap.
+        """
+        p = NXGraph()
+        lhs = NXGraph()
+        rhs = NXGraph()
+
+        def _add_copy(graph, copy_graph, i):
+            copy_nodes = dict()
+            for n, attrs in graph.nodes(data=True):
+                node_id = n if i == 0 else "{}_{}".format(n, i)
+                node_id = copy_graph.generate_new_node_id(node_id)
+                copy_graph.add_node(node_id, attrs)
+                copy_nodes[n] = node_id
+            for s, t, attrs in graph.edges(data=True):
+                copy_graph.add_edge(copy_nodes[s], copy_nodes[t], attrs)
+            return copy_nodes
+
+        instance = dict()
+        instance_nodes = set()
+        p_lhs = dict()
+        p_rhs = dict()
+        p_copies = []
+        rhs_copies = []
+        for i, lhs_instance in enumerate(instances):
+            lhs_copy = _add_copy(self.lhs, lhs, i)
+            p_copy = _add_copy(self.p, p, i)
+            rhs_copy = _add_copy(self.rhs, rhs, i)
+            for lhs_node, node in lhs_instance.items():
+                if node in instance_nodes:
+                    raise RewritingError(
+                        "Cannot rewrite at overlapping instances: "
+                        "node '{}' belongs to several instances".format(
+                            node))
+                instance_nodes.add(node)
+                instance[lhs_copy[lhs_node]] = node
+            for p_node in self.p.nodes():
+                p_lhs[p_copy[p_node]] = lhs_copy[self.p_lhs[p_node]]
+                p_rhs[p_copy[p_node]] = rhs_copy[self.p_rhs[p_node]]
+            p_copies.append(p_copy)
+            rhs_copies.append(rhs_copy)
+
+        return Rule(p, lhs, rhs, p_lhs, p_rhs), instance, p_copies, rhs_copies
+
 
 def _generate_p_instance(rule, lhs_instance, rhs_instance):
     # Compute representation of p1/p2 instances.
@@ -1586,6 +1837,7 @@ def compose_rules(rule1, lhs_instance1, rhs_instance1,
                 del rule.p_rhs[n]
             rule.p_lhs[new_p_node] = lhs_node
             rule.p_rhs[new_p_node] = list(rhs_nodes)[0]
+            rule._invalidate_delta()
 
     assert(set(lhs_instance.keys()) == set(rule.lhs.nodes()))
     assert(set(rhs_instance.keys()) == set(rule.rhs.nodes()))
@@ -1620,9 +1872,9 @@ def _fold_lhs(rule, lhs_instance, rhs_instance):
     }
 
     # Start from intial P and R from delta
-    p = copy.deepcopy(rule.p)
+    p = NXGraph.copy(rule.p)
 
-    rhs = copy.deepcopy(rule.rhs)
+    rhs = NXGraph.copy(rule.rhs)
     p_rhs = {}
     instance = {}
 
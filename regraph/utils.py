@@ -1,8 +1,71 @@
 """A collection of utils for ReGraph library."""
 import copy
 
+from collections import OrderedDict
+
 from regraph.command_parser import parser
 from regraph.exceptions import ReGraphError, ParsingError, RewritingError
+
+
+class _LRUCache(object):
+    """Bounded cache discarding the least recently used entries."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, factory):
+        """Get the cached value of `key`, compute it with `factory` if absent."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = factory()
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def discard(self, key):
+        """Remove the entry of `key` if present, keep the statistics."""
+        self._data.pop(key, None)
+
+    def invalidate(self):
+        """Remove all the entries, keep the statistics."""
+        self._data.clear()
+
+    def resize(self, maxsize):
+        """Change the maximum number of entries."""
+        self.maxsize = maxsize
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all the entries and reset the statistics."""
+        self.hits = 0
+        self.misses = 0
+        self._data.clear()
+
+    def info(self):
+        """Get the statistics and the size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize
+        }
+
+
+# Imported after `_LRUCache`, which `regraph.attribute_sets` uses
+# when it is imported
 from regraph.attribute_sets import AttributeSet, FiniteSet
 
 
@@ -70,10 +133,15 @@ def safe_deepcopy_dict(d):
     """Util for safe deepcopy of a dict.
 
     Solves the issue with 'TypeError: can't pickle dict_items objects'
-    of the default 'copy.deepcopy'.
+    of the default 'copy.deepcopy'. Finite sets of values are immutable,
+    so they are shared by the copy rather than copied.
     """
+    if d is None:
+        return None
     try:
-        new_d = copy.deepcopy(d)
+        new_d = dict()
+        for k, v in d.items():
+            new_d[k] = v if type(v) is FiniteSet else copy.deepcopy(v)
     except TypeError:
         new_d = dict()
         for k, v in d.items():
@@ -258,6 +326,29 @@ def keys_by_value(dictionary, val):
     return res
 
 
+def inverse_mapping(dictionary):
+    """Build the inverse of a mapping.
+
+    The inverse is built in one pass over the mapping and allows
+    to look up the preimage of an element in constant time, instead
+    of scanning the mapping with `keys_by_value` for every element.
+
+    Returns
+    -------
+    inverse : dict
+        Dictionary whose keys are the values of the input mapping
+        and whose values are lists of the corresponding keys (in the
+        order `keys_by_value` would return them)
+    """
+    inverse = dict()
+    for key, value in dictionary.items():
+        if value in inverse:
+            inverse[value].append(key)
+        else:
+            inverse[value] = [key]
+    return inverse
+
+
 def fold_left(f, init, l):
     """ f : a -> b -> b
         init : b
@@ -296,6 +387,18 @@ def normalize_attrs(attrs):
     return
 
 
+def normalized_attrs_copy(attrs):
+    """Create a normalized copy of node/edge attributes.
+
+    Attributes are normalized before being copied: raw values are
+    converted to finite sets once, while finite sets (immutable)
+    are shared with the input dictionary.
+    """
+    new_attrs = dict(attrs)
+    normalize_attrs(new_attrs)
+    return safe_deepcopy_dict(new_attrs)
+
+
 def normalize_relation(relation):
     new_relation_dict = dict()
     for key, values in relation.items():
@@ -19,6 +19,7 @@ setuptools.setup(
     url="http://dev.executableknowledge.org/ReGraph/",
     packages=[
         'regraph',
+        'regraph.backends.compact',
         'regraph.backends.neo4j',
         'regraph.backends.neo4j.cypher_utils',
         'regraph.backends.networkx'],
@@ -1,10 +1,16 @@
 """Collection of tests for ReGraph attribute sets."""
+import copy
 import math
-from regraph import (RegexSet,
+import pickle
+from regraph import (AttributeSetError,
+                     RegexSet,
                      IntegerSet,
                      FiniteSet,
                      UniversalSet,
-                     EmptySet)
+                     EmptySet,
+                     regex_cache_info,
+                     set_regex_cache_size,
+                     clear_regex_cache)
 
 
 class TestAttributeSets:
@@ -106,6 +112,39 @@ class TestAttributeSets:
         b2 = a.union(FiniteSet({1, 2, 3}))
         assert(b1 == b2)
 
+    def test_integerset_intervals(self):
+        """Test normalization and interval sweeps of IntegerSet."""
+        a = IntegerSet([(20, 30), 4, (0, 3), (6, 8), (7, 12)])
+        assert(a.intervals == [(0, 4), (6, 12), (20, 30)])
+        assert(a.contains(4) and a.contains(12) and a.contains(20))
+        assert(not a.contains(5) and not a.contains(-1))
+        assert(a.contains_many([31, 0, 5, 25, 5]) ==
+               [False, True, False, True, False])
+        assert(all(a.contains_many(FiniteSet({1, 7, 30}))))
+
+        b = IntegerSet([(-math.inf, 2), (10, 21), (29, math.inf)])
+        assert(a.intersection(b).intervals ==
+               [(0, 2), (10, 12), (20, 21), (29, 30)])
+        assert(a.difference(b).intervals ==
+               [(3, 4), (6, 9), (22, 28)])
+        assert(b.difference(a).intervals ==
+               [(-math.inf, -1), (13, 19), (31, math.inf)])
+        assert(a.union(b).intervals ==
+               [(-math.inf, 4), (6, math.inf)])
+        assert(a.difference(FiniteSet({4, 6, 100})).intervals ==
+               [(0, 3), (7, 12), (20, 30)])
+        assert(a.difference(EmptySet()) == a)
+        assert(a.difference(UniversalSet()).is_empty())
+        assert(IntegerSet([(5, 6)]).issubset(FiniteSet({4, 5, 6})))
+        assert(not IntegerSet([(5, 7)]).issubset(FiniteSet({4, 5, 6})))
+
+        assert(FiniteSet({"1", 11, 22}).issubset(a))
+        assert(not FiniteSet({1, 5}).issubset(a))
+
+        b_json = b.to_json()
+        assert(b_json["data"] == [["-inf", 2], [10, 21], [29, "inf"]])
+        assert(IntegerSet.from_json(b_json) == b)
+
     def test_finite_set(self):
         """Test FiniteSet data structure."""
         uniprot =\
@@ -150,3 +189,58 @@ class TestAttributeSets:
         assert(ints4.intersection(strs4).is_empty())
         assert(ints4.issubset(UniversalSet()))
         assert(ints4.issubset(EmptySet()) is False)
+
+    def test_finite_set_sharing(self):
+        """Test hash-consing of immutable finite sets."""
+        a = FiniteSet({1, 2})
+        assert(a is FiniteSet([2, 1]))
+        assert(a is FiniteSet(frozenset({1, 2})))
+        assert(FiniteSet({1}) is not FiniteSet({True}))
+        mixed = FiniteSet([1, 2.0])
+        assert(mixed is not FiniteSet([1.0, 2]))
+        assert({(type(e), e) for e in FiniteSet([1.0, 2]).to_json()["data"]} ==
+               {(float, 1.0), (int, 2)})
+        assert(FiniteSet([(1, "x")]) is not FiniteSet([(1.0, "x")]))
+        assert(FiniteSet([(1, "x")]) is FiniteSet([(1, "x")]))
+        assert(copy.deepcopy(a) is a)
+        assert(pickle.loads(pickle.dumps(a)) is a)
+
+        assert(a.union(FiniteSet({1})) is a)
+        assert(a.intersection(FiniteSet({1, 2, 3})) is a)
+        assert(a.difference(FiniteSet({3})) is a)
+        assert(a.union({3}) == FiniteSet({1, 2, 3}))
+        try:
+            a.add(3)
+            raise ValueError("Finite set was modified")
+        except AttributeSetError:
+            pass
+        assert(a.fset == {1, 2})
+
+    def test_regex_cache(self):
+        """Test caching of the results of regex operations."""
+        clear_regex_cache()
+        a = RegexSet("a+b")
+        b = RegexSet("[ab]*")
+        assert(a.issubset(b))
+        assert(not b.issubset(a))
+        info = regex_cache_info()
+        assert(info["fsm"]["misses"] == 2)
+        assert(info["inclusion"]["misses"] == 2)
+
+        assert(RegexSet("a+b").issubset(b))
+        info = regex_cache_info()
+        assert(info["inclusion"]["hits"] == 1)
+        assert(info["fsm"]["misses"] == 2)
+
+        assert(FiniteSet({"ab", "aab"}).issubset(a))
+        assert(not FiniteSet({"ba"}).issubset(a))
+        assert(regex_cache_info()["compiled"]["hits"] == 2)
+
+        set_regex_cache_size(1, 1)
+        assert(RegexSet("c").issubset(b) is False)
+        info = regex_cache_info()
+        assert(info["fsm"]["size"] == 1)
+        assert(info["inclusion"]["size"] == 1)
+        set_regex_cache_size(1024)
+        clear_regex_cache()
+        assert(regex_cache_info()["inclusion"]["size"] == 0)
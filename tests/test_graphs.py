@@ -1,6 +1,7 @@
 """Units tests for graph classes."""
 from regraph import Rule
-from regraph import Neo4jGraph, NXGraph
+from regraph import Neo4jGraph, NXGraph, CompactGraph
+from regraph import RewritingError, RegexSet, IntegerSet
 
 import logging
 import warnings
@@ -187,3 +188,202 @@ class TestGraphClasses:
                 driver=self.neo4j_graph._driver, filename="neo4jgraph.json",
                 node_label="new_node", edge_label="new_edge")
             assert(g1 == g2)
+
+    def test_find_matching_nx(self):
+        """Test matching of patterns with self-loops and edge attrs."""
+        graph = NXGraph()
+        graph.add_nodes_from([
+            ("a", {"name": "Alice"}), ("b", {"name": "Bob"}), "c", "d"])
+        graph.add_edges_from([
+            ("a", "b", {"type": "friends"}), ("b", "a"), ("b", "b"),
+            ("b", "c"), ("c", "d", {"type": "friends"}), ("d", "c")])
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", "y"])
+        pattern.add_edges_from([("x", "y", {"type": "friends"}), ("y", "x")])
+        instances = graph.find_matching(pattern)
+        assert(len(instances) == 2)
+        assert({"x": "a", "y": "b"} in instances)
+        assert({"x": "c", "y": "d"} in instances)
+
+        pattern = NXGraph()
+        pattern.add_nodes_from([("x", {"name": "Bob"}), "y"])
+        pattern.add_edges_from([("x", "x"), ("x", "y")])
+        instances = graph.find_matching(pattern)
+        assert(len(instances) == 2)
+        assert({"x": "b", "y": "c"} in instances)
+        assert({"x": "b", "y": "a"} in instances)
+        assert(graph.find_matching(pattern, nodes=["b", "c"]) == [
+            {"x": "b", "y": "c"}])
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", "y"])
+        assert(len(graph.find_matching(pattern)) == 12)
+
+        instances = graph.iter_matching(pattern, limit=5)
+        assert(len(list(instances)) == 5)
+        assert(next(graph.iter_matching(pattern)) in graph.find_matching(
+            pattern))
+
+    def test_attribute_index(self):
+        """Test matching with the inverted index of node attributes."""
+        graph = NXGraph()
+        graph.build_attribute_index()
+        graph.add_nodes_from([
+            ("a", {"name": "Alice", "age": 35}),
+            ("b", {"name": "Bob", "age": 20}),
+            ("c", {"name": "Claire"})])
+        graph.add_edges_from([("a", "b"), ("c", "b")])
+
+        pattern = NXGraph()
+        pattern.add_nodes_from([("x", {"name": "Alice"}), "y"])
+        pattern.add_edges_from([("x", "y")])
+        assert(graph.find_matching(pattern) == [{"x": "a", "y": "b"}])
+
+        graph.remove_node_attrs("a", {"name": "Alice"})
+        graph.add_node_attrs("c", {"name": "Alice"})
+        assert(graph.find_matching(pattern) == [{"x": "c", "y": "b"}])
+
+        graph.clone_node("c", "c1")
+        graph.merge_nodes(["a", "b"], "ab")
+        graph.update_node_attrs("ab", {"name": "Alice"})
+        instances = graph.find_matching(pattern)
+        assert(len(instances) == 2)
+        assert({"x": "c1", "y": "ab"} in instances)
+        assert({"x": "ab", "y": "ab"} not in instances)
+
+        graph.drop_attribute_index()
+        assert(not graph.has_attribute_index())
+        assert(graph.find_matching(pattern) == instances)
+
+    def test_rewrite_many(self):
+        """Test rewriting at several instances."""
+        graph = NXGraph()
+        graph.add_nodes_from(range(6))
+        graph.add_edges_from([(i, i + 1) for i in range(5)])
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", "y"])
+        pattern.add_edges_from([("x", "y")])
+        rule = Rule.from_transform(pattern)
+        rule.inject_remove_edge("x", "y")
+        rule.inject_add_node("z")
+        rule.inject_add_edge("z", "y")
+
+        rhs_instances = graph.rewrite_many(
+            rule, [{"x": 0, "y": 1}, {"x": 3, "y": 4}])
+        assert(len(rhs_instances) == 2)
+        assert(rhs_instances[0]["y"] == 1 and rhs_instances[1]["y"] == 4)
+        assert(len(graph.nodes()) == 8)
+        for rhs_instance in rhs_instances:
+            assert(not graph.exists_edge(
+                rhs_instance["x"], rhs_instance["y"]))
+            assert(graph.exists_edge(rhs_instance["z"], rhs_instance["y"]))
+        assert(graph.exists_edge(1, 2))
+
+        try:
+            graph.rewrite_many(rule, [{"x": 1, "y": 2}, {"x": 2, "y": 3}])
+            raise ValueError("Overlapping instances were not detected")
+        except RewritingError:
+            pass
+
+    def test_compact_graph(self):
+        """Test the compact graph backend against NetworkX graphs."""
+        graph = CompactGraph.copy(self.nx_graph)
+        assert(graph == self.nx_graph)
+        assert(len(graph.edges()) == len(self.nx_graph.edges()))
+
+        nx_graph = NXGraph.copy(self.nx_graph)
+        for g in [graph, nx_graph]:
+            g.add_nodes_from([
+                ("d", {"name": "Alison"}), ("e", {"name": "Alison"})])
+            g.add_edges_from([("d", "a"), ("a", "d"), ("e", "e")])
+            g.remove_edge("a", "d")
+            g.clone_node("a", "a_clone")
+            g.merge_nodes(["d", "e"], "de")
+            g.add_node_attrs("de", {"age": 19})
+        assert(graph == nx_graph)
+        assert(set(graph.predecessors("a")) == set(nx_graph.predecessors("a")))
+        assert(graph.get_node("de") == nx_graph.get_node("de"))
+        # nodes with equal attributes share them
+        assert(graph.get_node("a")["name"] is graph.get_node("de")["name"])
+        for n in ["r1", "r2"]:
+            graph.add_node(n, {
+                "seq": RegexSet("[A-Z]+"), "pos": IntegerSet([(1, 10)])})
+        assert(graph.get_node("r1")["seq"] is graph.get_node("r2")["seq"])
+        assert(graph.get_node("r1")["pos"] is graph.get_node("r2")["pos"])
+        graph.remove_node("r1")
+        graph.remove_node("r2")
+
+        pattern = NXGraph()
+        pattern.add_nodes_from([("x", {"name": "Alison"}), "y"])
+        pattern.add_edges_from([("x", "y")])
+        instances = graph.find_matching(pattern)
+        assert(len(instances) > 0)
+        assert(len(instances) == len(nx_graph.find_matching(pattern)))
+        for instance in instances:
+            assert(instance in nx_graph.find_matching(pattern))
+
+        rule = Rule.from_transform(pattern)
+        rule.inject_remove_edge("x", "y")
+        rule.inject_add_node("z", {"name": "Zoe"})
+        rule.inject_add_edge("x", "z")
+        graph.rewrite(rule, instances[0])
+        nx_graph.rewrite(rule, instances[0])
+        graph.compact()
+        assert(graph == nx_graph)
+        assert(CompactGraph.copy(graph) == graph)
+
+    def test_typed_matching(self):
+        """Test matching with candidates from inverse typings."""
+        pattern = NXGraph()
+        pattern.add_node("x")
+        pattern_typing = {"g0": {"x": "circle"}}
+        for cls in [NXGraph, CompactGraph]:
+            graph = cls()
+            graph.add_nodes_from(["a", "b", "c"])
+            graph_typing = {"g0": {"a": "circle", "b": "square"}}
+            inverse_typing = {"g0": {"circle": ["a"], "square": ["b"]}}
+
+            def _matched(nodes=None):
+                return sorted(
+                    instance["x"] for instance in graph.iter_matching(
+                        pattern, nodes=nodes, graph_typing=graph_typing,
+                        pattern_typing=pattern_typing,
+                        inverse_graph_typing=inverse_typing))
+
+            # untyped nodes match any type
+            assert(_matched() == ["a", "c"])
+            assert(_matched(nodes=["b", "c"]) == ["c"])
+            graph_typing["g0"]["c"] = "square"
+            inverse_typing["g0"]["square"].append("c")
+            assert(_matched() == ["a"])
+
+    def test_snapshot(self):
+        """Test copy-on-write snapshots of NetworkX graphs."""
+        graph = NXGraph.copy(self.nx_graph)
+        snapshot = graph.snapshot()
+        assert(snapshot == graph)
+
+        snapshot.add_node("e", {"name": "Eve"})
+        snapshot.add_edge("e", "a")
+        snapshot.add_node_attrs("a", {"age": 42})
+        snapshot.remove_node("a_copy")
+        for s, t in snapshot.edges():
+            snapshot.add_edge_attrs(s, t, {"weight": 1})
+            break
+        assert(graph == self.nx_graph)
+        assert(len(snapshot.nodes()) == len(graph.nodes()))
+
+        graph.merge_nodes(["a", "a_copy"], "aa")
+        graph.clone_node("c", "c1")
+        assert("a" in snapshot.nodes() and "a_copy" not in snapshot.nodes())
+        assert(42 in snapshot.get_node("a")["age"])
+        assert(set(snapshot.predecessors("a")) == {"e"} | set(
+            self.nx_graph.predecessors("a")))
+
+        # a snapshot of a snapshot
+        other = snapshot.snapshot()
+        other.remove_node("e")
+        assert("e" in snapshot.nodes())
+        assert(snapshot.exists_edge("e", "a"))
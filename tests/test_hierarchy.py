@@ -6,7 +6,7 @@ from nose.tools import raises
 
 from regraph import Rule
 from regraph import NXGraph
-from regraph import (HierarchyError)
+from regraph import (HierarchyError, InvalidHomomorphism)
 import regraph.primitives as prim
 
 
@@ -279,6 +279,24 @@ class TestHierarchy(object):
                  "square": "white_square",
                  "triangle": "black_triangle"})
 
+    def test_add_typing_commutativity(self):
+        h = copy.deepcopy(self.nx_hierarchy)
+        try:
+            h.add_typing(
+                "g4", "g1",
+                {1: "black_circle", 2: "black_square", 3: "black_triangle"})
+            raise ValueError("Non-commuting typing was not detected")
+        except HierarchyError:
+            pass
+        # the typings composed by the check are cached and reused
+        info = h.typing_cache_info()
+        assert(info["size"] > 0)
+        h.add_typing(
+            "g4", "g1",
+            {1: "black_circle", 2: "black_square", 3: "white_triangle"})
+        assert(("g4", "g1") in h.typings())
+        assert(h.typing_cache_info()["hits"] > info["hits"])
+
     # def test_remove_graph(self):
     #     h = copy.deepcopy(self.hierarchy)
     #     h.remove_node("g1", reconnect=True)
@@ -323,6 +341,100 @@ class TestHierarchy(object):
         if self.neo4j_hierarchy:
             assert(n4instances == nxinstances)
 
+        instances = self.nx_hierarchy.iter_matching(
+            graph_id="g1",
+            pattern=pattern,
+            pattern_typing={"g0": pattern_typing})
+        assert(next(instances) in self.nx_hierarchy.find_matching(
+            "g1", pattern, {"g0": pattern_typing}))
+        assert(len(list(self.nx_hierarchy.iter_matching(
+            "g1", pattern, limit=1))) == 1)
+
+    def test_inverse_typing(self):
+        h = copy.deepcopy(self.nx_hierarchy)
+        inverse = h.get_inverse_typing("g1", "g0")
+        assert(set(inverse["circle"]) == {"black_circle", "white_circle"})
+        assert(h.get_inverse_typing("g1", "g0") is inverse)
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", "y"])
+        pattern.add_edges_from([("x", "y")])
+        instances = h.find_matching(
+            "g1", pattern, {"g0": {"x": "circle", "y": "square"}})
+        assert(len(instances) == 2)
+
+        h.relabel_graph_node("g1", "white_square", "ws")
+        inverse = h.get_inverse_typing("g1", "g0")
+        assert(set(inverse["square"]) == {"black_square", "ws"})
+        instances = h.find_matching(
+            "g1", pattern, {"g0": {"x": "circle", "y": "square"}})
+        assert({"x": "white_circle", "y": "ws"} in instances)
+
+    def test_typing_cache(self):
+        h = copy.deepcopy(self.nx_hierarchy)
+        # composed typings may already be cached by the consistency
+        # checks of 'add_typing'
+        typing = h.get_typing("g2", "g0")
+        assert(typing[1] == "circle")
+        info = h.typing_cache_info()
+        typing[1] = "square"
+        assert(h.get_typing("g2", "g0")[1] == "circle")
+        new_info = h.typing_cache_info()
+        assert(new_info["hits"] == info["hits"] + 1)
+        assert(new_info["misses"] == info["misses"])
+
+        # updates of a typing on the path invalidate the cache
+        h.relabel_graph_node("g1", "black_circle", "bc")
+        assert(h.get_typing("g2", "g1")[1] == "bc")
+        assert(h.get_typing("g2", "g0")[1] == "circle")
+        assert(h.typing_cache_info()["misses"] == new_info["misses"] + 1)
+
+        h.relabel_graph_node("g0", "circle", "c")
+        assert(h.get_typing("g2", "g0")[1] == "c")
+
+        h.remove_graph("g1")
+        try:
+            h.get_typing("g2", "g0")
+            raise ValueError("Typing through a removed graph was found")
+        except HierarchyError:
+            pass
+
+    def test_rewrite_many(self):
+        h = NXHierarchy()
+        h.add_graph("T", NXGraph())
+        h.get_graph("T").add_node("A")
+        h.get_graph("T").add_edge("A", "A")
+        g = NXGraph()
+        g.add_nodes_from(range(6))
+        g.add_edges_from([(i, i + 1) for i in range(5)])
+        h.add_graph("G", g)
+        h.add_typing("G", "T", {i: "A" for i in range(6)})
+        d = NXGraph()
+        d.add_nodes_from(["d{}".format(i) for i in range(6)])
+        h.add_graph("D", d)
+        h.add_typing("D", "G", {"d{}".format(i): i for i in range(6)})
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", "y"])
+        pattern.add_edges_from([("x", "y")])
+        rule = Rule.from_transform(pattern)
+        rule.inject_clone_node("x")
+        rule.inject_add_node("z")
+        rule.inject_add_edge("z", "y")
+
+        instances = [{"x": 0, "y": 1}, {"x": 3, "y": 4}]
+        rhs_instances = h.rewrite_many(
+            "G", rule, instances,
+            rhs_typings=[{"T": {"z": "A"}}, {"T": {"z": "A"}}])
+        assert(len(rhs_instances) == 2)
+        assert(len(h.get_graph("G").nodes()) == 10)
+        # clones are propagated backward to 'D' once per instance
+        assert(len(h.get_graph("D").nodes()) == 8)
+        for rhs_instance in rhs_instances:
+            assert(h.get_typing("G", "T")[rhs_instance["z"]] == "A")
+            assert(h.get_graph("G").exists_edge(
+                rhs_instance["z"], rhs_instance["y"]))
+
     def test_rewrite(self):
         pattern = NXGraph()
         pattern.add_nodes_from([
@@ -459,6 +571,29 @@ class TestHierarchy(object):
             for s, t, attrs in old_g00_edges:
                 assert(self.neo4j_hierarchy.get_graph("g00").get_edge(s, t) == attrs)
 
+    def test_from_json_check(self):
+        json_data = self.nx_hierarchy.to_json()
+        assert(NXHierarchy.from_json(json_data) == self.nx_hierarchy)
+        assert(
+            NXHierarchy.from_json(json_data, check=False) ==
+            self.nx_hierarchy)
+        self.nx_hierarchy.check_consistency()
+
+        # break commutativity of g2 -> g1 -> g0 and g2 -> g0
+        for typing_data in json_data["typing"]:
+            if (typing_data["from"], typing_data["to"]) == ("g1", "g0"):
+                typing_data["mapping"]["black_circle"] = "square"
+                typing_data["mapping"]["white_circle"] = "square"
+        try:
+            NXHierarchy.from_json(json_data)
+            raise ValueError("Invalid hierarchy was loaded")
+        except HierarchyError:
+            pass
+        except InvalidHomomorphism:
+            pass
+        h = NXHierarchy.from_json(json_data, check=False)
+        assert(h.get_typing("g1", "g0")["black_circle"] == "square")
+
     def test_node_type(self):
         assert(
             self.nx_hierarchy.node_type("g1", "white_circle") ==
@@ -1,7 +1,68 @@
 """Collection of tests for ReGraph_neo4j graphs."""
 import warnings
-from regraph import Neo4jGraph
+from regraph import (Neo4jGraph, Neo4jHierarchy, NXGraph, Rule,
+                     FiniteSet, IntegerSet)
 from regraph.backends.neo4j.cypher_utils import *
+from regraph.backends.neo4j.cypher_utils import generic, propagation, rewriting
+
+
+class RecordingResult(list):
+    """Result of a query executed by the recording driver."""
+
+    def single(self):
+        return {"new_id": None}
+
+    def value(self):
+        return [None]
+
+
+class RecordingTransaction(object):
+    """Explicit transaction recording the queries it runs."""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def run(self, query, parameters=None):
+        self._driver.queries.append((query, parameters))
+        return RecordingResult()
+
+    def commit(self):
+        self._driver.commits += 1
+
+    def rollback(self):
+        self._driver.rollbacks += 1
+
+
+class RecordingSession(RecordingTransaction):
+    """Session recording the queries it runs."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        pass
+
+    def begin_transaction(self):
+        self._driver.transactions += 1
+        return RecordingTransaction(self._driver)
+
+
+class RecordingDriver(object):
+    """Fake Neo4j driver recording the executed queries."""
+
+    def __init__(self):
+        self.queries = []
+        self.sessions = 0
+        self.transactions = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def session(self):
+        self.sessions += 1
+        return RecordingSession(self)
 
 
 class TestNeo4jGraph(object):
@@ -245,3 +306,297 @@ class TestNeo4jGraph(object):
                     for kk in attrs_edge_out_n2[k].keys():
                         for v in attrs_edge_out_n2[k][kk]:
                             assert(v in attrs_edge_out_merged[merged_node][kk])
+
+
+class TestCypherTemplates(object):
+    """Tests of the parameterized query templates (no database needed)."""
+
+    def test_builders(self):
+        params1 = {}
+        params2 = {}
+        q1 = generic.match_node("n", "a", "node", parameters=params1)
+        q2 = generic.match_node("n", "b'c", "node", parameters=params2)
+        assert(q1 == q2)
+        assert(params1 == {"param0": "a"})
+        assert(params2 == {"param0": "b'c"})
+        assert(generic.match_node("n", "a", "node") ==
+               "MATCH (n:node { id : 'a' })\n")
+
+        q1, _ = rewriting.add_node(
+            "n", "a", "new_id", "node", attrs={"name": FiniteSet({"EGFR"})},
+            parameters=params1)
+        q2, _ = rewriting.add_node(
+            "n", "x", "new_id", "node", attrs={"name": FiniteSet({"Grb2", "SH2"})},
+            parameters=params2)
+        assert(q1 == q2)
+        assert(params2["param2"] == {"name": ["Grb2", "SH2"]} or
+               params2["param2"] == {"name": ["SH2", "Grb2"]})
+
+        pattern = NXGraph()
+        pattern.add_nodes_from(["x", ("y", {"name": "EGFR"})])
+        pattern.add_edge("x", "y")
+        params1 = {}
+        params2 = {}
+        q1 = rewriting.find_matching(
+            pattern, "node", "edge", nodes={"a", "b"}, parameters=params1)
+        q2 = rewriting.find_matching(
+            pattern, "node", "edge", nodes={"c"}, parameters=params2)
+        assert(q1 == q2)
+        assert(set(params1["param0"]) == {"a", "b"})
+
+        rule = Rule.from_transform(pattern)
+        rule.inject_clone_node("x")
+        rule.inject_add_node("z")
+        rule.inject_remove_node_attrs("y", {"name": "EGFR"})
+        params1 = {}
+        params2 = {}
+        q1, _ = rewriting.rule_to_cypher(
+            rule, {"x": "a", "y": "b"}, parameters=params1)
+        q2, _ = rewriting.rule_to_cypher(
+            rule, {"x": "c", "y": "d"}, parameters=params2)
+        assert(q1 == q2)
+        assert("'a'" not in q1 and "'b'" not in q1)
+
+    def test_graph_templates(self):
+        driver = RecordingDriver()
+        g = Neo4jGraph(driver=driver, unique_node_ids=False)
+        for node in ["a", "b"]:
+            g.get_node(node)
+            g.successors(node)
+            g.update_node_attrs(node, {"name": node})
+            g.add_edge(node, "c", {"s": node})
+            g.remove_node(node)
+        queries = driver.queries
+        assert(len(queries) == 10)
+        for (q1, p1), (q2, p2) in zip(queries[:5], queries[5:]):
+            assert(q1 == q2)
+            assert(p1 != p2)
+            assert("'a'" not in q1)
+
+    def test_batch(self):
+        driver = RecordingDriver()
+        g = Neo4jGraph(driver=driver, unique_node_ids=False)
+        g.get_node("a")
+        g.get_node("b")
+        assert(driver.sessions == 2)
+
+        driver.sessions = 0
+        with g.batch():
+            g.get_node("a")
+            with g.batch():
+                g.update_node_attrs("a", {"name": "a"})
+            g.remove_node("b")
+        assert(driver.sessions == 1)
+        assert(driver.transactions == 1)
+        assert(driver.commits == 1)
+        assert(len(driver.queries) == 5)
+
+        try:
+            with g.batch():
+                g.remove_node("a")
+                raise ValueError()
+        except ValueError:
+            pass
+        assert(driver.commits == 1)
+        assert(driver.rollbacks == 1)
+
+        driver = RecordingDriver()
+        h = Neo4jHierarchy(driver=driver)
+        driver.sessions = 0
+        with h.batch():
+            h.successors("g1")
+            graph = h.get_graph("g1")
+            graph.add_node("a")
+            graph.successors("a")
+            h.remove_typing("g1", "g2")
+        assert(driver.sessions == 1)
+        assert(driver.transactions == 1)
+        assert(driver.commits == 1)
+
+    def test_bulk_loading(self):
+        driver = RecordingDriver()
+        g = Neo4jGraph(driver=driver, unique_node_ids=False)
+        g.add_nodes_from(
+            [("n{}".format(i), {"i": i}) for i in range(25)] + ["x", 1],
+            chunk_size=10)
+        g.add_edges_from(
+            [("n{}".format(i), "x") for i in range(25)] +
+            [("x", 1, {"a": "b"})],
+            chunk_size=20)
+        queries = driver.queries
+        assert(len(queries) == 5)
+        assert(queries[0][0] == queries[1][0] == queries[2][0])
+        assert([len(p["param0"]) for _, p in queries] == [10, 10, 7, 20, 6])
+        assert(queries[0][1]["param0"][3] == {"id": "n3", "attrs": {"i": [3]}})
+        assert(queries[2][1]["param0"][-1] == {"id": "1", "attrs": {}})
+        assert(queries[4][1]["param0"][-1] == {
+            "source": "x", "target": "1", "attrs": {"a": ["b"]}})
+
+        json_data = {
+            "nodes": [{"id": i, "attrs": {}} for i in range(5)],
+            "edges": [
+                {"from": i, "to": i + 1, "attrs": {}} for i in range(4)]
+        }
+        loading = list(generic.load_graph_from_json(
+            json_data, "node", "edge", chunk_size=2))
+        assert(len(loading) == 5)
+        assert("UNWIND $param0" in loading[0][0])
+
+    def test_stream_graph_from_json(self):
+        json_data = {
+            "nodes": [
+                {"id": i, "attrs": {"a": {"type": "FiniteSet", "data": [i]}}}
+                for i in range(5)],
+            "edges": [
+                {"from": i, "to": i + 1, "attrs": {}} for i in range(4)]
+        }
+        driver = RecordingDriver()
+        progress = []
+        with driver.session() as session:
+            generic.stream_graph_from_json(
+                session, json_data, "g1", "edge", chunk_size=2,
+                progress=lambda *args: progress.append(args))
+        assert(progress == [
+            ("nodes", 2, 5), ("nodes", 4, 5), ("nodes", 5, 5),
+            ("edges", 2, 4), ("edges", 4, 4)])
+        assert(len(driver.queries) == 5)
+        assert(driver.queries[0][0] == driver.queries[1][0])
+        assert(driver.queries[0][1]["param0"][1] == {
+            "id": "1", "attrs": {"a": [1]}})
+        assert(json_data["nodes"][0]["attrs"] == {
+            "a": {"type": "FiniteSet", "data": [0]}})
+        assert(all("file:" not in q for q, _ in driver.queries))
+
+    def test_cache(self):
+        driver = RecordingDriver()
+        g = Neo4jGraph(driver=driver, unique_node_ids=False, cache_size=2)
+        assert(g.nodes() == [] and g.nodes() == [])
+        assert(g.successors("a") == set())
+        succ = g.successors("a")
+        succ.add("b")
+        assert(g.successors("a") == set())
+        g.get_node("a")
+        g.get_node("a")
+        assert(len(driver.queries) == 3)
+        info = g.cache_info()
+        assert(info["nodes"]["hits"] == 1)
+        assert(info["successors"]["hits"] == 2)
+        assert(info["successors"]["hit_rate"] == 2 / 3)
+        assert(info["attrs"]["size"] == 1)
+
+        # writes invalidate the affected entries only
+        g.add_edge("a", "b")
+        g.successors("a")
+        g.get_node("a")
+        assert(len(driver.queries) == 5)
+        g.update_node_attrs("a", {"x": 1})
+        g.get_node("a")
+        g.nodes()
+        assert(len(driver.queries) == 7)
+
+        # attribute dicts are bounded by the cache size
+        for n in ["b", "c", "d"]:
+            g.get_node(n)
+        assert(g.cache_info()["attrs"]["size"] == 2)
+
+        g.clear_cache()
+        g.nodes()
+        assert(len(driver.queries) == 11)
+        try:
+            with g.batch():
+                g.nodes()
+                raise ValueError()
+        except ValueError:
+            pass
+        assert(g.cache_info()["nodes"]["size"] == 0)
+
+        g.set_cache_size(None)
+        assert(g.cache_info() is None)
+        g.nodes()
+        g.nodes()
+        assert(len(driver.queries) == 13)
+
+    def test_traversals(self):
+        query = generic.descendant_ids_query(
+            "a", "node", "edge", max_depth=3, parameters={})
+        assert("-[:edge*1..3]->" in query)
+        assert("RETURN collect(m.id) AS descendants" in query)
+        query = generic.ancestor_ids_query("a", "node", "edge", {})
+        assert("-[:edge*1..]->" in query)
+        assert("$param0" in query)
+
+        driver = RecordingDriver()
+        g = Neo4jGraph(driver=driver, unique_node_ids=False)
+        assert(g.ancestors("a", max_depth=2) == set())
+        assert(g.descendants("a") == set())
+        assert(g.nodes_disconnected_from("a") is None)
+        assert(len(driver.queries) == 3)
+        assert("*1..2" in driver.queries[0][0])
+        assert("apoc.path.subgraphNodes" in driver.queries[2][0])
+        assert("maxLevel: -1" in driver.queries[2][0])
+        assert("*1.." not in driver.queries[2][0])
+        query = generic.disconnected_nodes_query(
+            "a", "node", "edge", {}, max_depth=2)
+        assert("maxLevel: 2" in query)
+
+        records = [
+            {"node_id": "a", "attrs": {"id": "a", "x": [1]},
+             "edges": [{"target": "b", "attrs": {"y": ["z"]}}]},
+            {"node_id": "b", "attrs": {"id": "b", "i": ["IntegerSet"]},
+             "edges": [{"target": "a", "attrs": {"s": ["StringSet"]}}]}
+        ]
+        g._execute = lambda query, parameters: records
+        sub = g.subgraph(["a", "b"])
+        assert(set(sub.nodes()) == {"a", "b"})
+        assert(sub.get_node("a") == {"x": FiniteSet({1})})
+        assert(sub.get_edge("a", "b") == {"y": FiniteSet({"z"})})
+        assert(sub.get_node("b") == {"i": IntegerSet.universal()})
+        assert(sub.get_edge("b", "a")["s"].is_universal())
+        assert(records[0]["attrs"]["id"] == "a")
+
+    def test_intergraph_templates(self):
+        params1 = {}
+        params2 = {}
+        q1 = propagation.set_intergraph_edge(
+            "g1", "g2", "a", "x", "typing", parameters=params1)
+        q2 = propagation.set_intergraph_edge(
+            "g1", "g2", "b'c", "y", "typing", parameters=params2)
+        assert(q1 == q2)
+        assert(params2 == {"param0": "b'c", "param1": "y"})
+
+        driver = RecordingDriver()
+        h = Neo4jHierarchy(driver=driver)
+        h.get_typing = lambda source, target: {"a": "x", "b'c": "y"}
+        h.get_relation = lambda left, right: {"a": {"x", "y"}, "b": {"z"}}
+
+        driver.queries = []
+        h._update_mapping("g1", "g2", {"a": "z", "b'c": "y", 1: "w"})
+        assert(len(driver.queries) == 2)
+        (retarget, retarget_params), (merge, merge_params) = driver.queries
+        assert(retarget.startswith("UNWIND $param0 AS pair"))
+        assert(retarget_params == {
+            "param0": [{"source": "a", "old_target": "x", "target": "z"}]})
+        assert(merge.startswith("UNWIND $param0 AS pair"))
+        assert(
+            sorted(merge_params["param0"], key=lambda p: p["source"]) ==
+            [{"source": "1", "target": "w"}, {"source": "b'c", "target": "y"}])
+        for query, _ in driver.queries:
+            assert("'a'" not in query and "b'c" not in query)
+
+        driver.queries = []
+        h._update_relation("g1", "g2", {"a": {"x", "w"}, "c": {"z"}})
+        assert(len(driver.queries) == 2)
+        (add, add_params), (remove, remove_params) = driver.queries
+        assert("MERGE" in add and "DELETE r" in remove)
+        assert(
+            sorted(add_params["param0"], key=lambda p: p["source"]) ==
+            [{"source": "a", "target": "w"}, {"source": "c", "target": "z"}])
+        assert(
+            sorted(remove_params["param0"], key=lambda p: p["source"]) ==
+            [{"source": "a", "target": "y"}, {"source": "b", "target": "z"}])
+        for query, _ in driver.queries:
+            assert("'a'" not in query)
+
+        driver.queries = []
+        h._update_mapping("g1", "g2", {"a": "x"})
+        assert(len(driver.queries) == 1)
@@ -305,6 +305,42 @@ class TestRule(object):
                100 in rule.added_node_attrs()[3]["a3"])
         assert(rule.is_restrictive() and rule.is_relaxing())
 
+    def test_cached_component_getters(self):
+        pattern = NXGraph()
+        pattern.add_nodes_from([1, 2, 3])
+        pattern.add_edges_from([(1, 2), (3, 2)])
+        rule = Rule.from_transform(pattern)
+
+        assert(rule.removed_nodes() == set())
+        # modifying the result does not affect the rule
+        rule.removed_nodes().add(1)
+        assert(rule.removed_nodes() == set())
+
+        rule.inject_remove_node(1)
+        assert(rule.removed_nodes() == {1})
+        p_clone, _ = rule.inject_clone_node(2)
+        assert(rule.cloned_nodes() == {2: {2, p_clone}})
+        rhs_node = rule.inject_merge_nodes([2, 3])
+        assert(rule.merged_nodes() == {rhs_node: {2, 3}})
+        assert(rule.cloned_nodes() == {2: {2, p_clone}})
+
+        # direct modifications of the rule components are detected
+        rule.rhs.add_node(5)
+        assert(rule.added_nodes() == {5})
+        rule.p.remove_edge(3, 2)
+        assert((3, 2) in rule.removed_edges())
+
+        # including the ones keeping the sizes of the components
+        pattern = NXGraph()
+        pattern.add_nodes_from(["a", "b"])
+        rule = Rule.from_transform(pattern)
+        assert(rule.added_nodes() == set())
+        rule.rhs.remove_node("b")
+        rule.rhs.add_node("c")
+        rule.p_rhs["b"] = "a"
+        assert(rule.added_nodes() == {"c"})
+        assert(rule.merged_nodes() == {"a": {"a", "b"}})
+
     # def test_from_commands(self):
     #     pattern = NXGraph()
     #     prim.add_nodes_from(
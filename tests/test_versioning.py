@@ -2,7 +2,8 @@ from neobolt.exceptions import ServiceUnavailable
 
 from regraph import NXHierarchy, Neo4jHierarchy, NXGraph
 
-from regraph.audit import VersionedGraph, VersionedHierarchy
+from regraph.audit import (VersionedGraph, VersionedHierarchy,
+                           SQLiteRevisionStore)
 from regraph.rules import Rule
 
 
@@ -376,3 +377,130 @@ class TestVersioning(object):
 
         h.rollback(h.initial_commit())
         print(h.hierarchy.get_typing("d", "s"))
+
+    def test_pending_deltas(self):
+        """Test lazy composition of the deltas of branches."""
+        g = VersionedGraph(NXGraph.copy(self.initial_graph))
+        g.branch("test")
+        g.switch_branch("master")
+
+        for i in range(3):
+            pattern = NXGraph()
+            pattern.add_node("circle")
+            rule = Rule.from_transform(pattern)
+            rule.inject_add_node("node{}".format(i))
+            rule.inject_add_edge("node{}".format(i), "circle")
+            g.rewrite(rule, {"circle": "circle"})
+
+        assert(len(g._pending_deltas) == 3)
+        g.switch_branch("test")
+        assert(set(g.graph.nodes()) == {"circle", "square"})
+        g.switch_branch("master")
+        assert(set(g.graph.nodes()) == {
+            "circle", "square", "node0", "node1", "node2"})
+
+        g = VersionedGraph(
+            NXGraph.copy(self.initial_graph), compaction_interval=2)
+        g.branch("test")
+        for i in range(3):
+            pattern = NXGraph()
+            pattern.add_node("square")
+            rule = Rule.from_transform(pattern)
+            rule.inject_clone_node("square")
+            g.rewrite(rule, {"square": "square"})
+            assert(len(g._pending_deltas) < 2)
+        g.switch_branch("master")
+        assert(set(g.graph.nodes()) == {"circle", "square"})
+
+    def test_checkpoints(self):
+        """Test restoring versions from checkpoints."""
+        g = VersionedGraph(
+            NXGraph.copy(self.initial_graph), checkpoint_interval=2)
+        commits = [g.initial_commit()]
+        states = [set(g.graph.nodes())]
+        for i in range(5):
+            pattern = NXGraph()
+            pattern.add_node("circle")
+            rule = Rule.from_transform(pattern)
+            rule.inject_add_node("node{}".format(i))
+            rule.inject_add_edge("node{}".format(i), "circle")
+            _, commit = g.rewrite(rule, {"circle": "circle"})
+            commits.append(commit)
+            states.append(set(g.graph.nodes()))
+
+        checkpoints = [
+            c for c in commits
+            if "checkpoint" in g._revision_graph.nodes[c]
+        ]
+        assert(checkpoints == commits[::2])
+        assert(g._path_from_checkpoint(commits[3]) == commits[2:4])
+
+        g.branch("test")
+        pattern = NXGraph()
+        pattern.add_node("square")
+        rule = Rule.from_transform(pattern)
+        rule.inject_remove_node("square")
+        g.rewrite(rule, {"square": "square"})
+        g.switch_branch("master")
+        assert(set(g.graph.nodes()) == states[-1])
+
+        g.rollback(commits[3])
+        assert(set(g.graph.nodes()) == states[3])
+        assert(g.branches() == ["master"])
+
+        data = g.to_json()
+        g1 = VersionedGraph.from_json(NXGraph.copy(g.graph), data)
+        assert(g1._path_from_checkpoint(commits[3]) == commits[2:4])
+        g1.rollback(commits[1])
+        assert(set(g1.graph.nodes()) == states[1])
+
+    def test_switch_after_rollback(self):
+        """Test switching branches after a rollback without checkpoints."""
+        g = VersionedGraph(NXGraph.copy(self.initial_graph))
+        g.branch("test")
+        commits = []
+        for n in ["x", "y"]:
+            rule = Rule.from_transform(NXGraph())
+            rule.inject_add_node(n)
+            _, commit = g.rewrite(rule, {})
+            commits.append(commit)
+        g.rollback(commits[0])
+        assert(set(g.graph.nodes()) == {"circle", "square", "x"})
+        g.switch_branch("master")
+        assert(set(g.graph.nodes()) == {"circle", "square"})
+        g.switch_branch("test")
+        assert(set(g.graph.nodes()) == {"circle", "square", "x"})
+
+    def test_revision_store(self):
+        """Test storing deltas in an SQLite revision store."""
+        store = SQLiteRevisionStore(cache_size=1)
+        g = VersionedGraph(
+            NXGraph.copy(self.initial_graph), revision_store=store)
+        g.branch("test")
+        commits = []
+        for i in range(3):
+            pattern = NXGraph()
+            pattern.add_node("square")
+            rule = Rule.from_transform(pattern)
+            rule.inject_add_node("node{}".format(i))
+            rule.inject_add_edge("square", "node{}".format(i))
+            _, commit = g.rewrite(rule, {"square": "square"})
+            commits.append(commit)
+
+        for s, t, attrs in g._revision_graph.edges(data=True):
+            assert("delta" not in attrs)
+            assert(store.get_delta(s, t) is not None)
+
+        g.switch_branch("master")
+        assert(set(g.graph.nodes()) == {"circle", "square"})
+        g.switch_branch("test")
+        g.rollback(commits[0])
+        assert(set(g.graph.nodes()) == {"circle", "square", "node0"})
+
+        data = g.to_json()
+        assert(len(data["revision_graph"]["edges"]) == 2)
+        g1 = VersionedGraph.from_json(
+            NXGraph.copy(g.graph), data,
+            revision_store=SQLiteRevisionStore())
+        g1.switch_branch("master")
+        assert(set(g1.graph.nodes()) == {"circle", "square"})